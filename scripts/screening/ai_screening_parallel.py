@@ -5,288 +5,113 @@ Parallel dual-AI title/abstract screening using asyncio.
 Acceleration strategy:
 1. Codex + Gemini run concurrently per record (asyncio.gather)
 2. Multiple records processed in parallel via semaphore (default: 4 workers)
-3. Periodic checkpoint saves with thread-safe locking
+3. Optional batching: --batch-size K packs K records into one prompt
+4. Optional per-provider control: --adaptive AIMD concurrency, --rate-limit
+5. Append-only result journal, compacted into the output CSV at the end
+6. Optional --persistent-workers N: long-lived provider processes fed over stdin
+7. Optional --recover: failed calls retried in the background through the
+   screening_recovery fallback chains, with per-provider backoff
+8. Optional live metrics: --metrics-port (Prometheus) / --metrics-json
+9. Optional --shard i/N: screen one stable hash shard of the records per
+   machine; merge_shards.py combines the outputs
+
+Thin preset over ``screening_engine``.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
-import csv
-import json
 import logging
-import re
-import sys
 import time
+from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Any
 
-import pandas as pd
 import yaml
 
-logger = logging.getLogger(__name__)
-
-SCREENING_PROMPT = """You are screening studies for an educational AI adoption meta-analysis.
-
-Apply these criteria:
-1) Empirical quantitative study with primary data
-2) AI technology is focal (not general ICT/IT)
-3) Educational setting/population (students, instructors, administrators)
-4) Adoption/acceptance/intention/use is measured
-5) Correlation matrix or standardized beta/path data appears available or likely
-6) English language
-7) Publication window target: 2015-2025
-8) Sample size n >= 50 (if stated or inferable from abstract)
-9) Peer-reviewed journal article or full conference paper
-
-Exclude codes:
-E1=Not empirical/quantitative, E2=AI not focal, E3=Not education context,
-E4=No adoption/acceptance outcome, E5=No effect size data,
-E6=Not English, E7=Outside 2015-2025, E8=n<50, E9=Not peer-reviewed,
-E10=Duplicate sample, E11=Qualitative/review only, E12=Other
-
-Return strict JSON:
-{{
-  "decision": "include|exclude|uncertain",
-  "confidence": 0.0,
-  "exclude_code": "E1|E2|E3|E4|E5|E6|E7|E8|E9|E10|E11|E12|NA",
-  "criteria_flags": {{
-    "quantitative": "yes|no|unclear",
-    "ai_focal": "yes|no|unclear",
-    "education_context": "yes|no|unclear",
-    "adoption_outcome": "yes|no|unclear",
-    "effect_size_reported": "yes|no|unclear",
-    "english": "yes|no|unclear",
-    "sample_size_adequate": "yes|no|unclear"
-  }},
-  "rationale": "1-2 sentences"
-}}
-
-Title: {title}
-Abstract: {abstract}
-Keywords: {keywords}
-Year: {year}
-Source: {source}
-"""
-
-
-def try_extract_json(text: str) -> dict[str, Any]:
-    text = text.strip()
-    if not text:
-        raise ValueError("Empty model output")
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-    codeblock = re.search(r"```json\s*(\{.*?\})\s*```", text, flags=re.DOTALL)
-    if codeblock:
-        return json.loads(codeblock.group(1))
-    obj = re.search(r"(\{.*\})", text, flags=re.DOTALL)
-    if obj:
-        return json.loads(obj.group(1))
-    raise ValueError("No JSON object found in output")
-
-
-def normalize_decision(value: str) -> str:
-    v = (value or "").strip().lower()
-    if v in {"include", "included"}:
-        return "include"
-    if v in {"exclude", "excluded"}:
-        return "exclude"
-    return "uncertain"
-
-
-def consensus(dec1: str, dec2: str) -> str:
-    if dec1 == dec2 == "include":
-        return "include"
-    if dec1 == dec2 == "exclude":
-        return "exclude"
-    return "conflict"
-
-
-def build_prompt(row: pd.Series) -> str:
-    return SCREENING_PROMPT.format(
-        title=str(row.get("title", "")),
-        abstract=str(row.get("abstract", "")),
-        keywords=str(row.get("keywords", "")),
-        year=str(row.get("year", "")),
-        source=str(row.get("search_source", row.get("source_database", ""))),
-    )
-
-
-async def invoke_provider_async(
-    provider_name: str, cmd: list[str], prompt: str, timeout_s: int
-) -> dict[str, Any]:
-    full_cmd = [part.replace("{prompt}", prompt) for part in cmd]
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            *full_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout_bytes, stderr_bytes = await asyncio.wait_for(
-            proc.communicate(), timeout=timeout_s
-        )
-        stdout = stdout_bytes.decode("utf-8", errors="replace")
-        stderr = stderr_bytes.decode("utf-8", errors="replace")
-
-        if proc.returncode != 0:
-            return {
-                "decision": "uncertain",
-                "confidence": 0.0,
-                "exclude_code": "NA",
-                "criteria_flags": {},
-                "rationale": f"{provider_name} failed: {stderr.strip()[:200]}",
-            }
-
-        try:
-            payload = try_extract_json(stdout)
-        except Exception as exc:
-            return {
-                "decision": "uncertain",
-                "confidence": 0.0,
-                "exclude_code": "NA",
-                "criteria_flags": {},
-                "rationale": f"JSON parse error from {provider_name}: {exc}",
-            }
-
-        payload["decision"] = normalize_decision(str(payload.get("decision", "uncertain")))
-        payload["confidence"] = float(payload.get("confidence", 0.0) or 0.0)
-        payload["exclude_code"] = payload.get("exclude_code", "NA") or "NA"
-        payload["rationale"] = str(payload.get("rationale", "")).strip()
-        return payload
-
-    except asyncio.TimeoutError:
-        logger.warning("%s timed out after %ss", provider_name, timeout_s)
-        return {
-            "decision": "uncertain",
-            "confidence": 0.0,
-            "exclude_code": "NA",
-            "criteria_flags": {},
-            "rationale": f"{provider_name} timed out after {timeout_s}s",
-        }
+from screening_engine import (
+    ScreeningRun,
+    add_cache_arguments,
+    add_control_arguments,
+    add_recovery_arguments,
+    add_shard_arguments,
+    add_telemetry_arguments,
+    add_worker_arguments,
+    build_screener,
+    close_providers,
+    control_from_args,
+    load_records,
+    open_cache,
+    providers_from_args,
+    recovery_from_args,
+    screen_fn,
+    shard_from_args,
+    telemetry_from_args,
+)
 
-
-async def screen_one_record(
-    row: pd.Series,
-    codex_cmd: list[str],
-    gemini_cmd: list[str],
-    timeout_s: int,
-    semaphore: asyncio.Semaphore,
-) -> dict[str, Any]:
-    async with semaphore:
-        prompt = build_prompt(row)
-        t0 = time.monotonic()
-
-        # Run Codex and Gemini concurrently
-        codex_result, gemini_result = await asyncio.gather(
-            invoke_provider_async("codex", codex_cmd, prompt, timeout_s),
-            invoke_provider_async("gemini", gemini_cmd, prompt, timeout_s),
-        )
-
-        elapsed = time.monotonic() - t0
-        logger.debug("%s done in %.1fs", row["record_id"], elapsed)
-
-        return {
-            "record_id": row["record_id"],
-            "title": row.get("title", ""),
-            "year": row.get("year", ""),
-            "search_source": row.get("search_source", row.get("source_database", "")),
-            "screen_decision_codex": codex_result["decision"],
-            "screen_decision_gemini": gemini_result["decision"],
-            "screen_confidence_codex": codex_result["confidence"],
-            "screen_confidence_gemini": gemini_result["confidence"],
-            "exclude_code_codex": codex_result["exclude_code"],
-            "exclude_code_gemini": gemini_result["exclude_code"],
-            "rationale_codex": codex_result["rationale"],
-            "rationale_gemini": gemini_result["rationale"],
-            "screen_consensus": consensus(codex_result["decision"], gemini_result["decision"]),
-            "oauth_auth_method_codex": "oauth",
-            "oauth_auth_method_gemini": "oauth",
-            "human1_decision": "",
-            "human2_decision": "",
-            "adjudicated_final_decision": "",
-            "exclude_code": "",
-            "decision_rationale": "",
-            "adjudicator_id": "",
-        }
-
-
-def save_checkpoint(results: list[dict], output_path: Path) -> None:
-    pd.DataFrame(results).to_csv(output_path, index=False)
-    logger.info("Checkpoint saved: %s rows", len(results))
+logger = logging.getLogger(__name__)
 
 
 async def run_screening(args: argparse.Namespace) -> None:
-    config_path = Path(args.config)
-    with open(config_path, "r", encoding="utf-8") as f:
+    with open(args.config, "r", encoding="utf-8") as f:
         config = yaml.safe_load(f)
 
-    codex_block = config.get("screening_cli", {}).get("codex", {})
-    gemini_block = config.get("screening_cli", {}).get("gemini", {})
-    codex_cmd = codex_block.get("screen_cmd", ["codex", "exec", "{prompt}"])
-    gemini_cmd = gemini_block.get("screen_cmd", ["gemini", "-p", "{prompt}"])
-
-    records = pd.read_csv(args.input)
-    if "record_id" not in records.columns:
-        records.insert(0, "record_id", range(1, len(records) + 1))
-
-    output_path = Path(args.output)
-    results: list[dict] = []
-
-    if args.resume and output_path.exists():
-        existing = pd.read_csv(output_path)
-        done_ids = set(existing["record_id"].astype(str).tolist())
-        todo = records[~records["record_id"].astype(str).isin(done_ids)].copy()
-        results = existing.to_dict("records")
-        logger.info("Resume: %s done, %s remaining", len(done_ids), len(todo))
-    else:
-        todo = records
-
+    records = shard_from_args(args, load_records(args.input))
+    telemetry = telemetry_from_args(args)
+    run = ScreeningRun(args.output, save_every=args.save_every, resume=args.resume, telemetry=telemetry)
+    todo = run.pending(records)
     if len(todo) == 0:
         logger.info("Nothing to process. All records already screened.")
+        run.finish()
         return
 
     logger.info(
         "Starting parallel screening: %s records, %s workers, %ss timeout",
         len(todo), args.workers, args.timeout,
     )
-
-    semaphore = asyncio.Semaphore(args.workers)
-    completed_count = len(results)
+    cache = open_cache(args)
+    control = control_from_args(args)
+    base_providers = providers_from_args(config, ["codex", "gemini"], args)
+    providers = base_providers
+    if telemetry is not None:
+        providers = [telemetry.wrap(p) for p in providers]
+    if control is not None:
+        providers = [control.wrap(p) for p in providers]
+    recovery = recovery_from_args(
+        args, config, args.output, resume=args.resume, cache=cache, control=control,
+        on_update=lambda row, _slot: run.update(row), telemetry=telemetry,
+    )
+    if telemetry is not None:
+        if control is not None:
+            telemetry.add_source("control", control.snapshot)
+        if recovery is not None:
+            telemetry.add_source("recovery_queue", recovery.queue.counts)
+    screener = build_screener(
+        providers, timeout_s=args.timeout, batch_size=args.batch_size, cache=cache,
+        on_row=recovery.observe if recovery else None,
+    )
     t_start = time.monotonic()
-
-    tasks = []
-    row_list = [row for _, row in todo.iterrows()]
-
-    for row in row_list:
-        task = asyncio.ensure_future(
-            screen_one_record(row, codex_cmd, gemini_cmd, args.timeout, semaphore)
-        )
-        tasks.append(task)
-
-    for i, coro in enumerate(asyncio.as_completed(tasks)):
-        result = await coro
-        results.append(result)
-        completed_count += 1
-
-        if completed_count % args.save_every == 0:
-            save_checkpoint(results, output_path)
-
-        if completed_count % 100 == 0:
-            elapsed = time.monotonic() - t_start
-            rate = (completed_count - (len(results) - len(todo))) / elapsed if elapsed > 0 else 0
-            remaining = (len(todo) - (completed_count - (len(results) - len(todo)))) / rate if rate > 0 else 0
-            logger.info(
-                "Progress: %s/%s total (%.1f rec/min, ~%.0fh remaining)",
-                completed_count, len(records), rate * 60, remaining / 3600,
+    async with AsyncExitStack() as stack:
+        stack.push_async_callback(close_providers, base_providers)
+        if control is not None:
+            await stack.enter_async_context(control.reporting(args.metrics_every))
+        if telemetry is not None:
+            await stack.enter_async_context(
+                telemetry.exporting(args.metrics_every, port=args.metrics_port, json_path=args.metrics_json)
             )
-
-    save_checkpoint(results, output_path)
+        if recovery is not None:
+            await stack.enter_async_context(recovery.running(args.recover_wait))
+        await run.run(todo, screen_fn(screener, args.batch_size), args.workers, batch_size=args.batch_size)
+    if recovery is not None:
+        logger.info("%s", recovery.summary())
+        recovery.queue.close()
+    df_out = run.finish()
+    if cache is not None:
+        cache.close()
     elapsed = time.monotonic() - t_start
     logger.info(
         "Done. %s records in %.0f minutes (%.1f rec/min). Output: %s",
-        len(results), elapsed / 60, len(todo) / (elapsed / 60) if elapsed > 0 else 0, output_path,
+        len(df_out), elapsed / 60, len(todo) / (elapsed / 60) if elapsed > 0 else 0, args.output,
     )
 
 
@@ -298,9 +123,19 @@ def main() -> None:
     parser.add_argument("--config", type=str, default=_default_config)
     parser.add_argument("--workers", type=int, default=4, help="Concurrent record workers (default: 4)")
     parser.add_argument("--resume", action="store_true", help="Resume from existing output")
-    parser.add_argument("--save-every", type=int, default=50, help="Checkpoint interval")
+    parser.add_argument("--save-every", type=int, default=50, help="Journal fsync interval (records)")
     parser.add_argument("--timeout", type=int, default=300, help="Per-provider timeout (seconds)")
     parser.add_argument("--auto-login", action="store_true")
+    parser.add_argument(
+        "--batch-size", type=int, default=1,
+        help="Records per provider call; >1 packs records into one JSON-array prompt",
+    )
+    add_cache_arguments(parser)
+    add_control_arguments(parser)
+    add_worker_arguments(parser)
+    add_recovery_arguments(parser)
+    add_telemetry_arguments(parser)
+    add_shard_arguments(parser)
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Calibrate and explain the tiered screener's keyword pre-filter.
+
+Scores the current AI/education/adoption term lists, plus any candidate
+term sets, against the human I/X decisions: recall of human includes (Tier 1
+auto-excludes must not contain any), Tier 1 precision, and provider calls
+saved per tier compared with dual screening of every record. Term match
+spans are cached in SQLite, so re-scoring after editing a candidate file
+only scans the new terms.
+
+Usage:
+    python scripts/screening/calibrate_tiers.py data/02_processed/screening_master_16189.csv
+    python scripts/screening/calibrate_tiers.py records.csv --candidates tier_candidates.yaml
+    python scripts/screening/calibrate_tiers.py records.csv --explain REC_06044 REC_13641
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+from screening_engine import (
+    DEFAULT_LABELS_PATH,
+    DEFAULT_SPAN_CACHE_PATH,
+    FAMILY_TERMS,
+    MatchSpanCache,
+    TierCalibrator,
+    load_candidates,
+    load_labels,
+    load_records,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the Tier-1 keyword filter against human labels")
+    parser.add_argument("records", type=str, help="Screening corpus CSV (record_id, title, abstract, keywords)")
+    parser.add_argument("--labels", type=str, default=str(DEFAULT_LABELS_PATH), help="Human I/X decisions CSV")
+    parser.add_argument("--candidates", type=str, default=None, help="YAML file of candidate term sets")
+    parser.add_argument(
+        "--cache", type=str, default=str(DEFAULT_SPAN_CACHE_PATH),
+        help="SQLite match-span cache (default: data/02_screening/tier_match_cache.sqlite)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Keep match spans in memory only")
+    parser.add_argument("--explain", nargs="+", metavar="RECORD_ID", help="Show matched terms for these records")
+    parser.add_argument("--candidate", type=str, default=None, help="Candidate to explain (default: current)")
+    parser.add_argument("--output", type=str, default=None, help="Write the comparison table to this CSV")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    candidates = load_candidates(args.candidates) if args.candidates else {}
+    cache = MatchSpanCache(":memory:" if args.no_cache else args.cache)
+    calibrator = TierCalibrator(load_records(args.records), load_labels(args.labels), cache)
+    logger.info(
+        "Corpus: %s records, %s with human labels",
+        len(calibrator.records), int(pd.Series(calibrator.human).notna().sum()),
+    )
+
+    try:
+        if args.explain:
+            candidate = candidates[args.candidate] if args.candidate else FAMILY_TERMS
+            explained = calibrator.explain(args.explain, candidate)
+            with pd.option_context("display.max_rows", None, "display.max_colwidth", 100, "display.width", 200):
+                print(explained.to_string(index=False))
+            return
+
+        t_start = time.monotonic()
+        summary = calibrator.compare(candidates)
+        logger.info("Scored %s term sets in %.2fs", len(summary), time.monotonic() - t_start)
+        with pd.option_context("display.width", 200, "display.max_columns", None, "display.precision", 4):
+            print(summary.to_string())
+            for name in summary.index:
+                candidate = FAMILY_TERMS if name == "current" else candidates[name]
+                scored = calibrator.score(candidate, name)
+                print(f"\n[{name}] per tier:")
+                print(scored["per_tier"].to_string())
+                if scored["false_negative_ids"]:
+                    print(f"[{name}] human includes auto-excluded: {', '.join(scored['false_negative_ids'])}")
+        if args.output:
+            summary.to_csv(args.output)
+            logger.info("Comparison written to %s", args.output)
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
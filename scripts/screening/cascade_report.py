@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Estimate cascade-routing savings from existing dual-screened output.
+
+Replays the cascade policy of ``ai_screening_tiered.py --cascade`` on rows
+where both providers answered: how many second-provider calls would have been
+skipped, how many outcomes would change, and (with human labels) the recall
+of human includes under dual screening vs the cascade. Several confidence
+thresholds can be compared in one run.
+
+Usage:
+    python scripts/screening/cascade_report.py data/03_screening/screening_ai_dual.csv
+    python scripts/screening/cascade_report.py results.csv --first codex --min-confidence 0.7 0.8 0.9
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from screening_engine import DEFAULT_LABELS_PATH, CascadePolicy, load_labels, simulate_cascade
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cascade-routing savings and recall impact")
+    parser.add_argument("results", type=str, help="Dual-screened output CSV")
+    parser.add_argument("--first", choices=["gemini", "codex"], default="gemini", help="Provider called first")
+    parser.add_argument(
+        "--min-confidence", type=float, nargs="+", default=[0.85],
+        help="Escalation thresholds to compare (default: 0.85)",
+    )
+    parser.add_argument("--trust-includes", action="store_true", help="Do not escalate confident includes")
+    parser.add_argument(
+        "--tier", type=str, default="T3",
+        help="Only rows whose screening_tier starts with this prefix (default: T3; '' for all)",
+    )
+    parser.add_argument("--labels", type=str, default=str(DEFAULT_LABELS_PATH), help="Human I/X decisions CSV")
+    parser.add_argument("--output", type=str, default=None, help="Write the report table to this CSV")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    results = pd.read_csv(args.results)
+    if args.tier and "screening_tier" in results.columns:
+        results = results[results["screening_tier"].astype(str).str.startswith(args.tier)]
+    labels = load_labels(args.labels) if Path(args.labels).exists() else None
+    second = "codex" if args.first == "gemini" else "gemini"
+
+    report = pd.DataFrame([
+        simulate_cascade(
+            results, args.first, second,
+            CascadePolicy(min_confidence=threshold, escalate_includes=not args.trust_includes),
+            labels=labels,
+        )
+        for threshold in args.min_confidence
+    ])
+    logger.info("%s dual-screened rows, %s first", report["records"].iloc[0], args.first)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.precision", 4):
+        print(report.to_string(index=False))
+    if args.output:
+        report.to_csv(args.output, index=False)
+        logger.info("Report written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,858 @@
+#!/usr/bin/env python3
+"""
+Index-backed candidate generation for fuzzy title deduplication.
+
+Builds an inverted index over padded character q-grams of normalized titles
+and applies length, prefix and character-count filters so that only pairs
+which can still reach the similarity threshold are scored with
+SequenceMatcher. Every filter is an upper bound on SequenceMatcher.ratio(),
+so the matching pairs are exactly those an exhaustive pairwise scan finds.
+
+Also provides union-find clustering of matched pairs, which collapses each
+duplicate cluster to its most complete record instead of keeping whichever
+record came first.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import pickle
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:  # optional C-backed bound; SequenceMatcher bounds are used instead
+    Indel = None
+
+# Sentinel used to pad titles so every character is covered by q q-grams
+PAD_CHAR = "\x00"
+
+# Dedup modes: keep-first greedy removal or union-find clustering
+DEDUP_MODES = ("greedy", "cluster")
+
+# Field weights for picking the canonical record of a duplicate cluster
+DEFAULT_COMPLETENESS_WEIGHTS: Dict[str, float] = {
+    "abstract": 3.0,
+    "doi": 2.0,
+    "authors": 1.0,
+    "year": 1.0,
+    "journal": 1.0,
+    "keywords": 1.0,
+    "volume": 0.5,
+    "issue": 0.5,
+    "pages": 0.5,
+}
+
+# Placeholder values written by the loaders for missing fields
+_EMPTY_VALUES = ("", "nan", "none", "nan-nan", "-")
+
+# Float slack when converting ratio thresholds into integer length bounds
+_EPS = 1e-9
+
+
+@dataclass
+class DedupPassStats:
+    """Counters and timings for one deduplication pass."""
+
+    name: str
+    records_in: int = 0
+    records_out: int = 0
+    total_pairs: int = 0
+    candidate_pairs: int = 0
+    verified_pairs: int = 0
+    matches: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def removed(self) -> int:
+        return self.records_in - self.records_out
+
+    @property
+    def pruned_pairs(self) -> int:
+        return self.total_pairs - self.candidate_pairs
+
+    @property
+    def elapsed(self) -> float:
+        return sum(self.timings.values())
+
+    def summary_lines(self) -> List[str]:
+        """Render the pass as report lines."""
+        lines = [
+            f"{self.name}: {self.records_in:,} -> {self.records_out:,} records "
+            f"({self.removed:,} removed) in {self.elapsed:.2f}s",
+        ]
+        if self.total_pairs:
+            pruned_pct = self.pruned_pairs / self.total_pairs * 100
+            lines.append(
+                f"  Pairs: {self.total_pairs:,} possible, {self.candidate_pairs:,} candidates, "
+                f"{self.pruned_pairs:,} pruned ({pruned_pct:.2f}%)"
+            )
+            lines.append(
+                f"  Verified with SequenceMatcher: {self.verified_pairs:,}, matches: {self.matches:,}"
+            )
+        for step, seconds in self.timings.items():
+            lines.append(f"  {step}: {seconds:.3f}s")
+        return lines
+
+
+def max_partner_length(length: int, threshold: float) -> int:
+    """Longest string that can still reach `threshold` against a string of `length`."""
+    return int(math.floor(length * (2 - threshold) / threshold + _EPS))
+
+
+def min_partner_length(length: int, threshold: float) -> int:
+    """Shortest string that can still reach `threshold` against a string of `length`."""
+    return int(math.ceil(length * threshold / (2 - threshold) - _EPS))
+
+
+def max_indel_distance(length: int, threshold: float) -> int:
+    """
+    Upper bound on the insert/delete distance to any partner reaching `threshold`.
+
+    ratio = 2M/T with M <= LCS, so indel distance T - 2*LCS <= T * (1 - ratio).
+    """
+    total = length + max_partner_length(length, threshold)
+    return int(math.floor(total * (1 - threshold) + _EPS))
+
+
+def qgram_tokens(text: str, q: int) -> List[Tuple[str, int]]:
+    """
+    Padded q-grams of `text`, tagged with their occurrence number.
+
+    Tagging turns the q-gram multiset into a set, so multiset overlap between
+    two titles equals plain set overlap of their tokens.
+    """
+    padded = PAD_CHAR * (q - 1) + text + PAD_CHAR * (q - 1)
+    seen: Dict[str, int] = {}
+    tokens = []
+    for k in range(len(padded) - q + 1):
+        gram = padded[k:k + q]
+        occurrence = seen.get(gram, 0)
+        seen[gram] = occurrence + 1
+        tokens.append((gram, occurrence))
+    return tokens
+
+
+def passes_bounds(a: str, b: str, threshold: float) -> Tuple[bool, Optional[SequenceMatcher]]:
+    """
+    Cheap upper-bound checks before the exact ratio.
+
+    With rapidfuzz installed the first check is the C-backed normalized Indel
+    similarity 2*LCS/T, which is never below SequenceMatcher.ratio(). It is
+    compared against the threshold here rather than through rapidfuzz's
+    score_cutoff, which rounds and rejects some pairs exactly on the
+    threshold.
+
+    Returns (may_match, matcher) so callers can reuse the matcher for ratio().
+    """
+    if Indel is not None and Indel.normalized_similarity(a, b) < threshold - _EPS:
+        return False, None
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < threshold:
+        return False, None
+    if matcher.quick_ratio() < threshold:
+        return False, None
+    return True, matcher
+
+
+class QGramTitleIndex:
+    """
+    Static inverted q-gram index for SequenceMatcher thresholds.
+
+    A pair reaching `threshold` differs by at most d insert/delete operations
+    and each operation destroys at most q of a title's q-grams, so the pair
+    shares at least max(|Qa|, |Qb|) - q*d q-grams (count filter). A probe
+    counts its shared q-grams with every length-compatible indexed title in
+    one vectorized pass (searchsorted over (token, title) keys + bincount),
+    so no pair below the bound ever reaches Python-level comparison.
+
+    Indexed titles are ordered by length so each probe only scans the slice
+    of every posting list that can pass the length bound.
+    """
+
+    def __init__(self, titles: Sequence[str], threshold: float = 0.90, q: int = 3):
+        """
+        Build index.
+
+        Args:
+            titles: Normalized titles; positions are the ids returned by queries.
+                Empty titles are never indexed (they never match).
+            threshold: Similarity threshold candidates must be able to reach (0-1)
+            q: Character q-gram length
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.q = q
+
+        positions = [pos for pos, title in enumerate(titles) if title]
+        positions.sort(key=lambda pos: len(titles[pos]))
+        self._positions = np.asarray(positions, dtype=np.int64)
+        self._lengths = np.asarray([len(titles[pos]) for pos in positions], dtype=np.int64)
+
+        self._vocab: Dict[Tuple[str, int], int] = {}
+        self._tokens: List[np.ndarray] = [self._encode(titles[pos], grow=True) for pos in positions]
+        self._n_tokens = np.asarray([len(t) for t in self._tokens], dtype=np.int64)
+
+        # Postings as one sorted array of keys token * n_titles + title
+        self._stride = max(1, len(positions))
+        owners = np.repeat(np.arange(len(positions), dtype=np.int64), self._n_tokens)
+        flat = np.concatenate(self._tokens) if self._tokens else np.empty(0, dtype=np.int64)
+        self._keys = np.sort(flat * self._stride + owners)
+        self._df = np.bincount(flat, minlength=len(self._vocab))
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _encode(self, title: str, grow: bool = False) -> np.ndarray:
+        """Token ids of `title`; tokens unknown to the index are dropped unless `grow`."""
+        vocab = self._vocab
+        ids = []
+        for token in qgram_tokens(title, self.q):
+            token_id = vocab.get(token)
+            if token_id is None:
+                if not grow:
+                    continue
+                token_id = vocab[token] = len(vocab)
+            ids.append(token_id)
+        return np.asarray(ids, dtype=np.int64)
+
+    def _probe(self, known: np.ndarray, n_tok: int, length: int,
+               start: int, stop: int) -> np.ndarray:
+        """
+        Internal ids in [start, stop) passing the count filter.
+
+        The most frequent half of the required overlap is skipped in the bulk
+        scan (those postings dominate scan volume); titles that could still
+        reach the bound are then completed with exact counts for the skipped
+        tokens.
+
+        Args:
+            known: Probe token ids present in the index
+            n_tok: Total q-gram count of the probe (including unknown tokens)
+            length: Probe title length
+            start, stop: Internal id window (already length-compatible)
+        """
+        if stop <= start:
+            return np.empty(0, dtype=np.int64)
+        window = slice(start, stop)
+        max_dist = np.floor((length + self._lengths[window]) * (1 - self.threshold) + _EPS)
+        required = np.maximum(n_tok, self._n_tokens[window]) - self.q * max_dist.astype(np.int64)
+
+        n_skip = max(0, int(required.min()) // 2)
+        by_frequency = known[np.argsort(-self._df[known], kind="stable")]
+        skipped, scanned = by_frequency[:n_skip], by_frequency[n_skip:]
+
+        shared = self._count_hits(scanned, start, stop)
+        survivors = np.flatnonzero(shared + len(skipped) >= required)
+        if len(skipped) and len(survivors):
+            probe_keys = skipped[:, None] * self._stride + (survivors + start)[None, :]
+            found = np.searchsorted(self._keys, probe_keys)
+            found = np.minimum(found, len(self._keys) - 1)
+            shared[survivors] += (self._keys[found] == probe_keys).sum(axis=0)
+            survivors = survivors[shared[survivors] >= required[survivors]]
+        return survivors + start
+
+    def _count_hits(self, tokens: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Shared-token counts of `tokens` with every indexed title in [start, stop)."""
+        base = tokens * self._stride
+        lo = np.searchsorted(self._keys, base + start)
+        hi = np.searchsorted(self._keys, base + stop)
+        sizes = hi - lo
+        total = int(sizes.sum())
+        if not total:
+            return np.zeros(stop - start, dtype=np.int64)
+        # Gather every key in [lo, hi) for all tokens at once
+        offsets = np.repeat(lo - np.cumsum(sizes) + sizes, sizes)
+        hit_keys = self._keys[offsets + np.arange(total)]
+        return np.bincount(hit_keys % self._stride - start, minlength=stop - start)
+
+    def _length_window(self, length: int) -> Tuple[int, int]:
+        """Internal id range of indexed titles passing the length bound."""
+        lo = min_partner_length(length, self.threshold)
+        hi = max_partner_length(length, self.threshold)
+        start = int(np.searchsorted(self._lengths, lo, side="left"))
+        stop = int(np.searchsorted(self._lengths, hi, side="right"))
+        return start, stop
+
+    def query(self, title: str) -> List[int]:
+        """
+        Positions of indexed titles that may reach the threshold against `title`.
+
+        Args:
+            title: Normalized title (need not be indexed)
+
+        Returns:
+            Sorted positions that passed the length and count filters
+        """
+        if not title:
+            return []
+        start, stop = self._length_window(len(title))
+        n_tok = len(title) + self.q - 1
+        found = self._probe(self._encode(title), n_tok, len(title), start, stop)
+        return sorted(int(pos) for pos in self._positions[found])
+
+    def candidate_pairs(self, cids: Optional[Iterable[int]] = None) -> Dict[int, List[int]]:
+        """
+        Self-join of the indexed titles.
+
+        Args:
+            cids: Internal ids to probe (default: all). Each probe only looks
+                at longer-or-equal titles after it, so disjoint id ranges
+                produce disjoint pair sets and can run in separate processes.
+
+        Returns:
+            Mapping position i -> sorted positions j > i that may match i
+        """
+        partners: Dict[int, List[int]] = defaultdict(list)
+        positions = self._positions
+        for cid in (range(len(positions)) if cids is None else cids):
+            length = int(self._lengths[cid])
+            _, stop = self._length_window(length)
+            found = self._probe(self._tokens[cid], int(self._n_tokens[cid]), length, cid + 1, stop)
+            this = int(positions[cid])
+            for other in positions[found]:
+                other = int(other)
+                if this < other:
+                    partners[this].append(other)
+                else:
+                    partners[other].append(this)
+        for i in partners:
+            partners[i].sort()
+        return dict(partners)
+
+
+def title_match(a: str, b: str, threshold: float) -> bool:
+    """True if ratio(a, b) >= threshold; empty titles never match."""
+    if not a or not b:
+        return False
+    may_match, matcher = passes_bounds(a, b, threshold)
+    return may_match and matcher.ratio() >= threshold
+
+
+def block_pairs(keys: Sequence[Iterable[str]],
+                max_block_size: Optional[int] = None,
+                uncapped: Iterable[str] = ()) -> Tuple[Set[Tuple[int, int]], int]:
+    """
+    Union of record pairs sharing at least one blocking key.
+
+    Args:
+        keys: Blocking keys per record (position = record id)
+        max_block_size: Skip blocks larger than this (None = no cap)
+        uncapped: Key prefixes exempt from the cap (e.g. a baseline key family)
+
+    Returns:
+        (set of (i, j) pairs with i < j, number of blocks skipped by the cap)
+    """
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for pos, record_keys in enumerate(keys):
+        for key in set(record_keys):
+            blocks[key].append(pos)
+
+    uncapped = tuple(uncapped)
+    pairs: Set[Tuple[int, int]] = set()
+    skipped = 0
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if (max_block_size is not None and len(members) > max_block_size
+                and not (uncapped and key.startswith(uncapped))):
+            skipped += 1
+            continue
+        pairs.update(combinations(members, 2))
+    return pairs, skipped
+
+
+def greedy_title_dedup(titles: Sequence[str], threshold: float,
+                       q: int = 3,
+                       stats: Optional[DedupPassStats] = None,
+                       workers: int = 1) -> Tuple[List[int], Set[int]]:
+    """
+    Keep-first fuzzy deduplication restricted to index candidates.
+
+    Walks records in input order exactly like the pairwise scan: a kept
+    record i marks every later, not-yet-removed record j with
+    ratio(title_i, title_j) >= threshold as removed.
+
+    Args:
+        titles: Normalized titles in input order
+        threshold: Minimum SequenceMatcher ratio for a duplicate
+        q: Character q-gram length for the index
+        stats: Optional stats object filled with pair counts and timings
+        workers: Processes for candidate generation and verification; with
+            more than one, all matches are computed in parallel first and
+            then resolved in input order (same result)
+
+    Returns:
+        (kept positions, removed positions)
+    """
+    stats = stats if stats is not None else DedupPassStats(name="title")
+    if workers > 1:
+        matches = title_match_pairs(titles, threshold, q=q, stats=stats, workers=workers)
+        t0 = time.perf_counter()
+        kept, removed = greedy_from_matches(len(titles), matches)
+        stats.timings["greedy_resolution"] = time.perf_counter() - t0
+        stats.matches = len(removed)
+        stats.records_out = len(kept)
+        return kept, removed
+
+    n = len(titles)
+    stats.records_in = n
+    stats.total_pairs = n * (n - 1) // 2
+
+    t0 = time.perf_counter()
+    index = QGramTitleIndex(titles, threshold=threshold, q=q)
+    stats.timings["index_build"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    partners = index.candidate_pairs()
+    stats.candidate_pairs = sum(len(js) for js in partners.values())
+    stats.timings["candidate_generation"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    kept: List[int] = []
+    removed: Set[int] = set()
+    for i in range(n):
+        if i in removed:
+            continue
+        kept.append(i)
+        for j in partners.get(i, ()):
+            if j in removed:
+                continue
+            may_match, matcher = passes_bounds(titles[i], titles[j], threshold)
+            if not may_match:
+                continue
+            stats.verified_pairs += 1
+            if matcher.ratio() >= threshold:
+                removed.add(j)
+                stats.matches += 1
+    stats.timings["verification"] = time.perf_counter() - t0
+    stats.records_out = len(kept)
+    return kept, removed
+
+
+def title_match_pairs(titles: Sequence[str], threshold: float, q: int = 3,
+                      stats: Optional[DedupPassStats] = None,
+                      workers: int = 1) -> List[Tuple[int, int]]:
+    """
+    Every (i, j), i < j, with ratio(title_i, title_j) >= threshold.
+
+    Unlike greedy_title_dedup this keeps pairs whose j matches an already
+    matched record, which clustering needs to see transitive chains.
+    With workers > 1 candidate generation and verification run in a
+    process pool; the sorted result is identical.
+    """
+    stats = stats if stats is not None else DedupPassStats(name="title")
+    n = len(titles)
+    stats.records_in = n
+    stats.total_pairs = n * (n - 1) // 2
+
+    t0 = time.perf_counter()
+    index = QGramTitleIndex(titles, threshold=threshold, q=q)
+    stats.timings["index_build"] = time.perf_counter() - t0
+
+    if workers > 1:
+        t0 = time.perf_counter()
+        chunks = [range(start, min(start + INDEX_CHUNK_SIZE, len(index)))
+                  for start in range(0, len(index), INDEX_CHUNK_SIZE)]
+        results = _run_chunks(_match_index_chunk, chunks, workers,
+                              {"index": index, "titles": titles, "threshold": threshold})
+        stats.candidate_pairs = sum(n_candidates for n_candidates, _ in results)
+        pairs = sorted(pair for _, matched in results for pair in matched)
+        stats.timings[f"parallel_match ({workers} workers)"] = time.perf_counter() - t0
+    else:
+        t0 = time.perf_counter()
+        partners = index.candidate_pairs()
+        stats.candidate_pairs = sum(len(js) for js in partners.values())
+        stats.timings["candidate_generation"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pairs = _verify_partners(partners, titles, threshold)
+        stats.timings["verification"] = time.perf_counter() - t0
+    stats.verified_pairs = stats.candidate_pairs
+    stats.matches = len(pairs)
+    return pairs
+
+
+def verify_pairs(titles: Sequence[str], pairs: Iterable[Tuple[int, int]], threshold: float,
+                 workers: int = 1) -> List[Tuple[int, int]]:
+    """
+    Candidate pairs whose titles reach the threshold, in sorted order.
+
+    Args:
+        titles: Normalized titles
+        pairs: Candidate (i, j) position pairs (e.g. from block_pairs)
+        threshold: Minimum SequenceMatcher ratio
+        workers: Processes for verification (1 = in-process)
+
+    Returns:
+        Sorted matching pairs; identical for any number of workers
+    """
+    pairs = sorted(pairs)
+    if workers <= 1 or len(pairs) < PAIR_CHUNK_SIZE:
+        return [(i, j) for i, j in pairs if title_match(titles[i], titles[j], threshold)]
+    chunks = [pairs[start:start + PAIR_CHUNK_SIZE] for start in range(0, len(pairs), PAIR_CHUNK_SIZE)]
+    results = _run_chunks(_match_pair_chunk, chunks, workers,
+                          {"titles": titles, "threshold": threshold})
+    return [pair for matched in results for pair in matched]
+
+
+def greedy_from_matches(n: int, matches: Iterable[Tuple[int, int]]) -> Tuple[List[int], Set[int]]:
+    """
+    Keep-first resolution of precomputed matches.
+
+    Gives the same result as greedy_title_dedup's verify-as-you-go loop,
+    because whether a pair matches does not depend on what was removed.
+
+    Returns:
+        (kept positions, removed positions)
+    """
+    partners: Dict[int, List[int]] = defaultdict(list)
+    for i, j in sorted(matches):
+        partners[i].append(j)
+    kept: List[int] = []
+    removed: Set[int] = set()
+    for i in range(n):
+        if i in removed:
+            continue
+        kept.append(i)
+        removed.update(partners.get(i, ()))
+    return kept, removed
+
+
+# Work unit sizes for the process pool: index probes per chunk (short titles
+# probe the widest windows, so small chunks keep workers balanced) and
+# candidate pairs per chunk
+INDEX_CHUNK_SIZE = 256
+PAIR_CHUNK_SIZE = 20000
+
+# Per-process state installed by _init_worker
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def _init_worker(state: Dict[str, object]):
+    _WORKER_STATE.update(state)
+
+
+def _run_chunks(func, chunks: List, workers: int, state: Dict[str, object]) -> List:
+    """Map `func` over chunks in a process pool; results keep chunk order."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(state,)) as pool:
+        return list(pool.map(func, chunks))
+
+
+def _verify_partners(partners: Dict[int, List[int]], titles: Sequence[str],
+                     threshold: float) -> List[Tuple[int, int]]:
+    return [(i, j) for i in sorted(partners) for j in partners[i]
+            if title_match(titles[i], titles[j], threshold)]
+
+
+def _match_index_chunk(cids: range) -> Tuple[int, List[Tuple[int, int]]]:
+    state = _WORKER_STATE
+    partners = state["index"].candidate_pairs(cids)
+    n_candidates = sum(len(js) for js in partners.values())
+    return n_candidates, _verify_partners(partners, state["titles"], state["threshold"])
+
+
+def _match_pair_chunk(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    titles, threshold = _WORKER_STATE["titles"], _WORKER_STATE["threshold"]
+    return [(i, j) for i, j in pairs if title_match(titles[i], titles[j], threshold)]
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with union by size and path halving."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+    def labels(self) -> np.ndarray:
+        """Cluster label per element: the smallest member of its set."""
+        roots = np.array([self.find(x) for x in range(len(self.parent))], dtype=np.int64)
+        first = np.full(len(roots), len(roots), dtype=np.int64)
+        np.minimum.at(first, roots, np.arange(len(roots)))
+        return first[roots]
+
+
+def parse_completeness_weights(spec: str) -> Dict[str, float]:
+    """
+    Parse 'abstract=3,doi=2' into a weights dict.
+
+    Raises:
+        ValueError: If an entry is not field=number
+    """
+    weights = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        column, sep, value = entry.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid completeness weight '{entry}' (expected field=number)")
+        weights[column.strip()] = float(value)
+    return weights
+
+
+def completeness_scores(records: pd.DataFrame,
+                        weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Weighted count of non-empty fields per record (missing columns score 0)."""
+    weights = weights if weights is not None else DEFAULT_COMPLETENESS_WEIGHTS
+    scores = np.zeros(len(records))
+    for column, weight in weights.items():
+        if column not in records.columns:
+            continue
+        values = records[column].astype(str).str.strip().str.lower()
+        filled = records[column].notna() & ~values.isin(_EMPTY_VALUES)
+        scores += weight * filled.to_numpy(dtype=float)
+    return scores
+
+
+def _join_unique(values: Iterable[str]) -> str:
+    parts = (p for v in values for p in str(v).split('; '))
+    return '; '.join(dict.fromkeys(parts))
+
+
+def collapse_clusters(records: pd.DataFrame, pairs: Iterable[Tuple[int, int]],
+                      weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Collapse each duplicate cluster to its most complete record.
+
+    Clusters are the connected components of `pairs` (positions into
+    `records`), so A~B and B~C end up together even if A and C differ.
+    The canonical record has the highest completeness score, ties going to
+    the earliest record. It inherits the union of the cluster's
+    source_database values and all members' lineage_ids, and gets
+    cluster_size (accumulated across passes). Output keeps the order of each cluster's first member.
+
+    Args:
+        records: Records to collapse
+        pairs: Matched (i, j) position pairs
+        weights: Field weights for completeness_scores
+
+    Returns:
+        One row per cluster, index reset
+    """
+    n = len(records)
+    uf = UnionFind(n)
+    for i, j in pairs:
+        uf.union(i, j)
+    labels = uf.labels()
+
+    scores = completeness_scores(records, weights)
+    positions = np.arange(n)
+    # Sort by cluster, best score first, earliest position first
+    order = np.lexsort((positions, -scores, labels))
+    canonical = order[np.r_[True, labels[order][1:] != labels[order][:-1]]] if n else order
+    canonical = canonical[np.argsort(labels[canonical], kind='stable')]
+
+    collapsed = records.iloc[canonical].reset_index(drop=True)
+    # Rows collapsed by an earlier pass already stand for several records
+    carried = (records['cluster_size'].fillna(1).to_numpy(dtype=float) if 'cluster_size' in records.columns
+               else np.ones(n))
+    sizes = np.bincount(labels, weights=carried, minlength=n).astype(np.int64)
+    collapsed['cluster_size'] = sizes[labels[canonical]]
+
+    multi = np.bincount(labels, minlength=n)[labels] > 1
+    if multi.any():
+        members = records.iloc[np.flatnonzero(multi)].assign(_label=labels[multi])
+        row_of = pd.Series(np.arange(len(canonical)), index=labels[canonical])
+        agg = {col: _join_unique if col == 'source_database' else '; '.join
+               for col in ('source_database', 'lineage_ids') if col in records.columns}
+        if agg:
+            merged = members.groupby('_label', sort=True).agg(
+                {col: (lambda s, f=f: f(s.astype(str))) for col, f in agg.items()})
+            rows = row_of.loc[merged.index].to_numpy()
+            for col in merged.columns:
+                collapsed.loc[rows, col] = merged[col].to_numpy()
+    return collapsed
+
+
+def cluster_table(collapsed: pd.DataFrame,
+                  weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    One audit row per duplicate cluster (size > 1) of a collapsed frame.
+
+    Columns: cluster_id, cluster_size, canonical_record, canonical_score,
+    title, doi, source_database, lineage_ids.
+    """
+    columns = ['cluster_id', 'cluster_size', 'canonical_record', 'canonical_score',
+               'title', 'doi', 'source_database', 'lineage_ids']
+    if 'cluster_size' not in collapsed.columns:
+        return pd.DataFrame(columns=columns)
+
+    dupes = collapsed[collapsed['cluster_size'] > 1]
+    table = pd.DataFrame({
+        'cluster_id': [f"CL{k:05d}" for k in range(1, len(dupes) + 1)],
+        'cluster_size': dupes['cluster_size'].to_numpy(),
+        'canonical_record': (dupes['source_record_id'] if 'source_record_id' in dupes.columns
+                             else dupes.index.to_series()).to_numpy(),
+        'canonical_score': completeness_scores(dupes, weights),
+    })
+    for col in columns[4:]:
+        table[col] = dupes[col].to_numpy() if col in dupes.columns else ''
+    return table
+
+
+class CorpusTitleIndex:
+    """
+    Persisted title/DOI index of an already deduplicated corpus.
+
+    Titles live in immutable QGramTitleIndex segments. Adding records
+    builds a segment over just those records, so an incremental update
+    costs time proportional to the new records; segments are merged once
+    there are more than MAX_SEGMENTS of them.
+    """
+
+    FORMAT_VERSION = 1
+    MAX_SEGMENTS = 8
+
+    def __init__(self, threshold: float = 0.90, q: int = 3):
+        self.threshold = threshold
+        self.q = q
+        self.titles: List[str] = []
+        self.dois: Set[str] = set()
+        self.columns: List[str] = []
+        self.next_record_number: Optional[int] = None
+        self.corpus_sha256: Optional[str] = None
+        self._segments: List[Tuple[int, QGramTitleIndex]] = []
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @property
+    def n_segments(self) -> int:
+        return len(self._segments)
+
+    def add(self, titles: Sequence[str], dois: Iterable[str] = ()):
+        """
+        Add normalized titles (and their DOIs) as one new segment.
+
+        Args:
+            titles: Normalized titles of records appended to the corpus
+            dois: Their DOIs (blank values are ignored)
+        """
+        titles = list(titles)
+        self.dois.update(d for d in dois if isinstance(d, str) and d)
+        if not titles:
+            return
+        offset = len(self.titles)
+        self.titles.extend(titles)
+        self._segments.append((offset, QGramTitleIndex(titles, threshold=self.threshold, q=self.q)))
+        if len(self._segments) > self.MAX_SEGMENTS:
+            self.compact()
+
+    def compact(self):
+        """Rebuild all segments as one index."""
+        self._segments = [(0, QGramTitleIndex(self.titles, threshold=self.threshold, q=self.q))]
+
+    def find_title_match(self, title: str) -> Optional[int]:
+        """
+        Corpus position of the first title reaching the threshold, if any.
+
+        The corpus title is the first argument of the ratio, as it precedes
+        every new record.
+        """
+        for offset, segment in self._segments:
+            for pos in segment.query(title):
+                if title_match(self.titles[offset + pos], title, self.threshold):
+                    return offset + pos
+        return None
+
+    def matches(self, corpus_path: Path) -> bool:
+        """True if the index was saved for exactly this corpus file."""
+        return self.corpus_sha256 is not None and self.corpus_sha256 == file_sha256(corpus_path)
+
+    def save(self, path: Path):
+        """Pickle the index (titles, DOIs and q-gram segments) atomically."""
+        state = {
+            "format_version": self.FORMAT_VERSION,
+            "threshold": self.threshold,
+            "q": self.q,
+            "titles": self.titles,
+            "dois": self.dois,
+            "columns": self.columns,
+            "next_record_number": self.next_record_number,
+            "corpus_sha256": self.corpus_sha256,
+            "segments": self._segments,
+        }
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, threshold: Optional[float] = None) -> "CorpusTitleIndex":
+        """
+        Load a saved index.
+
+        Args:
+            path: File written by save()
+            threshold: Threshold the caller will use; if it differs from the
+                saved one the q-gram segments are rebuilt from the titles
+
+        Raises:
+            ValueError: If the file has an unknown format version
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("format_version") != cls.FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported corpus index format {state.get('format_version')}")
+
+        index = cls(threshold=state["threshold"], q=state["q"])
+        index.titles = state["titles"]
+        index.dois = state["dois"]
+        index.columns = state["columns"]
+        index.next_record_number = state["next_record_number"]
+        index.corpus_sha256 = state.get("corpus_sha256")
+        index._segments = state["segments"]
+        if threshold is not None and threshold != index.threshold:
+            logger.warning("Corpus index built for threshold %.2f; rebuilding for %.2f",
+                           index.threshold, threshold)
+            index.threshold = threshold
+            index.compact()
+        return index
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def next_record_number(record_ids: Iterable[str], prefix: str = "REC_") -> Optional[int]:
+    """1 + the largest numeric suffix of `prefix`-style record ids (None if none match)."""
+    pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$")
+    numbers = [int(m.group(1)) for m in (pattern.match(str(r)) for r in record_ids) if m]
+    return max(numbers) + 1 if numbers else None
@@ -6,26 +6,74 @@ Uses DOI exact matching and fuzzy title matching.
 
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
+import os
+import shutil
+import time
 from difflib import SequenceMatcher
 
+from dedup_engine import (
+    DEDUP_MODES,
+    CorpusTitleIndex,
+    DedupPassStats,
+    cluster_table,
+    collapse_clusters,
+    file_sha256,
+    greedy_title_dedup,
+    next_record_number,
+    parse_completeness_weights,
+    title_match_pairs,
+)
+
 logger = logging.getLogger(__name__)
 
+try:
+    import pyarrow  # noqa: F401  (enables the multithreaded read_csv engine)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+
+TITLE_ENGINES = ("indexed", "pairwise")
+
 
 class RecordDeduplicator:
     """Deduplicates and merges records from multiple database searches."""
 
-    def __init__(self, title_similarity_threshold: float = 0.90):
+    def __init__(self, title_similarity_threshold: float = 0.90, engine: str = "indexed",
+                 mode: str = "greedy", completeness_weights: Optional[Dict[str, float]] = None,
+                 workers: int = 1):
         """
         Initialize deduplicator.
 
         Args:
             title_similarity_threshold: Minimum similarity for title matching (0-1)
+            engine: Fuzzy title engine: "indexed" (q-gram index, candidate pairs
+                only) or "pairwise" (exhaustive comparison of every pair)
+            mode: "greedy" keeps the first record of each match, "cluster"
+                collapses union-find clusters to their most complete record
+            completeness_weights: Field weights for choosing the canonical
+                record in cluster mode (default: DEFAULT_COMPLETENESS_WEIGHTS)
+            workers: Processes for the indexed engine's candidate generation
+                and verification (results are identical for any value)
         """
+        if engine not in TITLE_ENGINES:
+            raise ValueError(f"Unknown title engine '{engine}'; expected one of {TITLE_ENGINES}")
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode '{mode}'; expected one of {DEDUP_MODES}")
         self.title_similarity_threshold = title_similarity_threshold
+        self.engine = engine
+        self.mode = mode
+        self.completeness_weights = completeness_weights
+        self.workers = workers
         self.required_columns = ["title"]
         self.optional_columns = ["abstract", "keywords", "year", "doi"]
+        # Standardized metadata kept when present; anything else is not parsed
+        self.passthrough_columns = ["record_id", "authors", "journal", "volume", "issue",
+                                    "pages", "language", "issn", "doc_type"]
+        self.original_counts: Dict[str, int] = {}
+        self.pass_stats: List[DedupPassStats] = []
 
     def validate_schema(self, df: pd.DataFrame, db_name: str):
         """Validate minimum schema and normalize optional columns."""
@@ -92,6 +140,7 @@ class RecordDeduplicator:
             Deduplicated DataFrame
         """
         logger.info(f"Starting with {len(records)} records")
+        t0 = time.perf_counter()
 
         # Remove records without DOI first
         has_doi = records[records['doi'].notna() & (records['doi'] != '')]
@@ -102,13 +151,28 @@ class RecordDeduplicator:
 
         # Deduplicate by DOI
         before_dedup = len(has_doi)
-        has_doi_dedup = has_doi.drop_duplicates(subset=['doi'], keep='first')
+        if self.mode == "cluster":
+            has_doi = has_doi.reset_index(drop=True)
+            groups = has_doi.groupby('doi', sort=False).indices.values()
+            pairs = [(g[0], k) for g in groups for k in g[1:]]
+            has_doi_dedup = collapse_clusters(has_doi, pairs, self.completeness_weights)
+        else:
+            has_doi_dedup = has_doi.drop_duplicates(subset=['doi'], keep='first')
         doi_duplicates_removed = before_dedup - len(has_doi_dedup)
 
         logger.info(f"Removed {doi_duplicates_removed} DOI duplicates")
 
         # Combine back
         deduplicated = pd.concat([has_doi_dedup, no_doi], ignore_index=True)
+        if self.mode == "cluster":
+            deduplicated['cluster_size'] = deduplicated['cluster_size'].fillna(1).astype(int)
+
+        self.pass_stats.append(DedupPassStats(
+            name="DOI exact match",
+            records_in=len(records),
+            records_out=len(deduplicated),
+            timings={"doi_match": time.perf_counter() - t0},
+        ))
 
         return deduplicated
 
@@ -126,7 +190,150 @@ class RecordDeduplicator:
             logger.warning("No 'title' column found")
             return records
 
-        logger.info(f"Fuzzy deduplication on {len(records)} records")
+        logger.info(f"Fuzzy deduplication on {len(records)} records ({self.engine} engine)")
+
+        if self.mode == "cluster":
+            return self._cluster_by_title(records)
+
+        if self.engine == "pairwise":
+            return self._deduplicate_by_title_pairwise(records)
+
+        stats = DedupPassStats(name="Fuzzy title match")
+        t0 = time.perf_counter()
+        titles = [self.normalize_title(t) for t in records['title']]
+        stats.timings["normalize"] = time.perf_counter() - t0
+
+        kept, removed = greedy_title_dedup(titles, self.title_similarity_threshold, stats=stats,
+                                           workers=self.workers)
+        self.pass_stats.append(stats)
+
+        logger.info(f"Removed {len(removed)} fuzzy title duplicates")
+        logger.info(
+            f"Candidate pairs: {stats.candidate_pairs:,} of {stats.total_pairs:,} "
+            f"({stats.pruned_pairs:,} pruned) in {stats.elapsed:.2f}s"
+        )
+
+        return records.iloc[kept].reset_index(drop=True)
+
+    def _cluster_by_title(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Collapse union-find clusters of all above-threshold title pairs."""
+        records = records.reset_index(drop=True)
+        stats = DedupPassStats(name="Fuzzy title clusters")
+        t0 = time.perf_counter()
+
+        if self.engine == "pairwise":
+            n = len(records)
+            titles = records['title'].tolist()
+            pairs = [(i, j) for i in range(n) for j in range(i + 1, n)
+                     if self.title_similarity(titles[i], titles[j]) >= self.title_similarity_threshold]
+            stats.records_in = n
+            stats.total_pairs = stats.candidate_pairs = n * (n - 1) // 2
+            stats.matches = len(pairs)
+            stats.timings["pairwise_scan"] = time.perf_counter() - t0
+        else:
+            titles = [self.normalize_title(t) for t in records['title']]
+            stats.timings["normalize"] = time.perf_counter() - t0
+            pairs = title_match_pairs(titles, self.title_similarity_threshold, stats=stats,
+                                      workers=self.workers)
+
+        t0 = time.perf_counter()
+        clustered = collapse_clusters(records, pairs, self.completeness_weights)
+        stats.timings["clustering"] = time.perf_counter() - t0
+        stats.records_out = len(clustered)
+        self.pass_stats.append(stats)
+
+        logger.info(f"Collapsed {len(records) - len(clustered)} fuzzy title duplicates "
+                    f"from {stats.matches:,} matched pairs")
+        return clustered
+
+    def build_corpus_index(self, corpus: pd.DataFrame) -> CorpusTitleIndex:
+        """
+        Index an already deduplicated corpus for incremental updates.
+
+        Args:
+            corpus: Deduplicated records (e.g. deduplicated_16189.csv)
+
+        Returns:
+            CorpusTitleIndex over the corpus titles and DOIs
+        """
+        index = CorpusTitleIndex(threshold=self.title_similarity_threshold)
+        index.columns = list(corpus.columns)
+        if 'record_id' in corpus.columns:
+            index.next_record_number = next_record_number(corpus['record_id'])
+        dois = corpus['doi'].dropna().astype(str) if 'doi' in corpus.columns else []
+        index.add([self.normalize_title(t) for t in corpus['title']], dois)
+        logger.info(f"Indexed corpus: {len(index):,} titles, {len(index.dois):,} DOIs")
+        return index
+
+    def deduplicate_incremental(self, new_records: pd.DataFrame,
+                                corpus_index: CorpusTitleIndex) -> pd.DataFrame:
+        """
+        Deduplicate new records against an indexed corpus and among themselves.
+
+        Corpus records always win: the batch loses its DOI duplicates
+        (within the batch, then against the corpus), then records whose
+        title matches a corpus title, then fuzzy duplicates within the
+        batch. Only the new records are scanned. The surviving records get
+        the next record_ids and are added to `corpus_index`.
+
+        Args:
+            new_records: Merged records from the new exports
+            corpus_index: Index from build_corpus_index or CorpusTitleIndex.load
+
+        Returns:
+            New unique records, in the corpus column layout
+        """
+        if self.mode != "greedy":
+            raise ValueError("Incremental deduplication supports greedy mode only")
+
+        records = self.deduplicate_by_doi(new_records)
+
+        t0 = time.perf_counter()
+        has_doi = records['doi'].notna() & (records['doi'] != '')
+        known_doi = has_doi & records['doi'].astype(str).isin(corpus_index.dois)
+        records = records[~known_doi].reset_index(drop=True)
+
+        titles = [self.normalize_title(t) for t in records['title']]
+        in_corpus = [bool(t) and corpus_index.find_title_match(t) is not None for t in titles]
+        records = records[[not hit for hit in in_corpus]].reset_index(drop=True)
+        self.pass_stats.append(DedupPassStats(
+            name="Corpus match (DOI + title)",
+            records_in=len(in_corpus) + int(known_doi.sum()),
+            records_out=len(records),
+            matches=int(known_doi.sum()) + sum(in_corpus),
+            timings={"corpus_lookup": time.perf_counter() - t0},
+        ))
+        logger.info(f"Already in corpus: {int(known_doi.sum())} by DOI, {sum(in_corpus)} by title")
+
+        records = self.deduplicate_by_title(records)
+
+        if corpus_index.next_record_number is not None:
+            start = corpus_index.next_record_number
+            records['record_id'] = [f"REC_{n:05d}" for n in range(start, start + len(records))]
+            corpus_index.next_record_number = start + len(records)
+        if corpus_index.columns:
+            records = records.reindex(columns=corpus_index.columns, fill_value='')
+
+        corpus_index.add([self.normalize_title(t) for t in records['title']],
+                         records['doi'].dropna().astype(str) if 'doi' in records.columns else [])
+        logger.info(f"New unique records: {len(records)} (corpus now {len(corpus_index):,})")
+        return records
+
+    def save_cluster_report(self, final_df: pd.DataFrame, output_path: Path):
+        """
+        Write one row per duplicate cluster for PRISMA auditing.
+
+        Args:
+            final_df: Output of cluster-mode deduplication
+            output_path: Path to save the cluster CSV
+        """
+        table = cluster_table(final_df, self.completeness_weights)
+        table.to_csv(output_path, index=False)
+        logger.info(f"Cluster report ({len(table)} clusters) saved to {output_path}")
+
+    def _deduplicate_by_title_pairwise(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Exhaustive O(n^2) title comparison (reference implementation)."""
+        t0 = time.perf_counter()
 
         # Track which records to keep
         keep_indices = []
@@ -153,8 +360,38 @@ class RecordDeduplicator:
 
         deduplicated = records.loc[keep_indices].reset_index(drop=True)
 
+        n = len(records)
+        self.pass_stats.append(DedupPassStats(
+            name="Fuzzy title match",
+            records_in=n,
+            records_out=len(deduplicated),
+            total_pairs=n * (n - 1) // 2,
+            candidate_pairs=n * (n - 1) // 2,
+            matches=len(skip_indices),
+            timings={"pairwise_scan": time.perf_counter() - t0},
+        ))
+
         return deduplicated
 
+    def read_export(self, file_path: Path) -> pd.DataFrame:
+        """
+        Parse one export, limited to the known schema columns, as text.
+
+        Only the header is read to pick the columns; the body is parsed once
+        (pyarrow engine when installed) with every column as string, so DOIs,
+        years and page ranges keep their exact text.
+
+        Args:
+            file_path: Path to CSV file
+
+        Returns:
+            DataFrame with the schema columns present in the file
+        """
+        header = pd.read_csv(file_path, nrows=0).columns
+        schema = self.required_columns + self.optional_columns + self.passthrough_columns
+        usecols = [c for c in header if c in schema]
+        return pd.read_csv(file_path, usecols=usecols, dtype=str, engine=CSV_ENGINE)
+
     def merge_databases(self, database_files: List[Path],
                        database_names: List[str]) -> pd.DataFrame:
         """
@@ -165,17 +402,19 @@ class RecordDeduplicator:
             database_names: List of database names (same order as files)
 
         Returns:
-            Merged DataFrame with source tracking
+            Merged DataFrame with source tracking. Per-database record counts
+            from the same read are kept in self.original_counts.
         """
         all_records = []
 
         for file_path, db_name in zip(database_files, database_names):
             logger.info(f"Loading {db_name}: {file_path}")
 
-            df = pd.read_csv(file_path)
+            df = self.read_export(file_path)
+            self.original_counts[db_name] = len(df)
             self.validate_schema(df, db_name)
             df['source_database'] = db_name
-            df['source_record_id'] = [f"{db_name}:{i+1}" for i in range(len(df))]
+            df['source_record_id'] = db_name + ':' + pd.Series(range(1, len(df) + 1), index=df.index).astype(str)
             df['lineage_ids'] = df['source_record_id']
 
             all_records.append(df)
@@ -228,7 +467,19 @@ class RecordDeduplicator:
             "LINEAGE",
             "-" * 60,
             "Each kept record carries source provenance in source_record_id and lineage_ids.",
-            "",
+            ""
+        ])
+
+        if self.pass_stats:
+            report_lines.extend([
+                "PASS STATISTICS",
+                "-" * 60
+            ])
+            for stats in self.pass_stats:
+                report_lines.extend(stats.summary_lines())
+            report_lines.append("")
+
+        report_lines.extend([
             "SOURCES OF FINAL RECORDS",
             "-" * 60
         ])
@@ -245,6 +496,44 @@ class RecordDeduplicator:
         logger.info(f"Deduplication report saved to {output_path}")
 
 
+def run_incremental(deduplicator: RecordDeduplicator, merged_df: pd.DataFrame,
+                    original_counts: Dict[str, int], args):
+    """Dedup new exports against --corpus, append the uniques and update its index."""
+    corpus_path = Path(args.corpus)
+    index_path = Path(args.corpus_index) if args.corpus_index else \
+        corpus_path.with_name(corpus_path.name + ".index.pkl")
+
+    corpus_index = None
+    if index_path.exists():
+        corpus_index = CorpusTitleIndex.load(index_path, threshold=args.threshold)
+        if corpus_index.matches(corpus_path):
+            logger.info(f"Loaded corpus index {index_path} ({len(corpus_index):,} titles)")
+        else:
+            logger.warning(f"Corpus index {index_path} does not match {corpus_path} (edited, regenerated "
+                           f"or an interrupted run); rebuilding")
+            corpus_index = None
+    if corpus_index is None:
+        if not index_path.exists():
+            logger.info(f"No corpus index at {index_path}; building from {corpus_path}")
+        corpus_index = deduplicator.build_corpus_index(pd.read_csv(corpus_path))
+
+    new_uniques = deduplicator.deduplicate_incremental(merged_df, corpus_index)
+
+    # Grow a copy of the corpus, commit the index describing it, then swap
+    # the copy in. An interruption leaves either the old corpus and index or
+    # an index whose hash no longer matches, which the next run rebuilds.
+    grown = corpus_path.with_name(corpus_path.name + ".tmp")
+    shutil.copyfile(corpus_path, grown)
+    new_uniques.to_csv(grown, mode='a', header=False, index=False)
+    corpus_index.corpus_sha256 = file_sha256(grown)
+    corpus_index.save(index_path)
+    os.replace(grown, corpus_path)
+    new_uniques.to_csv(args.output, index=False)
+    logger.info(f"Appended {len(new_uniques)} records to {corpus_path}; new records saved to {args.output}")
+
+    deduplicator.generate_dedup_report(original_counts, new_uniques, Path(args.report))
+
+
 def main():
     """Main entry point for deduplication."""
     import argparse
@@ -255,11 +544,27 @@ def main():
     parser.add_argument('--output', required=True, help='Path to output merged CSV file')
     parser.add_argument('--report', default='dedup_report.txt', help='Path to deduplication report')
     parser.add_argument('--threshold', type=float, default=0.90, help='Title similarity threshold (0-1)')
+    parser.add_argument('--engine', choices=TITLE_ENGINES, default='indexed',
+                        help='Fuzzy title engine (indexed: q-gram candidate index; pairwise: exhaustive scan)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for the indexed title engine (default: 1)')
+    parser.add_argument('--corpus', default=None,
+                        help='Existing deduplicated CSV; new uniques are appended to it (incremental mode)')
+    parser.add_argument('--corpus-index', default=None,
+                        help='Persisted corpus index (default: <corpus>.index.pkl; built if missing)')
+    parser.add_argument('--mode', choices=DEDUP_MODES, default='greedy',
+                        help='greedy: keep first of each match; cluster: collapse union-find clusters')
+    parser.add_argument('--completeness-weights', default=None,
+                        help='Canonical record weights for cluster mode, e.g. "abstract=3,doi=2,year=1"')
+    parser.add_argument('--cluster-report', default=None,
+                        help='Path to cluster CSV (cluster mode; default: <output>_clusters.csv)')
 
     args = parser.parse_args()
 
     if len(args.inputs) != len(args.names):
         parser.error("Number of inputs must match number of names")
+    if args.corpus and args.mode != 'greedy':
+        parser.error("--corpus (incremental mode) supports --mode greedy only")
 
     # Setup logging
     logging.basicConfig(
@@ -268,14 +573,21 @@ def main():
     )
 
     # Initialize deduplicator
-    deduplicator = RecordDeduplicator(title_similarity_threshold=args.threshold)
+    weights = parse_completeness_weights(args.completeness_weights) if args.completeness_weights else None
+    deduplicator = RecordDeduplicator(title_similarity_threshold=args.threshold, engine=args.engine,
+                                      mode=args.mode, completeness_weights=weights,
+                                      workers=args.workers)
 
     # Load and merge databases
     input_paths = [Path(p) for p in args.inputs]
     merged_df = deduplicator.merge_databases(input_paths, args.names)
 
-    # Track original counts
-    original_counts = dict(zip(args.names, [len(pd.read_csv(p)) for p in input_paths]))
+    # Original counts come from the same single read
+    original_counts = dict(deduplicator.original_counts)
+
+    if args.corpus:
+        run_incremental(deduplicator, merged_df, original_counts, args)
+        return
 
     # Deduplicate by DOI
     merged_df = deduplicator.deduplicate_by_doi(merged_df)
@@ -287,6 +599,12 @@ def main():
     merged_df.to_csv(args.output, index=False)
     logger.info(f"Merged and deduplicated results saved to {args.output}")
 
+    if args.mode == "cluster":
+        output = Path(args.output)
+        cluster_path = Path(args.cluster_report) if args.cluster_report else \
+            output.with_name(f"{output.stem}_clusters.csv")
+        deduplicator.save_cluster_report(merged_df, cluster_path)
+
     # Generate report
     deduplicator.generate_dedup_report(
         original_counts,
@@ -43,6 +43,89 @@ def parse_args():
     return parser.parse_args()
 
 
+def find_screening_sheet(wb):
+    """Name of the SCREENING sheet (case-insensitive), or None."""
+    for name in wb.sheetnames:
+        if name.strip().upper() == "SCREENING":
+            return name
+    return None
+
+
+def read_sheet_columns(ws, col_index, columns):
+    """Read the data rows of ``columns`` into a DataFrame indexed by XLSX row number."""
+    data = {}
+    for name in columns:
+        col = col_index[name]
+        (values,) = ws.iter_cols(
+            min_col=col, max_col=col, min_row=2, max_row=ws.max_row, values_only=True
+        )
+        data[name] = pd.Series(values, dtype=object)
+    frame = pd.DataFrame(data)
+    frame.index = range(2, 2 + len(frame))
+    return frame
+
+
+def is_empty(values):
+    """Vectorized version of the resume-safe check: None or whitespace-only."""
+    return values.isna() | values.astype(str).str.strip().eq("")
+
+
+def compute_updates(df, sheet, columns):
+    """Join the CSV to the sheet on record_id and collect the cells to write.
+
+    Only empty cells in ``columns`` are filled, and only with non-empty CSV
+    values; a record_id repeated in the CSV or the sheet uses its last row,
+    as the row-by-row merge did.
+
+    Returns:
+        (updates, stats): ``updates`` maps column name to a Series of new
+        values indexed by XLSX row number; ``stats`` holds the record/cell
+        counts printed in the merge summary.
+    """
+    csv_ids = df["record_id"].astype(str).str.strip()
+    csv = df.assign(record_id=csv_ids).drop_duplicates("record_id", keep="last").set_index("record_id")
+
+    sheet_ids = sheet["record_id"]
+    sheet_ids = sheet_ids[sheet_ids.notna()].astype(str).str.strip()
+    row_of = pd.Series(sheet_ids.index, index=sheet_ids.values)
+    row_of = row_of[~row_of.index.duplicated(keep="last")]
+
+    order = csv_ids.drop_duplicates()
+    matched = order[order.isin(row_of.index)]
+    rows = row_of.loc[matched].to_numpy()
+
+    updates = {}
+    cells_updated = 0
+    cells_skipped = 0
+    for col_name in columns:
+        if col_name not in csv.columns:
+            continue
+        filled = ~is_empty(sheet.loc[rows, col_name]).to_numpy()
+        new = csv.loc[matched, col_name]
+        write = ~filled & new.notna().to_numpy()
+        cells_skipped += int(filled.sum())
+        cells_updated += int(write.sum())
+        if write.any():
+            updates[col_name] = pd.Series(new.to_numpy(dtype=object)[write], index=rows[write])
+
+    stats = {
+        "records": len(order),
+        "matched": len(matched),
+        "unmatched_ids": order[~order.isin(row_of.index)].tolist(),
+        "cells_updated": cells_updated,
+        "cells_skipped": cells_skipped,
+    }
+    return updates, stats
+
+
+def write_updates(ws, col_index, updates):
+    """Apply ``compute_updates`` output one column at a time."""
+    for col_name, values in updates.items():
+        col = col_index[col_name]
+        for row_num, value in zip(values.index.tolist(), values.tolist()):
+            ws.cell(row=row_num, column=col).value = value
+
+
 def main():
     args = parse_args()
 
@@ -58,15 +141,9 @@ def main():
         print("ERROR: CSV does not have a 'record_id' column.", file=sys.stderr)
         sys.exit(1)
 
-    # Build a dict: record_id -> row (as dict of col->value)
-    csv_records = {}
-    for _, row in df.iterrows():
-        rid = str(row["record_id"]).strip()
-        csv_records[rid] = row
-
-    print(f"  Loaded {len(csv_records)} records from CSV.")
+    print(f"  Loaded {len(df)} rows from CSV.")
 
-    # Open existing XLSX
+    # Open existing XLSX (read-write: read-only workbooks cannot be saved)
     print(f"Opening XLSX: {args.xlsx}")
     try:
         wb = openpyxl.load_workbook(args.xlsx)
@@ -74,13 +151,7 @@ def main():
         print(f"ERROR: XLSX file not found: {args.xlsx}", file=sys.stderr)
         sys.exit(1)
 
-    # Find SCREENING sheet (case-insensitive)
-    sheet_name = None
-    for name in wb.sheetnames:
-        if name.strip().upper() == "SCREENING":
-            sheet_name = name
-            break
-
+    sheet_name = find_screening_sheet(wb)
     if sheet_name is None:
         print(
             f"ERROR: No 'SCREENING' sheet found. Available sheets: {wb.sheetnames}",
@@ -94,17 +165,12 @@ def main():
     # Read header row (row 1) to build column name -> col index mapping
     header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
     col_index = {}  # col_name -> 1-based column number
-    record_id_col = None
-
     for idx, cell_val in enumerate(header_row, start=1):
         if cell_val is None:
             continue
-        name = str(cell_val).strip()
-        col_index[name] = idx
-        if name == "record_id":
-            record_id_col = idx
+        col_index[str(cell_val).strip()] = idx
 
-    if record_id_col is None:
+    if "record_id" not in col_index:
         print(
             "ERROR: 'record_id' column not found in SCREENING sheet header row.",
             file=sys.stderr,
@@ -120,52 +186,16 @@ def main():
 
     present_ai_cols = [c for c in AI_COLUMNS if c in col_index]
 
-    # Build mapping: record_id -> xlsx row number
-    print("  Building record_id -> row mapping from XLSX...")
-    xlsx_row_map = {}  # record_id str -> row number (1-based, excluding header)
-    for row in ws.iter_rows(min_row=2):
-        rid_cell = row[record_id_col - 1]
-        if rid_cell.value is not None:
-            rid = str(rid_cell.value).strip()
-            xlsx_row_map[rid] = rid_cell.row
-
-    print(f"  Found {len(xlsx_row_map)} records in XLSX SCREENING sheet.")
-
-    # Merge
-    matched = 0
-    cells_updated = 0
-    cells_skipped = 0
-    unmatched_ids = []
-
-    for rid, csv_row in csv_records.items():
-        if rid not in xlsx_row_map:
-            unmatched_ids.append(rid)
-            continue
-
-        matched += 1
-        xlsx_row_num = xlsx_row_map[rid]
-
-        for col_name in present_ai_cols:
-            if col_name not in csv_row.index:
-                continue
-
-            csv_val = csv_row[col_name]
-            # Treat NaN as empty
-            if pd.isna(csv_val):
-                csv_val = None
-
-            col_num = col_index[col_name]
-            cell = ws.cell(row=xlsx_row_num, column=col_num)
-
-            existing = cell.value
-            # Skip if cell already has a value (resume-safe)
-            if existing is not None and str(existing).strip() != "":
-                cells_skipped += 1
-                continue
+    # Read record_id + AI columns column-wise, join with the CSV in pandas
+    sheet = read_sheet_columns(ws, col_index, ["record_id"] + present_ai_cols)
+    print(f"  Found {sheet['record_id'].notna().sum()} records in XLSX SCREENING sheet.")
 
-            if csv_val is not None:
-                cell.value = csv_val
-                cells_updated += 1
+    updates, stats = compute_updates(df, sheet, present_ai_cols)
+    write_updates(ws, col_index, updates)
+    matched = stats["matched"]
+    cells_updated = stats["cells_updated"]
+    cells_skipped = stats["cells_skipped"]
+    unmatched_ids = stats["unmatched_ids"]
 
     # Save
     print(f"Saving XLSX: {args.xlsx}")
@@ -173,7 +203,7 @@ def main():
 
     # Summary
     print("\n--- Merge Summary ---")
-    print(f"  Records in CSV       : {len(csv_records)}")
+    print(f"  Records in CSV       : {stats['records']}")
     print(f"  Records matched      : {matched}")
     print(f"  Records unmatched    : {len(unmatched_ids)}")
     print(f"  Cells updated        : {cells_updated}")
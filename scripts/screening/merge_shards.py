@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Combine the outputs of a sharded screening run.
+
+Each machine screens one ``--shard i/N`` of the input with
+ai_screening_tiered.py or ai_screening_parallel.py. This concatenates the
+shard outputs in input order and verifies that together they cover every
+input record exactly once: no duplicate record_id, no missing or unknown
+records and, with --shards N, one output per shard. The merged CSV is only
+written when the check passes (or with --allow-incomplete); the exit status
+is non-zero otherwise.
+
+Usage:
+    python scripts/screening/merge_shards.py shard1.csv shard2.csv shard3.csv \\
+        --records data/02_processed/screening_master_16189.csv --shards 3 \\
+        --output data/03_screening/screening_ai_dual.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+from screening_engine import load_records, merge_shards
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge shard outputs and verify full coverage")
+    parser.add_argument("shards", type=str, nargs="+", help="Shard output CSVs")
+    parser.add_argument("--output", type=str, required=True, help="Merged output CSV")
+    parser.add_argument("--records", type=str, default=None, help="Input records CSV the shards were cut from")
+    parser.add_argument("--shards", dest="count", type=int, default=None, help="Number of shards N")
+    parser.add_argument(
+        "--allow-incomplete", action="store_true",
+        help="Write the merged output even if the coverage check fails",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    records = load_records(args.records) if args.records else None
+    if records is None:
+        logger.warning("No --records given: missing records cannot be detected")
+    merged, report = merge_shards(args.shards, records=records, count=args.count)
+    logger.info("Coverage: %s", report.summary())
+    if not report.ok and not args.allow_incomplete:
+        logger.error("Shard outputs do not cover the input exactly once; nothing written")
+        sys.exit(1)
+
+    tmp = Path(args.output).with_name(Path(args.output).name + ".tmp")
+    merged.to_csv(tmp, index=False)
+    os.replace(tmp, args.output)
+    logger.info("Merged %s rows from %s shards into %s", len(merged), len(args.shards), args.output)
+    if not report.ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
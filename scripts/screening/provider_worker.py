@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Long-lived screening worker speaking the ``screening_engine.workers`` protocol.
+
+Reads one JSON request per line on stdin and answers each with one JSON line
+on stdout, reusing a single in-process API client so every call skips CLI
+start-up, auth and config load. Run one process per pool slot via
+``screening_cli.<provider>.worker_cmd`` and ``--persistent-workers N``.
+
+Backends (API keys from the environment):
+    openai  - OpenAI Responses API (OPENAI_API_KEY); codex models
+    gemini  - Google GenAI API (GEMINI_API_KEY or GOOGLE_API_KEY)
+
+Usage:
+    python scripts/screening/provider_worker.py --backend gemini --model gemini-2.5-flash
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+QUOTA_MARKERS = ("429", "rate limit", "quota", "resource_exhausted", "usage limit")
+
+
+def openai_backend(default_model: str) -> Callable[[str, str], str]:
+    try:
+        from openai import OpenAI
+    except ImportError:
+        raise ImportError("openai package required. Install with: pip install openai")
+
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    client = OpenAI(api_key=api_key)
+
+    def complete(prompt: str, model: str) -> str:
+        response = client.responses.create(model=model or default_model, input=prompt)
+        return response.output_text or ""
+
+    return complete
+
+
+def gemini_backend(default_model: str) -> Callable[[str, str], str]:
+    try:
+        from google import genai
+    except ImportError:
+        raise ImportError("google-genai package required. Install with: pip install google-genai")
+
+    api_key = os.environ.get('GEMINI_API_KEY') or os.environ.get('GOOGLE_API_KEY')
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable not set")
+    client = genai.Client(api_key=api_key)
+
+    def complete(prompt: str, model: str) -> str:
+        response = client.models.generate_content(model=model or default_model, contents=prompt)
+        return response.text or ""
+
+    return complete
+
+
+BACKENDS = {
+    "openai": (openai_backend, "gpt-5.1-codex-mini"),
+    "gemini": (gemini_backend, "gemini-2.5-flash"),
+}
+
+
+def classify_error(exc: Exception) -> str:
+    """Map a client exception to a ``parsing.ERROR_KINDS`` value."""
+    text = f"{type(exc).__name__} {exc}".lower()
+    if any(marker in text for marker in QUOTA_MARKERS):
+        return "quota"
+    if "timeout" in text or "timed out" in text:
+        return "timeout"
+    return "exit"
+
+
+def serve(complete: Callable[[str, str], str], stdin=sys.stdin, stdout=sys.stdout) -> None:
+    """Answer requests until stdin closes."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Ignoring malformed request line")
+            continue
+        response = {"id": request.get("id"), "model": request.get("model", "")}
+        try:
+            response["text"] = complete(request.get("prompt", ""), request.get("model", ""))
+        except Exception as e:
+            response["error"] = classify_error(e)
+            response["message"] = str(e)[:500]
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Persistent screening provider worker")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), required=True)
+    parser.add_argument("--model", type=str, default=None, help="Model used when a request names none")
+    args = parser.parse_args()
+
+    # stdout carries the protocol; logs go to stderr.
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(asctime)s - %(levelname)s - %(message)s")
+    factory, default_model = BACKENDS[args.backend]
+    serve(factory(args.model or default_model))
+
+
+if __name__ == "__main__":
+    main()
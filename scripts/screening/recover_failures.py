@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Recover failed provider calls in an existing screening output.
+
+Queues every slot whose provider call failed (timeout, exhausted quota,
+non-zero exit, empty or unparseable output) in the persistent retry queue
+next to the CSV, together with any slots a ``--recover`` run left pending,
+and works the queue through the ``screening_recovery`` fallback chains
+(default: Gemini slot gemini-2.5-pro -> gemini-2.5-flash -> codex; Codex
+slot codex-mini -> codex-spark -> gemini-2.5-flash). Transient failures are
+retried with exponential backoff and jitter, quota errors move to the next
+model and cool the provider down. Recovered slots are written back into the
+CSV by record_id; slots still waiting for a backoff after --max-wait stay
+queued for the next invocation.
+
+Replaces the retry_gemini_failures.py / retry2 / retry3 passes.
+
+Usage:
+    python scripts/screening/recover_failures.py data/03_screening/screening_ai_dual.csv \\
+        --records data/02_processed/screening_master_16189.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from screening_engine import (
+    RetryQueue,
+    add_cache_arguments,
+    add_control_arguments,
+    apply_updates,
+    control_from_args,
+    load_records,
+    open_cache,
+    recovery_columns,
+    recovery_from_config,
+    retry_queue_path_for,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_recovery(args: argparse.Namespace) -> None:
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    results = pd.read_csv(args.input)
+    records = load_records(args.records) if args.records else None
+    if records is None:
+        logger.warning("No --records given: retries are prompted with the result row's title only")
+    logger.info("Loaded %s result rows", len(results))
+
+    cache = open_cache(args)
+    updates: list[dict] = []
+    recovery = recovery_from_config(
+        config,
+        RetryQueue(args.retry_queue or retry_queue_path_for(args.input)),
+        args.timeout,
+        workers=args.workers,
+        cache=cache,
+        control=control_from_args(args),
+        on_update=lambda row, slot: updates.append({col: row.get(col) for col in recovery_columns(slot)}),
+    )
+    queued = recovery.add_failures(results, records)
+    logger.info("Queued %s failed provider slots", queued)
+    try:
+        await recovery.drain(args.max_wait)
+    finally:
+        if updates:
+            apply_updates(results, updates)
+            tmp = Path(args.input).with_name(Path(args.input).name + ".tmp")
+            results.to_csv(tmp, index=False)
+            os.replace(tmp, args.input)
+        logger.info("%s", recovery.summary())
+        pending = recovery.queue.counts().get("pending", 0)
+        recovery.queue.close()
+        if cache is not None:
+            cache.close()
+
+    print(f"\n{'='*60}")
+    print("RECOVERY RESULTS")
+    print(f"{'='*60}")
+    print(f"Slots recovered: {recovery.recovered}")
+    print(f"Chains exhausted: {recovery.exhausted}")
+    print(f"Still queued: {pending}")
+    print("\nUpdated consensus distribution:")
+    print(results["screen_consensus"].value_counts().to_string())
+
+
+def main() -> None:
+    _default_config = str(Path(__file__).resolve().parent.parent / "ai_coding_pipeline" / "config.yaml")
+    parser = argparse.ArgumentParser(description="Retry failed provider calls through fallback chains")
+    parser.add_argument("input", type=str, help="Screening output CSV, updated in place")
+    parser.add_argument("--records", type=str, default=None, help="Input records CSV supplying abstracts")
+    parser.add_argument("--config", type=str, default=_default_config)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent retry calls")
+    parser.add_argument("--timeout", type=int, default=300, help="Per-call timeout (seconds)")
+    parser.add_argument(
+        "--max-wait", type=float, default=1800.0,
+        help="Seconds to wait for backoffs before leaving slots queued (default: 1800)",
+    )
+    parser.add_argument(
+        "--retry-queue", type=str, default=None,
+        help="SQLite retry queue (default: <input>.retry.sqlite)",
+    )
+    add_cache_arguments(parser)
+    add_control_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(run_recovery(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,10 +14,10 @@ echo ""
 echo "--- Step 1: T1 Exclude Code Post-processing ---"
 python3 "$PROJ/scripts/screening/postprocess_t1_codes.py" "$CSV"
 
-# Step 2: Retry Gemini failures (T2→Codex, T3→Gemini Flash)
+# Step 2: Recover failed provider calls through the fallback chains
 echo ""
-echo "--- Step 2: Retry Gemini Failures ---"
-python3 "$PROJ/scripts/screening/retry_gemini_failures.py" "$CSV" --workers 8 --timeout 300
+echo "--- Step 2: Recover Provider Failures ---"
+python3 "$PROJ/scripts/screening/recover_failures.py" "$CSV" --records "$PROJ/data/02_processed/screening_master_16189.csv" --workers 8 --timeout 300
 
 # Step 3: Generate PRISMA counts
 echo ""
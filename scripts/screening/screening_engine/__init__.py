@@ -0,0 +1,221 @@
+"""Shared screening engine for the title/abstract screening scripts.
+
+The CLI scripts in ``scripts/screening`` (``ai_screening.py``,
+``ai_screening_parallel.py``, ``ai_screening_tiered.py`` and
+``recover_failures.py``) are thin presets over this package.
+"""
+
+from .cache import (
+    ResponseCache, CachedProvider, cache_key, add_cache_arguments, open_cache,
+    wrap_cached, DEFAULT_CACHE_PATH
+)
+from .control import (
+    TokenBucket, AIMDLimiter, ProviderController, ControlledProvider,
+    AdaptiveControl, parse_rate_limits, add_control_arguments, control_from_args
+)
+from .parsing import (
+    try_extract_json, normalize_decision, normalize_payload, failure_payload,
+    ERROR_KINDS, parse_response, parse_batch_response, try_extract_json_array, consensus,
+    lenient_consensus
+)
+from .prompts import (
+    SCREENING_PROMPT, RETRY_PROMPT, COMPACT_PROMPT, PROMPT_TEMPLATES,
+    PROMPT_VERSIONS, BATCH_SCREENING_PROMPT, build_prompt, build_batch_prompt
+)
+from .providers import (
+    Provider, Completion, CLIProvider, FallbackProvider, ProviderCommandSet,
+    default_provider_config, load_provider_config, provider_from_config,
+    model_chain, auth_preflight, run_command,
+    CODEX_MODELS, CODEX_MODEL_CMD, GEMINI_MODEL_CMD
+)
+from .schema import (
+    RESULT_COLUMNS, HUMAN_COLUMNS, NOT_RUN, STATUSES, build_result_row,
+    provider_columns, provider_values, payload_status, apply_updates
+)
+from .journal import ResultJournal, compact, journal_path_for
+from .scheduler import ScreeningRun, run_pool, load_records, prepare_record_id
+from .screener import RecordScreener, BatchScreener, build_screener, screen_fn
+from .cascade import (
+    CascadePolicy, CascadeScreener, simulate_cascade, add_cascade_arguments, cascade_from_args
+)
+from .workers import (
+    WorkerProvider, worker_provider_from_config, add_worker_arguments,
+    providers_from_args, close_providers
+)
+from .telemetry import (
+    Telemetry, MeteredProvider, ProviderStats, StageStats, add_telemetry_arguments, telemetry_from_args
+)
+from .sharding import (
+    ShardMergeReport, parse_shard, shard_of, select_shard, merge_shards,
+    add_shard_arguments, shard_from_args
+)
+from .recovery import (
+    RetryPolicy, RetryItem, RetryQueue, Recovery, DEFAULT_CHAINS, chain_provider,
+    classify_rationales, failed_slots, recovered_row, recovery_columns, recovery_settings,
+    recovery_from_config, add_recovery_arguments, recovery_from_args, retry_queue_path_for
+)
+from .tiers import (
+    AI_PATTERN, EDU_PATTERN, ADOPT_PATTERN, AI_TERMS, EDU_TERMS, ADOPT_TERMS,
+    FAMILIES, FAMILY_TERMS, family_pattern, assign_tiers, classify_tier, classify_tiers,
+    keyword_hits, record_text, tier1_auto_exclude, tier1_results
+)
+from .calibration import (
+    MatchSpanCache, TierCalibrator, corpus_fingerprint, load_labels, load_candidates,
+    DEFAULT_LABELS_PATH, DEFAULT_SPAN_CACHE_PATH
+)
+
+__all__ = [
+    # Prompts
+    'SCREENING_PROMPT',
+    'RETRY_PROMPT',
+    'COMPACT_PROMPT',
+    'PROMPT_TEMPLATES',
+    'PROMPT_VERSIONS',
+    'BATCH_SCREENING_PROMPT',
+    'build_prompt',
+    'build_batch_prompt',
+
+    # Response parsing
+    'try_extract_json',
+    'normalize_decision',
+    'normalize_payload',
+    'failure_payload',
+    'ERROR_KINDS',
+    'parse_response',
+    'parse_batch_response',
+    'try_extract_json_array',
+    'consensus',
+    'lenient_consensus',
+
+    # Providers
+    'Provider',
+    'Completion',
+    'CLIProvider',
+    'FallbackProvider',
+    'ProviderCommandSet',
+    'default_provider_config',
+    'load_provider_config',
+    'provider_from_config',
+    'model_chain',
+    'auth_preflight',
+    'run_command',
+    'CODEX_MODELS',
+    'CODEX_MODEL_CMD',
+    'GEMINI_MODEL_CMD',
+
+    # Persistent worker processes
+    'WorkerProvider',
+    'worker_provider_from_config',
+    'add_worker_arguments',
+    'providers_from_args',
+    'close_providers',
+
+    # Response cache
+    'ResponseCache',
+    'CachedProvider',
+    'cache_key',
+    'add_cache_arguments',
+    'open_cache',
+    'wrap_cached',
+    'DEFAULT_CACHE_PATH',
+
+    # Rate limiting and adaptive concurrency
+    'TokenBucket',
+    'AIMDLimiter',
+    'ProviderController',
+    'ControlledProvider',
+    'AdaptiveControl',
+    'parse_rate_limits',
+    'add_control_arguments',
+    'control_from_args',
+
+    # Result schema
+    'RESULT_COLUMNS',
+    'HUMAN_COLUMNS',
+    'NOT_RUN',
+    'STATUSES',
+    'build_result_row',
+    'provider_columns',
+    'provider_values',
+    'payload_status',
+    'apply_updates',
+
+    # Scheduling
+    'ResultJournal',
+    'compact',
+    'journal_path_for',
+    'RecordScreener',
+    'BatchScreener',
+    'build_screener',
+    'screen_fn',
+    'CascadePolicy',
+    'CascadeScreener',
+    'simulate_cascade',
+    'add_cascade_arguments',
+    'cascade_from_args',
+    'ScreeningRun',
+    'run_pool',
+    'load_records',
+    'prepare_record_id',
+
+    # Live metrics
+    'Telemetry',
+    'MeteredProvider',
+    'ProviderStats',
+    'StageStats',
+    'add_telemetry_arguments',
+    'telemetry_from_args',
+
+    # Sharding
+    'ShardMergeReport',
+    'parse_shard',
+    'shard_of',
+    'select_shard',
+    'merge_shards',
+    'add_shard_arguments',
+    'shard_from_args',
+
+    # Failure recovery
+    'RetryPolicy',
+    'RetryItem',
+    'RetryQueue',
+    'Recovery',
+    'DEFAULT_CHAINS',
+    'chain_provider',
+    'classify_rationales',
+    'failed_slots',
+    'recovered_row',
+    'recovery_columns',
+    'recovery_settings',
+    'recovery_from_config',
+    'add_recovery_arguments',
+    'recovery_from_args',
+    'retry_queue_path_for',
+
+    # Tier classification
+    'AI_PATTERN',
+    'EDU_PATTERN',
+    'ADOPT_PATTERN',
+    'AI_TERMS',
+    'EDU_TERMS',
+    'ADOPT_TERMS',
+    'FAMILIES',
+    'FAMILY_TERMS',
+    'family_pattern',
+    'assign_tiers',
+    'classify_tier',
+    'classify_tiers',
+    'keyword_hits',
+    'record_text',
+    'tier1_auto_exclude',
+    'tier1_results',
+
+    # Tier calibration
+    'MatchSpanCache',
+    'TierCalibrator',
+    'corpus_fingerprint',
+    'load_labels',
+    'load_candidates',
+    'DEFAULT_LABELS_PATH',
+    'DEFAULT_SPAN_CACHE_PATH',
+]
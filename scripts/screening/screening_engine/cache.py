@@ -0,0 +1,173 @@
+"""Persistent prompt-response cache for screening providers.
+
+Responses are stored in SQLite keyed by the SHA-256 of provider, model,
+provider command, prompt template version and the rendered prompt, so a re-run after a crash,
+a prompt-preserving retry or a pilot-vs-full comparison costs no provider
+call for records that were already answered. Failed calls are never cached.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from .prompts import PROMPT_VERSIONS
+from .providers import Completion, Provider
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = (
+    Path(__file__).resolve().parents[3] / "data" / "02_screening" / "screening_cache.sqlite"
+)
+
+
+def cache_key(provider: str, model: str, prompt_version: str, prompt: str, command: str = "") -> str:
+    """Stable cache key for one provider call.
+
+    ``command`` is the provider's command template (``Provider.command``), so
+    editing the CLI invocation in config.yaml, e.g. the ``-m`` model flag of
+    ``screen_cmd``, never reuses answers produced by the old command.
+    """
+    h = hashlib.sha256()
+    for part in (provider, model, command, prompt_version, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed store of normalized provider payloads.
+
+    Args:
+        path: Database file; parent directories are created.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, provider TEXT, model TEXT, prompt_version TEXT,"
+            " payload TEXT NOT NULL, created_at REAL)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, provider: str, model: str, prompt_version: str, prompt: str, command: str = ""
+    ) -> dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT payload FROM responses WHERE key = ?",
+            (cache_key(provider, model, prompt_version, prompt, command),),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(
+        self,
+        provider: str,
+        model: str,
+        prompt_version: str,
+        prompt: str,
+        payload: dict[str, Any],
+        command: str = "",
+    ) -> None:
+        if payload.get("_failed"):
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                cache_key(provider, model, prompt_version, prompt, command),
+                provider, model, prompt_version,
+                json.dumps(payload, ensure_ascii=False, default=str),
+                time.time(),
+            ),
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        logger.info("Response cache: %s hits, %s misses (%s)", self.hits, self.misses, self.path)
+        self.conn.close()
+
+    def wrap(self, provider: Provider, template: str = "full") -> "CachedProvider":
+        """Wrap ``provider`` so calls consult this cache first."""
+        return CachedProvider(provider, self, PROMPT_VERSIONS[template])
+
+
+class CachedProvider(Provider):
+    """Provider decorator that answers repeated prompts from a ``ResponseCache``.
+
+    Args:
+        inner: Provider making the actual calls.
+        cache: Shared response cache.
+        prompt_version: Version of the template that rendered the prompts.
+    """
+
+    def __init__(self, inner: Provider, cache: ResponseCache, prompt_version: str) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.prompt_version = prompt_version
+        self.name = inner.name
+        self.label = inner.label
+
+    @property
+    def model(self) -> str:  # type: ignore[override]
+        return self.inner.model
+
+    @property
+    def command(self) -> str:  # type: ignore[override]
+        return self.inner.command
+
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        return await self.inner.complete(prompt, timeout_s)
+
+    async def invoke(self, prompt: str, timeout_s: int) -> dict[str, Any]:
+        model = self.inner.model or self.inner.name
+        cached = self.cache.get(self.name, model, self.prompt_version, prompt, self.inner.command)
+        if cached is not None:
+            cached["_cached"] = True
+            cached["_latency_ms"] = 0
+            return cached
+        payload = await self.inner.invoke(prompt, timeout_s)
+        self.cache.put(
+            self.name, payload.get("_model") or model, self.prompt_version, prompt, payload,
+            command=self.inner.command,
+        )
+        return payload
+
+
+def wrap_cached(provider: Provider, cache: ResponseCache | None, template: str = "full") -> Provider:
+    """Return ``provider`` behind ``cache``, or unchanged when caching is off."""
+    return provider if cache is None else cache.wrap(provider, template)
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--cache``/``--no-cache`` options shared by screening CLIs."""
+    parser.add_argument(
+        "--cache", type=str, default=str(DEFAULT_CACHE_PATH),
+        help="SQLite prompt-response cache (default: data/02_screening/screening_cache.sqlite)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Call providers even for cached prompts")
+
+
+def open_cache(args: argparse.Namespace) -> ResponseCache | None:
+    """Open the cache selected by ``add_cache_arguments`` options."""
+    if getattr(args, "no_cache", False):
+        return None
+    return ResponseCache(args.cache)
@@ -0,0 +1,333 @@
+"""Calibration of the Tier-1 keyword filter against human screening labels.
+
+Every keyword term is matched against the corpus once and its match spans
+are stored in SQLite, keyed by a fingerprint of the corpus text. Scoring a
+candidate term set then only combines cached per-term hit columns, so
+re-validating an edited ``AI_TERMS``/``EDU_TERMS``/``ADOPT_TERMS`` list
+against the human I/X decisions takes milliseconds instead of a regex pass
+over every abstract.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .tiers import FAMILY_TERMS, assign_tiers, record_text
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = Path(__file__).resolve().parents[3] / "data" / "02_screening"
+DEFAULT_LABELS_PATH = _DATA_DIR / "human_screening_results_consolidated.csv"
+DEFAULT_SPAN_CACHE_PATH = _DATA_DIR / "tier_match_cache.sqlite"
+
+TIERS = ("T1", "T2", "T3")
+# Provider calls per record in each tier; the baseline screens every record twice.
+CALLS_PER_RECORD = {"T1": 0, "T2": 1, "T3": 2}
+BASELINE_CALLS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spans (
+    corpus TEXT NOT NULL,
+    term TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spans_term ON spans (corpus, term);
+CREATE TABLE IF NOT EXISTS scanned (
+    corpus TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (corpus, term)
+);
+"""
+
+
+def corpus_fingerprint(record_ids: pd.Series, text: pd.Series) -> str:
+    """Hash of record order and text; cached spans are valid only for it."""
+    h = hashlib.sha256()
+    for record_id, t in zip(record_ids.astype(str), text):
+        h.update(record_id.encode("utf-8"))
+        h.update(b"\0")
+        h.update(t.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _fold_term(term: str) -> str:
+    """Lower-case the ASCII letters of a regex term, leaving escapes intact."""
+    return re.sub(r"\\.|[A-Z]", lambda m: m.group().lower() if len(m.group()) == 1 else m.group(), term)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def term_spans(term: str, folded: str) -> list[tuple[int, int]]:
+    """Spans of ``\\b(?:term)\\b`` in ASCII-lower-cased text.
+
+    Equivalent to ``finditer`` with ``re.IGNORECASE`` for ASCII terms, but the
+    leading ``\\b`` is checked by hand: without it ``re`` can use its fast
+    literal-prefix search, which is an order of magnitude quicker.
+    """
+    search = re.compile(rf"(?:{_fold_term(term)})\b").search
+    spans = []
+    pos = 0
+    while True:
+        m = search(folded, pos)
+        if m is None:
+            return spans
+        start, end = m.span()
+        if start == 0 or not _is_word_char(folded[start - 1]):
+            spans.append((start, end))
+            pos = end if end > start else start + 1
+        else:
+            pos = start + 1
+
+
+class MatchSpanCache:
+    """Per-term match spans for a corpus, stored in SQLite.
+
+    Args:
+        path: SQLite file, or ``":memory:"`` for a throwaway cache.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_SPAN_CACHE_PATH) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+        self.scans = 0
+
+    def spans(self, text: pd.Series, corpus: str, terms: list[str]) -> pd.DataFrame:
+        """Match spans of ``terms`` in ``text``, scanning terms not yet cached.
+
+        Args:
+            text: Record text in corpus order.
+            corpus: ``corpus_fingerprint`` of ``text``.
+            terms: Regex terms.
+
+        Returns:
+            Frame with ``term``, ``row`` (position in ``text``), ``start`` and
+            ``end`` columns.
+        """
+        terms = list(dict.fromkeys(terms))
+        done = {
+            t for (t,) in self.conn.execute("SELECT term FROM scanned WHERE corpus = ?", (corpus,))
+        }
+        missing = [t for t in terms if t not in done]
+        if missing:
+            self._scan(text, corpus, missing)
+        frames = []
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            frames.append(pd.read_sql_query(
+                f"SELECT term, row, start, end FROM spans WHERE corpus = ? AND term IN ({marks})",
+                self.conn, params=[corpus, *chunk],
+            ))
+        return pd.concat(frames, ignore_index=True)
+
+    def _scan(self, text: pd.Series, corpus: str, terms: list[str]) -> None:
+        # One pass per term over the whole column joined into a single
+        # NUL-separated string; match offsets are mapped back to records
+        # through the row offsets.
+        texts = text.tolist()
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        folded = "\0".join(texts).translate(_ASCII_LOWER)
+        for term in terms:
+            spans = np.array(term_spans(term, folded), dtype=np.int64).reshape(-1, 2)
+            rows = np.searchsorted(offsets, spans[:, 0], side="right") - 1
+            base = offsets[rows]
+            self.conn.executemany(
+                "INSERT INTO spans (corpus, term, row, start, end) VALUES (?, ?, ?, ?, ?)",
+                zip([corpus] * len(rows), [term] * len(rows),
+                    rows.tolist(), (spans[:, 0] - base).tolist(), (spans[:, 1] - base).tolist()),
+            )
+            self.conn.execute("INSERT OR REPLACE INTO scanned (corpus, term) VALUES (?, ?)", (corpus, term))
+            self.scans += 1
+        self.conn.commit()
+        logger.info("Scanned %s new terms over %s records", len(terms), len(texts))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def load_labels(path: str | Path = DEFAULT_LABELS_PATH) -> pd.Series:
+    """Human I/X decisions indexed by ``record_id`` (first row per record wins)."""
+    labels = pd.read_csv(path, usecols=["record_id", "screening_decision"])
+    labels["record_id"] = labels["record_id"].astype(str)
+    labels = labels.drop_duplicates("record_id")
+    decision = labels["screening_decision"].astype(str).str.strip().str.upper()
+    return pd.Series(decision.to_numpy(), index=labels["record_id"].to_numpy(), name="human")
+
+
+def load_candidates(path: str | Path) -> dict[str, dict[str, list[str]]]:
+    """Read candidate term sets from YAML.
+
+    Each entry under ``candidates`` either lists full family term lists
+    (``ai``, ``edu``, ``adopt``) or edits the current lists with ``add`` and
+    ``drop`` mappings::
+
+        candidates:
+          no_robot:
+            drop: {ai: ["robot\\\\w*"]}
+          strict_edu:
+            edu: [education, student, teacher, university, school]
+
+    Returns:
+        Term lists per family for each candidate, in file order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        spec = yaml.safe_load(f) or {}
+    candidates = {}
+    for name, entry in (spec.get("candidates") or {}).items():
+        entry = entry or {}
+        families = {}
+        for family, current in FAMILY_TERMS.items():
+            terms = list(entry.get(family, current))
+            terms += [t for t in (entry.get("add") or {}).get(family, []) if t not in terms]
+            dropped = set((entry.get("drop") or {}).get(family, []))
+            families[family] = [t for t in terms if t not in dropped]
+        candidates[str(name)] = families
+    return candidates
+
+
+class TierCalibrator:
+    """Score keyword term sets against human labels.
+
+    Args:
+        records: Screening corpus with ``record_id``, ``title``, ``abstract``
+            and ``keywords``.
+        labels: Human decisions (``I``/``X``) by ``record_id``, e.g. from
+            ``load_labels``.
+        cache: Span cache; a throwaway in-memory cache when omitted.
+    """
+
+    def __init__(
+        self,
+        records: pd.DataFrame,
+        labels: pd.Series,
+        cache: MatchSpanCache | None = None,
+    ) -> None:
+        self.records = records.reset_index(drop=True)
+        self.record_ids = self.records["record_id"].astype(str)
+        self.text = record_text(self.records).astype(str)
+        self.corpus = corpus_fingerprint(self.record_ids, self.text)
+        self.cache = cache or MatchSpanCache(":memory:")
+        self.human = self.record_ids.map(labels).to_numpy()
+        self._hits: dict[str, np.ndarray] = {}
+
+    def term_hits(self, terms: list[str]) -> np.ndarray:
+        """Boolean ``(records, terms)`` matrix of whole-word term matches."""
+        missing = [t for t in dict.fromkeys(terms) if t not in self._hits]
+        if missing:
+            spans = self.cache.spans(self.text, self.corpus, missing)
+            rows_by_term = spans.groupby("term")["row"].unique()
+            for term in missing:
+                column = np.zeros(len(self.text), dtype=bool)
+                if term in rows_by_term.index:
+                    column[rows_by_term[term]] = True
+                self._hits[term] = column
+        if not terms:
+            return np.zeros((len(self.text), 0), dtype=bool)
+        return np.column_stack([self._hits[t] for t in terms])
+
+    def tiers(self, candidate: dict[str, list[str]]) -> tuple[np.ndarray, np.ndarray]:
+        """(tier, exclude_reason) arrays for every record under ``candidate``."""
+        has = {family: self.term_hits(candidate[family]).any(axis=1) for family in FAMILY_TERMS}
+        return assign_tiers(has["ai"], has["edu"], has["adopt"])
+
+    def score(self, candidate: dict[str, list[str]], name: str = "current") -> dict[str, Any]:
+        """Recall, precision and provider-call savings of one term set.
+
+        Recall is the share of human includes kept out of Tier 1 (auto-exclude);
+        ``t1_precision`` is the share of labeled Tier 1 records humans also
+        excluded. Calls are counted against screening every record with both
+        providers.
+
+        Returns:
+            Summary metrics plus a ``per_tier`` frame and the
+            ``false_negatives`` (human includes sent to Tier 1).
+        """
+        tier, _ = self.tiers(candidate)
+        include = self.human == "I"
+        exclude = self.human == "X"
+        in_t1 = tier == "T1"
+
+        per_tier = pd.DataFrame({
+            "tier": tier, "labeled": include | exclude, "include": include, "exclude": exclude,
+        }).groupby("tier").sum().reindex(list(TIERS), fill_value=0)
+        per_tier.insert(0, "records", pd.Series(tier).value_counts().reindex(list(TIERS), fill_value=0))
+        per_tier["llm_calls"] = per_tier["records"] * pd.Series(CALLS_PER_RECORD)
+        per_tier["calls_saved"] = per_tier["records"] * BASELINE_CALLS - per_tier["llm_calls"]
+
+        includes = int(include.sum())
+        t1_labeled = int((in_t1 & (include | exclude)).sum())
+        baseline = len(tier) * BASELINE_CALLS
+        saved = int(per_tier["calls_saved"].sum())
+        return {
+            "candidate": name,
+            "records": len(tier),
+            "labeled": int((include | exclude).sum()),
+            **{f"{t}_records": int(per_tier.loc[t, "records"]) for t in TIERS},
+            "false_negatives": int((in_t1 & include).sum()),
+            "recall": 1 - (in_t1 & include).sum() / includes if includes else float("nan"),
+            "t1_precision": (in_t1 & exclude).sum() / t1_labeled if t1_labeled else float("nan"),
+            "llm_calls": baseline - saved,
+            "calls_saved": saved,
+            "calls_saved_pct": 100 * saved / baseline if baseline else 0.0,
+            "per_tier": per_tier,
+            "false_negative_ids": self.record_ids[in_t1 & include].tolist(),
+        }
+
+    def compare(self, candidates: dict[str, dict[str, list[str]]]) -> pd.DataFrame:
+        """Score the current term lists and every candidate; one row each."""
+        scored = [self.score(FAMILY_TERMS, "current")]
+        scored += [self.score(c, name) for name, c in candidates.items()]
+        summary = pd.DataFrame([{k: v for k, v in s.items() if k not in ("per_tier", "false_negative_ids")}
+                                for s in scored])
+        return summary.set_index("candidate")
+
+    def explain(self, record_ids: list[str], candidate: dict[str, list[str]] | None = None) -> pd.DataFrame:
+        """Matched terms, spans and context for individual records.
+
+        Returns:
+            One row per match with ``record_id``, ``tier``, ``exclude_reason``,
+            ``human``, ``family``, ``term``, ``start``, ``end`` and ``context``;
+            records without any match get a single row with empty match fields.
+        """
+        candidate = candidate or FAMILY_TERMS
+        tier, reason = self.tiers(candidate)
+        rows = np.flatnonzero(self.record_ids.isin([str(r) for r in record_ids]).to_numpy())
+        out = []
+        for family, terms in candidate.items():
+            spans = self.cache.spans(self.text, self.corpus, terms)
+            spans = spans[spans["row"].isin(rows)]
+            out.append(spans.assign(family=family))
+        matches = pd.concat(out, ignore_index=True).sort_values(["row", "start", "family"])
+        base = pd.DataFrame({"row": rows})
+        explained = base.merge(matches, on="row", how="left")
+        explained["record_id"] = self.record_ids.to_numpy()[explained["row"]]
+        explained["tier"] = tier[explained["row"]]
+        explained["exclude_reason"] = reason[explained["row"]]
+        explained["human"] = pd.Series(self.human[explained["row"]]).fillna("").to_numpy()
+        explained[["start", "end"]] = explained[["start", "end"]].astype("Int64")
+        explained["context"] = [
+            "" if pd.isna(s) else self.text.iat[r][max(0, int(s) - 40):int(e) + 40]
+            for r, s, e in zip(explained["row"], explained["start"], explained["end"])
+        ]
+        return explained[["record_id", "tier", "exclude_reason", "human", "family", "term", "start", "end", "context"]]
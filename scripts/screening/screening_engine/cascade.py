@@ -0,0 +1,213 @@
+"""Cascade routing: call the second provider only when the first is not sure.
+
+``CascadeScreener`` screens a record with the cheaper/faster provider first
+and escalates to the second provider only when ``CascadePolicy`` says the
+first answer is not enough: an ``uncertain`` decision (including every
+failure), a confidence below ``min_confidence``, or an include (includes go
+to human review anyway, so a second opinion is cheap insurance). A record
+that is not escalated keeps the first provider's decision as its consensus.
+
+``simulate_cascade`` replays a policy on existing dual-screened output to
+estimate the calls saved and the records whose outcome would change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .prompts import build_prompt
+from .providers import Provider
+from .schema import NOT_RUN, build_result_row
+from .screener import RecordScreener
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CascadePolicy:
+    """When the second provider is called.
+
+    Attributes:
+        min_confidence: Escalate answers below this confidence.
+        escalate_includes: Escalate include decisions regardless of confidence.
+    """
+
+    min_confidence: float = 0.85
+    escalate_includes: bool = True
+
+    def needs_second(self, payload: dict[str, Any]) -> bool:
+        """Whether a first-provider payload must be checked by the second."""
+        return bool(self.escalations(
+            np.array([payload["decision"]]), np.array([payload["confidence"]], dtype=float),
+        )[0])
+
+    def escalations(self, decisions: np.ndarray, confidences: np.ndarray) -> np.ndarray:
+        """Vectorized ``needs_second`` over decision and confidence arrays."""
+        decided = np.isin(decisions, ["include", "exclude"])
+        escalate = ~decided | (np.nan_to_num(confidences, nan=0.0) < self.min_confidence)
+        if self.escalate_includes:
+            escalate |= decisions == "include"
+        return escalate
+
+
+class CascadeScreener(RecordScreener):
+    """Screen with ``providers[0]`` and escalate to ``providers[1]`` on demand.
+
+    Args:
+        providers: ``[first, second]``.
+        timeout_s: Per-call timeout in seconds.
+        policy: Escalation rule.
+        **kwargs: Passed to ``RecordScreener``.
+    """
+
+    def __init__(
+        self,
+        providers: list[Provider],
+        timeout_s: int,
+        policy: CascadePolicy | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if len(providers) != 2:
+            raise ValueError("Cascade screening needs exactly two providers")
+        super().__init__(providers, timeout_s, **kwargs)
+        self.policy = policy or CascadePolicy()
+        self.screened = 0
+        self.escalated = 0
+
+    async def screen_payloads(self, row: pd.Series) -> dict[str, dict[str, Any]]:
+        first, second = self.providers
+        prompt = build_prompt(row, self.template)
+        payload = await first.invoke(prompt, self.timeout_s)
+        self.screened += 1
+        if not self.policy.needs_second(payload):
+            return {first.name: payload}
+        self.escalated += 1
+        return {first.name: payload, second.name: await second.invoke(prompt, self.timeout_s)}
+
+    def build_row(self, row: pd.Series, payloads: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        first, second = self.providers
+        if second.name in payloads:
+            return super().build_row(row, payloads)
+        decided = payloads[first.name]
+        skipped = {
+            **NOT_RUN,
+            "rationale": (
+                f"Cascade: not called, {first.label} {decided['decision']} "
+                f"at confidence {decided['confidence']:.2f}"
+            ),
+        }
+        auth_methods = self._auth_methods()
+        auth_methods[second.name] = "N/A"
+        return self.observed(row, payloads, build_result_row(
+            row,
+            {**self.placeholders, first.name: decided, second.name: skipped},
+            consensus=decided["decision"],
+            tier=self.tier,
+            auth_methods=auth_methods,
+        ))
+
+    def summary(self) -> str:
+        saved = self.screened - self.escalated
+        return (
+            f"cascade escalated {self.escalated}/{self.screened} records to {self.providers[1].label} "
+            f"({saved} calls saved)"
+        )
+
+
+def simulate_cascade(
+    results: pd.DataFrame,
+    first: str,
+    second: str,
+    policy: CascadePolicy,
+    labels: pd.Series | None = None,
+) -> dict[str, Any]:
+    """Replay ``policy`` on dual-screened results.
+
+    Only rows where both providers returned a decision are used. For rows
+    the policy would not escalate, the cascade outcome is the first
+    provider's decision; elsewhere it is the strict dual consensus.
+
+    Args:
+        results: Screening output with ``screen_decision_*`` and
+            ``screen_confidence_*`` columns for both providers.
+        first: Provider called first.
+        second: Provider called on escalation.
+        policy: Escalation rule.
+        labels: Optional human I/X decisions by ``record_id``.
+
+    Returns:
+        Record and call counts, calls saved, ``changed`` (rows whose outcome
+        differs from dual screening), ``lost_includes`` (rows the second
+        provider included that the cascade excludes unseen), and, with
+        ``labels``, the human-include recall of both strategies.
+    """
+    d1 = results[f"screen_decision_{first}"].astype(str).to_numpy()
+    d2 = results[f"screen_decision_{second}"].astype(str).to_numpy()
+    c1 = pd.to_numeric(results[f"screen_confidence_{first}"], errors="coerce").to_numpy(dtype=float)
+    valid = np.isin(d1, ["include", "exclude", "uncertain"]) & np.isin(d2, ["include", "exclude", "uncertain"])
+    d1, d2, c1 = d1[valid], d2[valid], c1[valid]
+
+    escalate = policy.escalations(d1, c1)
+    dual = np.where(d1 == d2, np.where(np.isin(d1, ["include", "exclude"]), d1, "conflict"), "conflict")
+    cascaded = np.where(escalate, dual, d1)
+    n = int(valid.sum())
+    calls = n + int(escalate.sum())
+    report: dict[str, Any] = {
+        "min_confidence": policy.min_confidence,
+        "escalate_includes": policy.escalate_includes,
+        "records": n,
+        "escalated": int(escalate.sum()),
+        "dual_calls": 2 * n,
+        "cascade_calls": calls,
+        "calls_saved": 2 * n - calls,
+        "calls_saved_pct": 100 * (2 * n - calls) / (2 * n) if n else 0.0,
+        "changed": int((cascaded != dual).sum()),
+        "lost_includes": int((~escalate & (d2 == "include")).sum()),
+    }
+    if labels is not None:
+        human = results.loc[valid, "record_id"].astype(str).map(labels).to_numpy()
+        includes = human == "I"
+        n_includes = int(includes.sum())
+        # A record reaches human review unless the outcome is an exclude.
+        report["labeled_includes"] = n_includes
+        report["dual_recall"] = (includes & (dual != "exclude")).sum() / n_includes if n_includes else float("nan")
+        report["cascade_recall"] = (
+            (includes & (cascaded != "exclude")).sum() / n_includes if n_includes else float("nan")
+        )
+    return report
+
+
+def add_cascade_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the cascade-routing options."""
+    parser.add_argument(
+        "--cascade", action="store_true",
+        help="Dual-AI tier: call the second provider only for uncertain, low-confidence or include answers",
+    )
+    parser.add_argument(
+        "--cascade-first", choices=["gemini", "codex"], default="gemini",
+        help="Provider called first in cascade mode (default: gemini)",
+    )
+    parser.add_argument(
+        "--cascade-min-confidence", type=float, default=0.85,
+        help="Escalate first answers below this confidence (default: 0.85)",
+    )
+    parser.add_argument(
+        "--cascade-trust-includes", action="store_true",
+        help="Do not escalate confident includes",
+    )
+
+
+def cascade_from_args(args: argparse.Namespace) -> CascadePolicy | None:
+    """Build the ``CascadePolicy`` selected by ``add_cascade_arguments`` options."""
+    if not args.cascade:
+        return None
+    return CascadePolicy(
+        min_confidence=args.cascade_min_confidence,
+        escalate_includes=not args.cascade_trust_includes,
+    )
@@ -0,0 +1,336 @@
+"""Per-provider rate limiting and adaptive concurrency.
+
+Each provider gets a ``ProviderController`` combining
+
+- a ``TokenBucket`` capping the call rate (calls per minute), and
+- an ``AIMDLimiter`` capping concurrent calls: the limit grows by one per
+  window of healthy calls (additive increase) and is cut by
+  ``backoff`` on quota errors, timeouts or latency above target
+  (multiplicative decrease).
+
+``ControlledProvider`` applies a controller to any provider, and
+``AdaptiveControl`` holds the controllers for a run and reports their live
+metrics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from .providers import Completion, Provider
+
+logger = logging.getLogger(__name__)
+
+# Failure kinds that signal an overloaded or rate-limited provider.
+CONGESTION_ERRORS = ("quota", "timeout")
+
+
+class TokenBucket:
+    """Async token bucket.
+
+    Args:
+        rate_per_min: Sustained calls per minute.
+        burst: Bucket capacity; defaults to one second's worth of calls
+            (at least one).
+    """
+
+    def __init__(self, rate_per_min: float, burst: float | None = None) -> None:
+        if rate_per_min <= 0:
+            raise ValueError("rate_per_min must be positive")
+        self.rate = rate_per_min / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after a quota error."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase / multiplicative decrease.
+
+    Args:
+        initial: Starting concurrency limit.
+        minimum: Lower bound of the limit.
+        maximum: Upper bound of the limit.
+        backoff: Factor applied to the limit on congestion.
+        latency_target_s: Successful calls slower than this count as
+            congestion; None disables the latency signal.
+        cooldown_s: Minimum time between two decreases, so one wave of
+            failing in-flight calls only backs off once.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 16,
+        backoff: float = 0.5,
+        latency_target_s: float | None = None,
+        cooldown_s: float = 5.0,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.latency_target_s = latency_target_s
+        self.cooldown_s = cooldown_s
+        self.in_flight = 0
+        self.waiting = 0
+        self._last_decrease = float("-inf")
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self, congested: bool) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            if congested:
+                self.decrease()
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def decrease(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_s:
+            return False
+        self.limit = max(float(self.minimum), self.limit * self.backoff)
+        self._last_decrease = now
+        return True
+
+
+class ProviderController:
+    """Rate limit, concurrency limit and metrics for one provider.
+
+    Args:
+        name: Provider name.
+        limiter: Adaptive concurrency limiter.
+        bucket: Optional call-rate limiter.
+    """
+
+    def __init__(self, name: str, limiter: AIMDLimiter, bucket: TokenBucket | None = None) -> None:
+        self.name = name
+        self.limiter = limiter
+        self.bucket = bucket
+        self.calls = 0
+        self.successes = 0
+        self.errors: Counter[str] = Counter()
+        self.latency_ewma_s = 0.0
+
+    async def call(self, inner: Provider, prompt: str, timeout_s: int) -> Completion:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        await self.limiter.acquire()
+        t0 = time.monotonic()
+        completion: Completion | None = None
+        try:
+            completion = await inner.complete(prompt, timeout_s)
+            return completion
+        finally:
+            latency = time.monotonic() - t0
+            await self.limiter.release(self._observe(completion, latency))
+
+    def _observe(self, completion: Completion | None, latency: float) -> bool:
+        """Update metrics; return True when the call signals congestion."""
+        self.calls += 1
+        self.latency_ewma_s = latency if self.calls == 1 else 0.8 * self.latency_ewma_s + 0.2 * latency
+        if completion is None:
+            self.errors["cancelled"] += 1
+            return False
+        if completion.failure is not None:
+            kind = completion.failure.get("_error", "exit")
+            self.errors[kind] += 1
+            if kind == "quota" and self.bucket is not None:
+                self.bucket.drain()
+            return kind in CONGESTION_ERRORS
+        self.successes += 1
+        target = self.limiter.latency_target_s
+        return target is not None and latency > target
+
+    def snapshot(self) -> dict[str, Any]:
+        """Live metrics for this provider."""
+        return {
+            "provider": self.name,
+            "limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting,
+            "calls": self.calls,
+            "successes": self.successes,
+            "errors": dict(self.errors),
+            "error_rate": round(sum(self.errors.values()) / self.calls, 4) if self.calls else 0.0,
+            "latency_ewma_s": round(self.latency_ewma_s, 3),
+        }
+
+
+class ControlledProvider(Provider):
+    """Provider decorator routing calls through a ``ProviderController``."""
+
+    def __init__(self, inner: Provider, controller: ProviderController) -> None:
+        self.inner = inner
+        self.controller = controller
+        self.name = inner.name
+        self.label = inner.label
+
+    @property
+    def model(self) -> str:  # type: ignore[override]
+        return self.inner.model
+
+    @property
+    def lenient(self) -> bool:  # type: ignore[override]
+        return self.inner.lenient
+
+    @property
+    def command(self) -> str:  # type: ignore[override]
+        return self.inner.command
+
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        return await self.controller.call(self.inner, prompt, timeout_s)
+
+
+def parse_rate_limits(spec: str | None) -> dict[str, float]:
+    """Parse ``codex=30,gemini=60`` (calls per minute) into a mapping."""
+    limits: dict[str, float] = {}
+    if not spec:
+        return limits
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if not value:
+            raise ValueError(f"Invalid rate limit '{item}', expected provider=calls_per_minute")
+        limits[name.strip()] = float(value)
+    return limits
+
+
+class AdaptiveControl:
+    """Controllers for every provider of a run.
+
+    Args:
+        max_concurrency: Upper bound of each provider's concurrency limit.
+        initial: Starting limit; defaults to half of ``max_concurrency``.
+        rate_limits: Calls per minute per provider name.
+        latency_target_s: Latency above which calls count as congestion.
+        adaptive: When False the concurrency limit stays at
+            ``max_concurrency`` and only the rate limits apply.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        initial: int | None = None,
+        rate_limits: dict[str, float] | None = None,
+        latency_target_s: float | None = None,
+        adaptive: bool = True,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.adaptive = adaptive
+        if not adaptive:
+            initial, latency_target_s = self.max_concurrency, None
+        self.initial = initial if initial is not None else max(1, self.max_concurrency // 2)
+        self.rate_limits = rate_limits or {}
+        self.latency_target_s = latency_target_s
+        self.controllers: dict[str, ProviderController] = {}
+
+    def controller(self, name: str) -> ProviderController:
+        if name not in self.controllers:
+            rate = self.rate_limits.get(name)
+            self.controllers[name] = ProviderController(
+                name,
+                AIMDLimiter(
+                    self.initial,
+                    maximum=self.max_concurrency,
+                    backoff=0.5 if self.adaptive else 1.0,
+                    latency_target_s=self.latency_target_s,
+                ),
+                TokenBucket(rate) if rate else None,
+            )
+        return self.controllers[name]
+
+    def wrap(self, provider: Provider) -> ControlledProvider:
+        return ControlledProvider(provider, self.controller(provider.name))
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [c.snapshot() for c in self.controllers.values()]
+
+    def log_metrics(self) -> None:
+        for snap in self.snapshot():
+            logger.info(
+                "%s: limit=%.1f in_flight=%s waiting=%s calls=%s error_rate=%.1f%% latency=%.1fs errors=%s",
+                snap["provider"], snap["limit"], snap["in_flight"], snap["waiting"], snap["calls"],
+                snap["error_rate"] * 100, snap["latency_ewma_s"], snap["errors"],
+            )
+
+    async def report_every(self, interval_s: float) -> None:
+        """Log metrics every ``interval_s`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval_s)
+            self.log_metrics()
+
+    @asynccontextmanager
+    async def reporting(self, interval_s: float) -> AsyncIterator[None]:
+        """Log metrics periodically while the block runs, and once at the end."""
+        task = asyncio.create_task(self.report_every(interval_s))
+        try:
+            yield
+        finally:
+            task.cancel()
+            self.log_metrics()
+
+
+def add_control_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the adaptive-concurrency options shared by screening CLIs."""
+    parser.add_argument(
+        "--adaptive", action="store_true",
+        help="Per-provider AIMD concurrency (up to --workers) instead of a fixed limit",
+    )
+    parser.add_argument(
+        "--rate-limit", type=str, default=None,
+        help="Per-provider calls per minute, e.g. codex=30,gemini=60",
+    )
+    parser.add_argument(
+        "--latency-target", type=float, default=None,
+        help="Latency (s) above which a call counts as congestion (default: half of --timeout)",
+    )
+    parser.add_argument(
+        "--metrics-every", type=float, default=60.0, help="Metrics log and --metrics-json interval (seconds)",
+    )
+
+
+def control_from_args(args: argparse.Namespace) -> AdaptiveControl | None:
+    """Build the ``AdaptiveControl`` selected by ``add_control_arguments`` options."""
+    rate_limits = parse_rate_limits(args.rate_limit)
+    if not args.adaptive and not rate_limits:
+        return None
+    if args.adaptive:
+        latency_target = args.latency_target if args.latency_target is not None else args.timeout / 2
+        return AdaptiveControl(args.workers, rate_limits=rate_limits, latency_target_s=latency_target)
+    return AdaptiveControl(args.workers, rate_limits=rate_limits, adaptive=False)
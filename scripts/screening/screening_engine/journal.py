@@ -0,0 +1,131 @@
+"""Append-only JSONL journal of screening results.
+
+Every completed record is written once, as one line, and flushed
+immediately; ``os.fsync`` runs every ``sync_every`` records. A crash loses
+at most the record being written, and a torn last line is skipped on
+reload. ``compact`` folds the journal into the output CSV at the end of a
+run.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def journal_path_for(output_path: str | Path) -> Path:
+    """Journal file kept next to an output CSV."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".journal.jsonl")
+
+
+def _ends_without_newline(path: Path) -> bool:
+    with open(path, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        if fh.tell() == 0:
+            return False
+        fh.seek(-1, os.SEEK_END)
+        return fh.read(1) != b"\n"
+
+
+class ResultJournal:
+    """Append-only result log.
+
+    Args:
+        path: JSONL file.
+        sync_every: ``fsync`` interval in records.
+        truncate: Start a fresh journal instead of appending to an
+            existing one.
+    """
+
+    def __init__(self, path: str | Path, sync_every: int = 50, truncate: bool = False) -> None:
+        self.path = Path(path)
+        self.sync_every = max(1, sync_every)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = not truncate and self.path.exists() and _ends_without_newline(self.path)
+        self._fh = open(self.path, "w" if truncate else "a", encoding="utf-8")
+        if torn:
+            # Terminate a torn last line so the next record starts cleanly.
+            self._fh.write("\n")
+        self._unsynced = 0
+
+    def append(self, result: dict[str, Any]) -> None:
+        self._fh.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+        self._fh.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def append_frame(self, results: pd.DataFrame) -> None:
+        """Append every row of ``results`` in one write and ``fsync``."""
+        if len(results) == 0:
+            return
+        self._fh.write(results.to_json(orient="records", lines=True, force_ascii=False))
+        self.sync()
+
+    def sync(self) -> None:
+        if self._fh.closed:
+            return
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self.sync()
+            self._fh.close()
+
+    @staticmethod
+    def read(path: str | Path) -> list[dict[str, Any]]:
+        """Load journaled results, skipping a torn trailing line."""
+        path = Path(path)
+        if not path.exists():
+            return []
+        results = []
+        with open(path, encoding="utf-8") as fh:
+            for lineno, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable journal line %s in %s", lineno, path)
+        return results
+
+
+def compact(output_path: str | Path, journal: str | Path, keep_existing: bool) -> pd.DataFrame:
+    """Fold journaled results into the output CSV.
+
+    Args:
+        output_path: Output CSV; replaced atomically.
+        journal: Journal file; removed after the CSV is written.
+        keep_existing: Keep rows already in ``output_path`` (resume);
+            journaled rows win for repeated ``record_id`` values.
+
+    Returns:
+        The compacted results.
+    """
+    output_path = Path(output_path)
+    frames = []
+    if keep_existing and output_path.exists():
+        frames.append(pd.read_csv(output_path))
+    journaled = ResultJournal.read(journal)
+    if journaled:
+        frames.append(pd.DataFrame(journaled))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if "record_id" in df.columns:
+        keys = df["record_id"].astype(str)
+        df = df[~keys.duplicated(keep="last")].reset_index(drop=True)
+
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, output_path)
+    Path(journal).unlink(missing_ok=True)
+    return df
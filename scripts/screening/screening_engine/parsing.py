@@ -0,0 +1,220 @@
+"""Parsing and normalization of provider responses."""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+DECISIONS = ("include", "exclude", "uncertain")
+
+
+def try_extract_json(text: str) -> dict[str, Any]:
+    """Extract the first JSON object from raw model output.
+
+    Args:
+        text: Raw stdout of a provider call.
+
+    Returns:
+        Parsed JSON object.
+
+    Raises:
+        ValueError: If the output is empty or contains no JSON object.
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("Empty model output")
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    codeblock = re.search(r"```json\s*(\{.*?\})\s*```", text, flags=re.DOTALL)
+    if codeblock:
+        return json.loads(codeblock.group(1))
+
+    obj = re.search(r"(\{.*\})", text, flags=re.DOTALL)
+    if obj:
+        return json.loads(obj.group(1))
+
+    raise ValueError("No JSON object found in output")
+
+
+def try_extract_json_array(text: str) -> list[Any]:
+    """Extract the first JSON array from raw model output.
+
+    Args:
+        text: Raw stdout of a batched provider call.
+
+    Returns:
+        Parsed JSON array.
+
+    Raises:
+        ValueError: If the output is empty or contains no JSON array.
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("Empty model output")
+
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, list):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+
+    codeblock = re.search(r"```json\s*(\[.*?\])\s*```", text, flags=re.DOTALL)
+    if codeblock:
+        return json.loads(codeblock.group(1))
+
+    arr = re.search(r"(\[.*\])", text, flags=re.DOTALL)
+    if arr:
+        return json.loads(arr.group(1))
+
+    raise ValueError("No JSON array found in output")
+
+
+def normalize_decision(value: str) -> str:
+    v = (value or "").strip().lower()
+    if v in {"include", "included"}:
+        return "include"
+    if v in {"exclude", "excluded"}:
+        return "exclude"
+    return "uncertain"
+
+
+ERROR_KINDS = ("spawn", "timeout", "quota", "exit", "empty", "parse")
+
+
+def failure_payload(rationale: str, raw_output: str = "", error: str = "exit") -> dict[str, Any]:
+    """Build the ``uncertain`` payload recorded when a provider call fails.
+
+    Args:
+        rationale: Human-readable failure description.
+        raw_output: Provider stdout, if any.
+        error: Failure kind, one of ``ERROR_KINDS``; stored as ``_error``.
+
+    Returns:
+        Payload; the ``_failed`` marker keeps it out of the response cache.
+    """
+    return {
+        "decision": "uncertain",
+        "confidence": 0.0,
+        "exclude_code": "NA",
+        "criteria_flags": {},
+        "rationale": rationale,
+        "raw_output": raw_output,
+        "_failed": True,
+        "_error": error,
+    }
+
+
+def normalize_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Coerce a parsed response into the per-record schema in place.
+
+    Args:
+        payload: Parsed JSON object from a provider.
+
+    Returns:
+        The same dict with ``decision``, ``confidence``, ``exclude_code`` and
+        ``rationale`` normalized.
+    """
+    payload["decision"] = normalize_decision(str(payload.get("decision", "uncertain")))
+    try:
+        payload["confidence"] = float(payload.get("confidence", 0.0) or 0.0)
+    except (TypeError, ValueError):
+        payload["confidence"] = 0.0
+    payload["exclude_code"] = payload.get("exclude_code", "NA") or "NA"
+    payload["rationale"] = str(payload.get("rationale", "")).strip()
+    payload.setdefault("criteria_flags", {})
+    return payload
+
+
+def parse_response(raw: str, provider_name: str, lenient: bool = False) -> dict[str, Any]:
+    """Parse raw provider output into a normalized payload.
+
+    Args:
+        raw: Raw stdout of the provider.
+        provider_name: Provider label used in failure rationales.
+        lenient: When no JSON object can be parsed, fall back to a keyword
+            scan of the text (the behaviour of the quota-recovery retries).
+
+    Returns:
+        Normalized payload; parse failures yield an ``uncertain`` payload.
+    """
+    try:
+        payload = try_extract_json(raw)
+        if not isinstance(payload, dict):
+            raise ValueError("JSON output is not an object")
+    except Exception as exc:
+        lowered = raw.lower()
+        if lenient and "include" in lowered:
+            payload = {"decision": "include", "confidence": 0.7, "rationale": raw[:200]}
+        elif lenient and "exclude" in lowered:
+            payload = {"decision": "exclude", "confidence": 0.7, "rationale": raw[:200]}
+        else:
+            return failure_payload(f"JSON parse error from {provider_name}: {exc}", raw, error="parse")
+    payload = normalize_payload(payload)
+    payload["raw_output"] = raw
+    return payload
+
+
+def parse_batch_response(raw: str, keys: list[str]) -> dict[str, dict[str, Any]]:
+    """Validate a batched response element by element.
+
+    An element is accepted when it is an object whose ``record_key`` is one
+    of ``keys`` (first occurrence wins) and whose ``decision`` is one of
+    ``DECISIONS`` (accepting the ``included``/``excluded`` spellings).
+
+    Args:
+        raw: Raw stdout of the batched call.
+        keys: Record keys sent in the prompt.
+
+    Returns:
+        Normalized payload per accepted key. Keys that are missing, invalid
+        or unparseable are absent and should be re-screened individually.
+    """
+    try:
+        elements = try_extract_json_array(raw)
+    except (ValueError, json.JSONDecodeError):
+        return {}
+
+    wanted = set(keys)
+    parsed: dict[str, dict[str, Any]] = {}
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        key = str(element.get("record_key", "")).strip()
+        if key not in wanted or key in parsed:
+            continue
+        decision = str(element.get("decision", "")).strip().lower()
+        if decision not in DECISIONS and decision not in {"included", "excluded"}:
+            continue
+        payload = normalize_payload(dict(element))
+        payload.pop("record_key", None)
+        parsed[key] = payload
+    return parsed
+
+
+def consensus(dec1: str, dec2: str) -> str:
+    """Strict dual-screen consensus: anything but agreement is a conflict."""
+    if dec1 == dec2 == "include":
+        return "include"
+    if dec1 == dec2 == "exclude":
+        return "exclude"
+    return "conflict"
+
+
+def lenient_consensus(dec1: str, dec2: str) -> str:
+    """Consensus used by the retry passes: one ``uncertain`` defers to the other."""
+    if dec1 == dec2 == "include":
+        return "include"
+    if dec1 == dec2 == "exclude":
+        return "exclude"
+    if {dec1, dec2} == {"include", "exclude"}:
+        return "conflict"
+    if "uncertain" in (dec1, dec2):
+        other = dec1 if dec2 == "uncertain" else dec2
+        return other if other in ("include", "exclude") else "uncertain"
+    return "conflict"
@@ -0,0 +1,198 @@
+"""Screening prompt templates shared by every screening entry point.
+
+Three templates are in use:
+
+- ``full``: the nine-criterion protocol prompt used by the primary screeners.
+- ``retry``: the six-criterion prompt used by the first Gemini-failure retry.
+- ``compact``: the short title/abstract prompt used by the quota-recovery passes.
+
+``build_batch_prompt`` packs several records into one ``full``-criteria
+prompt that asks for a JSON array keyed by ``record_key``.
+
+Each template is versioned so that cached or journaled responses can be tied
+to the exact wording that produced them.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pandas as pd
+
+
+SCREENING_PROMPT = """You are screening studies for an educational AI adoption meta-analysis.
+
+Apply these criteria:
+1) Empirical quantitative study with primary data
+2) AI technology is focal (not general ICT/IT)
+3) Educational setting/population (students, instructors, administrators)
+4) Adoption/acceptance/intention/use is measured
+5) Correlation matrix or standardized beta/path data appears available or likely
+6) English language
+7) Publication window target: 2015-2025
+8) Sample size n >= 50 (if stated or inferable from abstract)
+9) Peer-reviewed journal article or full conference paper
+
+Exclude codes:
+E1=Not empirical/quantitative, E2=AI not focal, E3=Not education context,
+E4=No adoption/acceptance outcome, E5=No effect size data,
+E6=Not English, E7=Outside 2015-2025, E8=n<50, E9=Not peer-reviewed,
+E10=Duplicate sample, E11=Qualitative/review only, E12=Other
+
+Return strict JSON:
+{{
+  "decision": "include|exclude|uncertain",
+  "confidence": 0.0,
+  "exclude_code": "E1|E2|E3|E4|E5|E6|E7|E8|E9|E10|E11|E12|NA",
+  "criteria_flags": {{
+    "quantitative": "yes|no|unclear",
+    "ai_focal": "yes|no|unclear",
+    "education_context": "yes|no|unclear",
+    "adoption_outcome": "yes|no|unclear",
+    "effect_size_reported": "yes|no|unclear",
+    "english": "yes|no|unclear",
+    "sample_size_adequate": "yes|no|unclear"
+  }},
+  "rationale": "1-2 sentences"
+}}
+
+Title: {title}
+Abstract: {abstract}
+Keywords: {keywords}
+Year: {year}
+Source: {source}
+"""
+
+RETRY_PROMPT = """You are screening studies for an educational AI adoption meta-analysis.
+
+Apply these inclusion criteria:
+1. Empirical quantitative study (surveys, experiments, quasi-experiments, SEM/path analysis)
+2. Focuses on AI tools in education (ChatGPT, AI tutors, intelligent tutoring, generative AI, LLM-based tools)
+3. Measures adoption/acceptance constructs (TAM, UTAUT, intention, perceived usefulness, self-efficacy, trust)
+4. Participants are students, teachers, or educational staff
+5. Published 2015-2025 in English
+6. Reports usable effect sizes (correlations, regression, SEM paths)
+
+Respond in JSON: {{"decision":"include|exclude|uncertain","confidence":0.0-1.0,"exclude_code":"E1-E8 or empty","rationale":"1-2 sentences"}}
+
+Exclude codes: E1=not empirical, E2=not AI-focused, E3=not education, E4=no adoption constructs, E5=qualitative only, E6=no effect sizes, E7=duplicate/secondary, E8=not English/not 2015-2025
+
+---
+Title: {title}
+Abstract: {abstract}
+Keywords: {keywords}
+Source: {source}"""
+
+COMPACT_PROMPT = """You are screening academic papers for a meta-analysis on AI adoption in education.
+
+INCLUSION CRITERIA:
+1. Empirical quantitative study (survey, experiment, longitudinal)
+2. AI-based tool/system in educational context
+3. Measures adoption, acceptance, intention to use, or actual use of AI
+4. Sample size >= 50
+5. Reports statistical relationships (correlation, regression, SEM, etc.)
+
+EXCLUSION CRITERIA:
+- Qualitative studies only
+- No adoption/acceptance measurement
+- Not educational context
+- Sample < 50
+- Review papers, meta-analyses, theoretical only
+
+Title: {title}
+Abstract: {abstract}
+
+Respond in JSON only:
+{{"decision": "include|exclude|uncertain", "confidence": 0.0-1.0, "exclude_code": "E1-E5 or empty", "rationale": "brief reason"}}"""
+
+# The batch prompt reuses the criteria and per-record schema of the full
+# prompt so the two cannot drift apart.
+_CRITERIA, _SCHEMA_AND_RECORD = SCREENING_PROMPT.split("Return strict JSON:\n")
+_RECORD_SCHEMA = _SCHEMA_AND_RECORD.split("\n\nTitle:")[0].replace(
+    "{{\n", '{{\n  "record_key": "<key of the record>",\n', 1
+)
+
+BATCH_SCREENING_PROMPT = (
+    _CRITERIA
+    + "Screen each record below independently.\n"
+    "Return a strict JSON array with exactly one object per record. Every object\n"
+    'must copy the record\'s "record_key" and follow this schema:\n'
+    + _RECORD_SCHEMA
+    + "\n\n{records}"
+)
+
+BATCH_RECORD_TEMPLATE = """### record_key: {key}
+Title: {title}
+Abstract: {abstract}
+Keywords: {keywords}
+Year: {year}
+Source: {source}
+"""
+
+PROMPT_TEMPLATES: dict[str, str] = {
+    "full": SCREENING_PROMPT,
+    "retry": RETRY_PROMPT,
+    "compact": COMPACT_PROMPT,
+}
+
+# Bump when the wording of a template changes.
+PROMPT_VERSIONS: dict[str, str] = {
+    "full": "full-v1",
+    "retry": "retry-v1",
+    "compact": "compact-v1",
+    "batch": "batch-v1",
+}
+
+
+def prompt_fields(row: pd.Series | dict[str, Any]) -> dict[str, str]:
+    """Extract the template fields of a record.
+
+    Args:
+        row: Record with ``title``, ``abstract``, ``keywords``, ``year`` and
+            ``search_source`` (or ``source_database``) fields.
+
+    Returns:
+        Mapping of template placeholder to string value.
+    """
+    return {
+        "title": str(row.get("title", "")),
+        "abstract": str(row.get("abstract", "")),
+        "keywords": str(row.get("keywords", "")),
+        "year": str(row.get("year", "")),
+        "source": str(row.get("search_source", row.get("source_database", ""))),
+    }
+
+
+def build_prompt(row: pd.Series | dict[str, Any], template: str = "full") -> str:
+    """Render the screening prompt for one record.
+
+    Args:
+        row: Record to screen.
+        template: Key of ``PROMPT_TEMPLATES``.
+
+    Returns:
+        Prompt text.
+    """
+    if template not in PROMPT_TEMPLATES:
+        raise ValueError(f"Unknown prompt template: {template}")
+    return PROMPT_TEMPLATES[template].format(**prompt_fields(row))
+
+
+def build_batch_record(row: pd.Series | dict[str, Any], key: str) -> str:
+    """Render one record's block of a batch prompt."""
+    return BATCH_RECORD_TEMPLATE.format(key=key, **prompt_fields(row))
+
+
+def build_batch_prompt(rows: list[pd.Series] | list[dict[str, Any]], keys: list[str]) -> str:
+    """Render a prompt screening several records at once.
+
+    Args:
+        rows: Records to screen.
+        keys: Stable key per record (normally its ``record_id``), echoed back
+            by the provider as ``record_key``.
+
+    Returns:
+        Prompt text.
+    """
+    blocks = "\n".join(build_batch_record(row, key) for row, key in zip(rows, keys))
+    return BATCH_SCREENING_PROMPT.format(records=blocks)
@@ -0,0 +1,342 @@
+"""Pluggable screening providers.
+
+A provider turns a prompt into a normalized screening payload (see
+``parsing.normalize_payload``). ``CLIProvider`` wraps a command-line client
+such as ``codex`` or ``gemini``; ``FallbackProvider`` walks a chain of
+providers, moving to the next one when the current one reports an exhausted
+quota. Long-lived worker processes live in ``workers``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import shlex
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+from .parsing import failure_payload, parse_response, try_extract_json
+
+logger = logging.getLogger(__name__)
+
+QUOTA_MARKERS = ("usage limit",)
+
+
+def quota_exhausted(stdout: str, stderr: str, returncode: int | None) -> bool:
+    """True if a CLI call failed because the model's quota is used up.
+
+    A marker on stderr always counts. On stdout it only counts when the call
+    failed or printed no JSON answer: a valid answer may quote the marker
+    (e.g. a rationale about usage limits of an AI tool).
+    """
+    if any(marker in stderr.lower() for marker in QUOTA_MARKERS):
+        return True
+    if not any(marker in stdout.lower() for marker in QUOTA_MARKERS):
+        return False
+    if returncode != 0:
+        return True
+    try:
+        try_extract_json(stdout)
+    except ValueError:
+        return True
+    return False
+
+
+CODEX_MODELS = ["gpt-5.1-codex-mini", "gpt-5.3-codex-spark"]
+CODEX_MODEL_CMD = ["codex", "-m", "{model}", "exec", "{prompt}"]
+GEMINI_MODEL_CMD = ["gemini", "-m", "{model}", "-p", "{prompt}"]
+
+
+@dataclass
+class ProviderCommandSet:
+    name: str
+    screen_cmd: list[str]
+    version_cmd: list[str]
+    auth_check_cmd: list[str] | None = None
+    login_cmd: list[str] | None = None
+    auth_method: str = "oauth"
+    worker_cmd: list[str] | None = None
+
+
+def default_provider_config(provider: str) -> ProviderCommandSet:
+    if provider == "codex":
+        return ProviderCommandSet(
+            name="codex",
+            screen_cmd=["codex", "exec", "{prompt}"],
+            version_cmd=["codex", "--version"],
+            auth_check_cmd=["codex", "exec", "Say OK."],
+            login_cmd=["codex", "--login"],
+            auth_method="oauth",
+        )
+    if provider == "gemini":
+        return ProviderCommandSet(
+            name="gemini",
+            screen_cmd=["gemini", "-p", "{prompt}"],
+            version_cmd=["gemini", "--version"],
+            auth_check_cmd=["gemini", "-p", "Say OK."],
+            login_cmd=["gemini", "auth", "login"],
+            auth_method="oauth",
+        )
+    raise ValueError(f"Unsupported provider: {provider}")
+
+
+def load_provider_config(config: dict[str, Any], provider: str) -> ProviderCommandSet:
+    defaults = default_provider_config(provider)
+    block = config.get("screening_cli", {}).get(provider, {})
+    return ProviderCommandSet(
+        name=provider,
+        screen_cmd=block.get("screen_cmd", defaults.screen_cmd),
+        version_cmd=block.get("version_cmd", defaults.version_cmd),
+        auth_check_cmd=block.get("auth_check_cmd", defaults.auth_check_cmd),
+        login_cmd=block.get("login_cmd", defaults.login_cmd),
+        auth_method=block.get("auth_method", defaults.auth_method),
+        worker_cmd=block.get("worker_cmd", defaults.worker_cmd),
+    )
+
+
+def run_command(cmd: list[str], timeout_s: int = 120, capture: bool = True) -> subprocess.CompletedProcess:
+    logger.debug("Running command: %s", cmd)
+    return subprocess.run(
+        cmd,
+        text=True,
+        capture_output=capture,
+        timeout=timeout_s,
+        check=False,
+    )
+
+
+def auth_preflight(provider: ProviderCommandSet, auto_login: bool, timeout_s: int) -> None:
+    version = run_command(provider.version_cmd, timeout_s=timeout_s)
+    if version.returncode != 0:
+        raise RuntimeError(f"{provider.name} CLI unavailable: {version.stderr.strip()}")
+
+    if not provider.auth_check_cmd:
+        return
+
+    check = run_command(provider.auth_check_cmd, timeout_s=timeout_s)
+    if check.returncode == 0:
+        return
+
+    if not auto_login or not provider.login_cmd:
+        raise RuntimeError(
+            f"{provider.name} auth check failed. Run login manually then retry.\n"
+            f"stderr: {check.stderr.strip()}"
+        )
+
+    print(f"[AUTH] {provider.name}: launching login flow...", file=sys.stderr)
+    login_rc = subprocess.run(provider.login_cmd, check=False).returncode
+    if login_rc != 0:
+        raise RuntimeError(f"{provider.name} login failed with exit code {login_rc}")
+
+    recheck = run_command(provider.auth_check_cmd, timeout_s=timeout_s)
+    if recheck.returncode != 0:
+        raise RuntimeError(f"{provider.name} auth still invalid after login")
+
+
+@dataclass
+class Completion:
+    """Raw outcome of one provider call.
+
+    Attributes:
+        text: Provider stdout (empty on failure).
+        model: Model that produced the output.
+        failure: ``uncertain`` payload describing the failure, or None.
+        attempts: Calls made to produce it (more than one after fallbacks).
+    """
+
+    text: str
+    model: str
+    failure: dict[str, Any] | None = None
+    attempts: int = 1
+
+
+class Provider(ABC):
+    """Interface every screening provider implements.
+
+    Subclasses implement ``complete``; ``invoke`` parses its output into a
+    normalized payload.
+
+    Attributes:
+        name: Provider family (``codex``, ``gemini``) used for result columns.
+        model: Model identifier, empty when the CLI default is used.
+        command: Command template the calls run (``{model}`` substituted,
+            ``{prompt}`` kept); part of the response-cache key.
+        label: Human-readable name used in rationales and logs.
+        lenient: Use keyword fallback when the output has no JSON object.
+    """
+
+    name: str
+    model: str = ""
+    command: str = ""
+    label: str = ""
+    lenient: bool = False
+
+    @abstractmethod
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        """Send one prompt and return the raw output.
+
+        Args:
+            prompt: Rendered prompt.
+            timeout_s: Per-call timeout in seconds.
+
+        Returns:
+            Completion; failures never raise.
+        """
+
+    async def invoke(self, prompt: str, timeout_s: int) -> dict[str, Any]:
+        """Screen one prompt.
+
+        Args:
+            prompt: Rendered screening prompt.
+            timeout_s: Per-call timeout in seconds.
+
+        Returns:
+            Normalized payload. Failures never raise; they return an
+            ``uncertain`` payload whose rationale describes the failure.
+            ``_model``, ``_latency_ms`` (wall time of the call, including
+            any rate-limit wait) and ``_attempt`` feed the structured
+            result columns.
+        """
+        t0 = time.monotonic()
+        completion = await self.complete(prompt, timeout_s)
+        if completion.failure is not None:
+            payload = completion.failure
+        else:
+            payload = parse_response(completion.text, self.label or self.name, lenient=self.lenient)
+        payload["_model"] = completion.model
+        payload["_latency_ms"] = round((time.monotonic() - t0) * 1000)
+        payload["_attempt"] = completion.attempts
+        return payload
+
+
+class CLIProvider(Provider):
+    """Provider backed by a command-line client.
+
+    The prompt is passed as an argument where the template has a ``{prompt}``
+    placeholder; templates without one receive it on stdin instead, which
+    avoids the per-argument length limit (128 KiB on Linux) for long records.
+
+    Args:
+        name: Provider family.
+        cmd: Command template; ``{prompt}`` and ``{model}`` are substituted.
+        model: Model substituted for ``{model}``.
+        label: Display name, defaults to ``name`` or ``name(model)``.
+        lenient: Use keyword fallback when the output has no JSON object.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cmd: list[str],
+        model: str = "",
+        label: str | None = None,
+        lenient: bool = False,
+    ) -> None:
+        self.name = name
+        self.cmd = list(cmd)
+        self.model = model
+        self.label = label or (f"{name}({model})" if model else name)
+        self.lenient = lenient
+        self.stdin = not any("{prompt}" in part for part in self.cmd)
+        self.command = shlex.join(part.replace("{model}", model) for part in self.cmd)
+
+    @classmethod
+    def from_command_set(cls, commands: ProviderCommandSet, **kwargs: Any) -> "CLIProvider":
+        return cls(commands.name, commands.screen_cmd, **kwargs)
+
+    def render(self, prompt: str) -> list[str]:
+        return [part.replace("{model}", self.model).replace("{prompt}", prompt) for part in self.cmd]
+
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        model = self.model or self.name
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.render(prompt),
+                stdin=asyncio.subprocess.PIPE if self.stdin else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as exc:
+            return Completion("", model, failure_payload(f"{self.label} failed: {str(exc)[:200]}", error="spawn"))
+
+        try:
+            stdin_bytes = prompt.encode("utf-8") if self.stdin else None
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(proc.communicate(stdin_bytes), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.warning("%s timed out after %ss", self.label, timeout_s)
+            return Completion("", model, failure_payload(f"{self.label} timed out after {timeout_s}s", error="timeout"))
+
+        stdout = stdout_bytes.decode("utf-8", errors="replace").strip()
+        stderr = stderr_bytes.decode("utf-8", errors="replace").strip()
+
+        if quota_exhausted(stdout, stderr, proc.returncode):
+            failure = failure_payload(f"{self.label} quota exhausted: {stderr[:200]}", stdout, error="quota")
+            return Completion("", model, failure)
+        if proc.returncode != 0:
+            return Completion("", model, failure_payload(f"{self.label} failed: {stderr[:200]}", stdout))
+        if not stdout:
+            return Completion("", model, failure_payload(f"{self.label} empty response: {stderr[:100]}", error="empty"))
+        return Completion(stdout, model)
+
+
+class FallbackProvider(Provider):
+    """Walk a chain of providers, advancing past ones whose quota is exhausted.
+
+    The position in the chain is sticky: once a provider reports an exhausted
+    quota, later calls start from the next one.
+
+    Args:
+        name: Provider family reported in results.
+        chain: Providers in order of preference.
+    """
+
+    def __init__(self, name: str, chain: list[Provider]) -> None:
+        if not chain:
+            raise ValueError("Fallback chain must not be empty")
+        self.name = name
+        self.chain = list(chain)
+        self.position = 0
+        self.label = name
+
+    @property
+    def model(self) -> str:  # type: ignore[override]
+        return self.chain[min(self.position, len(self.chain) - 1)].model
+
+    @property
+    def lenient(self) -> bool:  # type: ignore[override]
+        return self.chain[min(self.position, len(self.chain) - 1)].lenient
+
+    @property
+    def command(self) -> str:  # type: ignore[override]
+        return self.chain[min(self.position, len(self.chain) - 1)].command
+
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        attempts = 0
+        for idx in range(self.position, len(self.chain)):
+            provider = self.chain[idx]
+            completion = await provider.complete(prompt, timeout_s)
+            attempts += completion.attempts
+            if completion.failure is None or completion.failure.get("_error") != "quota":
+                completion.attempts = attempts
+                return completion
+            logger.warning("%s quota exhausted, falling back to next model", provider.label)
+            self.position = max(self.position, idx + 1)
+        return Completion(
+            "", "none", failure_payload(f"{self.name} all models exhausted", error="quota"), attempts=max(1, attempts),
+        )
+
+
+def model_chain(name: str, cmd: list[str], models: list[str], lenient: bool = False) -> FallbackProvider:
+    """Build a fallback chain running the same CLI with successive models."""
+    return FallbackProvider(name, [CLIProvider(name, cmd, model=m, lenient=lenient) for m in models])
+
+
+def provider_from_config(config: dict[str, Any], name: str) -> CLIProvider:
+    """Build the configured ``screening_cli`` provider."""
+    return CLIProvider.from_command_set(load_provider_config(config, name))
@@ -0,0 +1,610 @@
+"""Failure recovery: a persistent retry queue walked through fallback chains.
+
+A provider call that fails (``_error`` in ``parsing.ERROR_KINDS``) is queued
+by record and *slot*, the provider whose result columns hold the failure.
+``Recovery`` retries queued slots in the background while the main run
+continues, using the slot's fallback chain (by default
+``gemini-2.5-pro -> gemini-2.5-flash -> codex`` for the Gemini slot):
+
+- transient failures (timeout, non-zero exit, empty output, unparseable
+  output) are retried on the same chain step with exponential backoff and
+  jitter, up to ``RetryPolicy.max_attempts``;
+- an exhausted quota or a missing CLI moves the slot to the next step at
+  once;
+- quota errors and timeouts also cool the failing provider down for every
+  queued slot, with its own exponential backoff.
+
+A recovered answer overwrites the slot's columns (substitutes from another
+provider family are marked ``<Family>-sub(<model>)`` in the rationale), and
+the consensus is recomputed with ``lenient_consensus``. The queue lives in
+SQLite next to the output (``<output>.retry.sqlite``), so slots still
+waiting for a backoff survive a restart; ``recover_failures.py`` drains it,
+or re-queues the failures found in an existing results CSV.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+import numpy as np
+import pandas as pd
+
+from .cache import ResponseCache
+from .control import CONGESTION_ERRORS, AdaptiveControl
+from .parsing import lenient_consensus
+from .prompts import build_prompt
+from .providers import CODEX_MODEL_CMD, GEMINI_MODEL_CMD, CLIProvider, Provider
+from .schema import PROVIDERS, provider_columns, provider_values
+from .telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+# Chain steps as "<family>:<model>", tried in order for each result slot.
+DEFAULT_CHAINS = {
+    "gemini": ["gemini:gemini-2.5-pro", "gemini:gemini-2.5-flash", "codex:gpt-5.1-codex-mini"],
+    "codex": ["codex:gpt-5.1-codex-mini", "codex:gpt-5.3-codex-spark", "gemini:gemini-2.5-flash"],
+}
+
+MODEL_CMDS = {"codex": CODEX_MODEL_CMD, "gemini": GEMINI_MODEL_CMD}
+
+# Failure kinds that move a slot to the next chain step without retrying.
+ADVANCE_ERRORS = ("quota", "spawn")
+
+# Rationale formats of the providers, for results written before the
+# ``status_*``/``error_class_*`` columns existed. Checked in order; the first
+# match wins.
+RATIONALE_ERRORS = [
+    ("quota", r"quota exhausted|models exhausted|usage limit"),
+    ("timeout", r"timed out after"),
+    ("empty", r"empty response"),
+    ("parse", r"JSON parse error"),
+    ("spawn", r"failed: \[Errno"),
+    ("exit", r"failed:"),
+]
+
+
+def retry_queue_path_for(output_path: str | Path) -> Path:
+    """Retry queue kept next to an output CSV."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".retry.sqlite")
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff schedule for queued slots and cooling providers.
+
+    Attributes:
+        max_attempts: Calls per chain step before moving to the next step.
+        base_delay_s: Delay after the first failure.
+        max_delay_s: Upper bound of the delay.
+        jitter: Fraction of the delay drawn at random, so slots that failed
+            together do not retry together.
+    """
+
+    max_attempts: int = 3
+    base_delay_s: float = 30.0
+    max_delay_s: float = 900.0
+    jitter: float = 0.5
+
+    def delay(self, failures: int, rng: random.Random | None = None) -> float:
+        """Seconds to wait after ``failures`` consecutive failures (>= 1)."""
+        raw = min(self.max_delay_s, self.base_delay_s * 2 ** max(0, failures - 1))
+        return raw * (1 - self.jitter * (rng or random).random())
+
+
+@dataclass
+class RetryItem:
+    """One queued slot.
+
+    Attributes:
+        record_id: Record whose slot failed.
+        slot: Provider whose result columns are being recovered.
+        step: Position in the slot's fallback chain.
+        attempts: Failed calls on the current step.
+        error: Kind of the latest failure.
+        next_at: Epoch time of the next attempt.
+        status: ``pending``, ``recovered`` or ``failed`` (chain exhausted).
+        calls: Recovery calls made for the slot so far.
+    """
+
+    record_id: str
+    slot: str
+    step: int
+    attempts: int
+    error: str
+    next_at: float
+    status: str = "pending"
+    calls: int = 0
+
+
+class RetryQueue:
+    """SQLite store of failed slots, their records and provider cool-downs.
+
+    Args:
+        path: Database file; parent directories are created.
+        reset: Drop everything queued by an earlier run.
+    """
+
+    def __init__(self, path: str | Path, reset: bool = False) -> None:
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " record_id TEXT PRIMARY KEY, record TEXT NOT NULL, result TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS slots ("
+            " record_id TEXT, slot TEXT, step INTEGER, attempts INTEGER, error TEXT,"
+            " next_at REAL, status TEXT, calls INTEGER, provider TEXT, updated_at REAL,"
+            " PRIMARY KEY (record_id, slot));"
+            "CREATE TABLE IF NOT EXISTS providers ("
+            " label TEXT PRIMARY KEY, failures INTEGER, next_at REAL);"
+        )
+        if reset:
+            self.conn.executescript("DELETE FROM records; DELETE FROM slots; DELETE FROM providers;")
+        self.conn.commit()
+
+    def add(self, record: dict[str, Any], result: dict[str, Any], slot: str, error: str, provider: str) -> None:
+        """Queue a failed slot; a slot already pending keeps its schedule.
+
+        Args:
+            record: Input record (prompt fields).
+            result: Current result row of the record.
+            slot: Provider whose columns failed.
+            error: Failure kind.
+            provider: Label of the first chain step.
+        """
+        record_id = str(result["record_id"])
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+            (record_id, _dumps(record), _dumps(result)),
+        )
+        self.conn.execute(
+            "INSERT INTO slots VALUES (?, ?, 0, 0, ?, ?, 'pending', 0, ?, ?)"
+            " ON CONFLICT (record_id, slot) DO UPDATE SET"
+            " step = 0, attempts = 0, error = excluded.error, next_at = excluded.next_at,"
+            " status = 'pending', calls = 0, provider = excluded.provider, updated_at = excluded.updated_at"
+            " WHERE slots.status != 'pending'",
+            (record_id, slot, error, now, provider, now),
+        )
+        self.conn.commit()
+
+    def due(self, now: float, limit: int) -> list[RetryItem]:
+        """Pending slots whose backoff and provider cool-down have passed."""
+        rows = self.conn.execute(
+            "SELECT s.record_id, s.slot, s.step, s.attempts, s.error, s.next_at, s.status, s.calls"
+            " FROM slots s LEFT JOIN providers p ON p.label = s.provider"
+            " WHERE s.status = 'pending' AND s.next_at <= ? AND COALESCE(p.next_at, 0) <= ?"
+            " ORDER BY s.next_at LIMIT ?",
+            (now, now, limit),
+        ).fetchall()
+        return [RetryItem(*row) for row in rows]
+
+    def next_wakeup(self) -> float | None:
+        """Earliest time a pending slot becomes due, or None when none is pending."""
+        row = self.conn.execute(
+            "SELECT MIN(MAX(s.next_at, COALESCE(p.next_at, 0)))"
+            " FROM slots s LEFT JOIN providers p ON p.label = s.provider WHERE s.status = 'pending'"
+        ).fetchone()
+        return row[0]
+
+    def record(self, record_id: str) -> tuple[dict[str, Any], dict[str, Any]]:
+        """The queued input record and current result row."""
+        record, result = self.conn.execute(
+            "SELECT record, result FROM records WHERE record_id = ?", (record_id,)
+        ).fetchone()
+        return json.loads(record), json.loads(result)
+
+    def reschedule(self, item: RetryItem, provider: str) -> None:
+        self.conn.execute(
+            "UPDATE slots SET step = ?, attempts = ?, error = ?, next_at = ?, status = ?, calls = ?,"
+            " provider = ?, updated_at = ? WHERE record_id = ? AND slot = ?",
+            (item.step, item.attempts, item.error, item.next_at, item.status, item.calls, provider,
+             time.time(), item.record_id, item.slot),
+        )
+        self.conn.commit()
+
+    def resolve(self, item: RetryItem, result: dict[str, Any]) -> None:
+        """Mark a slot recovered and store the updated result row."""
+        self.conn.execute(
+            "UPDATE records SET result = ? WHERE record_id = ?", (_dumps(result), item.record_id)
+        )
+        item.status = "recovered"
+        self.reschedule(item, "")
+
+    def provider_failed(self, label: str, policy: RetryPolicy) -> float:
+        """Count a congestion failure of ``label`` and return its cool-down in seconds."""
+        row = self.conn.execute("SELECT failures FROM providers WHERE label = ?", (label,)).fetchone()
+        failures = (row[0] if row else 0) + 1
+        delay = policy.delay(failures)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO providers VALUES (?, ?, ?)", (label, failures, time.time() + delay)
+        )
+        self.conn.commit()
+        return delay
+
+    def provider_ok(self, label: str) -> None:
+        self.conn.execute("DELETE FROM providers WHERE label = ?", (label,))
+        self.conn.commit()
+
+    def counts(self) -> dict[str, int]:
+        """Number of slots per status."""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM slots GROUP BY status").fetchall())
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _dumps(value: dict[str, Any]) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def chain_provider(spec: str, commands: dict[str, list[str]] | None = None, lenient: bool = False) -> CLIProvider:
+    """Build one chain step from a ``<family>:<model>`` spec."""
+    family, _, model = spec.partition(":")
+    cmds = {**MODEL_CMDS, **(commands or {})}
+    if family not in cmds:
+        raise ValueError(f"Unsupported provider in fallback chain: {spec}")
+    return CLIProvider(family, cmds[family], model=model, lenient=lenient)
+
+
+def classify_rationales(rationales: pd.Series) -> pd.Series:
+    """Failure kind of each rationale, or ``""`` for answers.
+
+    For results written without the ``error_class_*`` columns; only
+    meaningful on rows whose decision is ``uncertain``.
+    """
+    text = rationales.astype("string").fillna("")
+    conditions = [text.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)
+                  for _, pattern in RATIONALE_ERRORS]
+    kinds = np.select(conditions, [kind for kind, _ in RATIONALE_ERRORS], default="")
+    return pd.Series(kinds, index=rationales.index)
+
+
+def failed_slots(results: pd.DataFrame) -> pd.DataFrame:
+    """Slots of a results table that hold a provider failure.
+
+    Rows with a ``status_<slot>`` value are selected on ``status == failed``
+    and take the kind from ``error_class_<slot>``; older rows without one
+    fall back to ``classify_rationales``.
+
+    Returns:
+        Frame with ``record_id``, ``slot`` and ``error`` columns.
+    """
+    frames = []
+    for slot in PROVIDERS:
+        decision, rationale = f"screen_decision_{slot}", f"rationale_{slot}"
+        if decision not in results.columns or rationale not in results.columns:
+            continue
+        kinds = classify_rationales(results[rationale])
+        failed = (results[decision].astype(str) == "uncertain") & (kinds != "")
+        status, error_class = f"status_{slot}", f"error_class_{slot}"
+        if status in results.columns:
+            structured = results[status].notna() & (results[status].astype(str) != "")
+            failed = failed.where(~structured, results[status].astype(str) == "failed")
+            if error_class in results.columns:
+                errors = results[error_class].astype("string").fillna("").replace("", "exit")
+                kinds = kinds.where(~structured, errors.astype(object))
+        frames.append(pd.DataFrame({
+            "record_id": results.loc[failed, "record_id"].astype(str),
+            "slot": slot,
+            "error": kinds[failed],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["record_id", "slot", "error"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def recovered_row(
+    result: dict[str, Any], slot: str, provider: Provider, payload: dict[str, Any], calls: int = 1,
+) -> dict[str, Any]:
+    """Write a recovered payload into ``slot`` and recompute the consensus.
+
+    ``attempt_<slot>`` becomes the row's earlier attempt count (1 when
+    unknown) plus the ``calls`` made by the recovery.
+    """
+    model = payload.get("_model") or provider.model or provider.name
+    earlier = pd.to_numeric(pd.Series([result.get(f"attempt_{slot}")]), errors="coerce").fillna(1).iloc[0]
+    row = {**result, **provider_values(slot, payload)}
+    row[f"attempt_{slot}"] = int(max(1, earlier)) + calls
+    if provider.name != slot:
+        row[f"rationale_{slot}"] = f"{provider.name.capitalize()}-sub({model}): {payload['rationale']}"
+    row[f"oauth_auth_method_{slot}"] = f"retry_{model}"
+    others = [str(row.get(f"screen_decision_{p}", "")).strip().lower() for p in PROVIDERS if p != slot]
+    decided = [d for d in others if d in ("include", "exclude", "uncertain")]
+    row["screen_consensus"] = (
+        lenient_consensus(decided[0], payload["decision"]) if decided else payload["decision"]
+    )
+    return row
+
+
+def recovery_columns(slot: str) -> list[str]:
+    """Result columns a recovery of ``slot`` may change."""
+    return ["record_id", *provider_columns(slot), f"oauth_auth_method_{slot}", "screen_consensus"]
+
+
+class Recovery:
+    """Background retries of failed slots through their fallback chains.
+
+    Args:
+        queue: Persistent retry queue.
+        chains: Fallback chain per slot.
+        timeout_s: Per-call timeout in seconds.
+        policy: Backoff schedule.
+        template: Prompt template for retried calls.
+        workers: Concurrent retry calls.
+        on_update: Called with ``(result_row, slot)`` for every recovered
+            slot; the row is the full updated result.
+        poll_s: Longest idle sleep between queue scans.
+    """
+
+    def __init__(
+        self,
+        queue: RetryQueue,
+        chains: dict[str, list[Provider]],
+        timeout_s: int,
+        policy: RetryPolicy | None = None,
+        template: str = "retry",
+        workers: int = 2,
+        on_update: Callable[[dict[str, Any], str], None] | None = None,
+        poll_s: float = 5.0,
+    ) -> None:
+        self.queue = queue
+        self.chains = {slot: list(chain) for slot, chain in chains.items() if chain}
+        self.timeout_s = timeout_s
+        self.policy = policy or RetryPolicy()
+        self.template = template
+        self.workers = max(1, workers)
+        self.on_update = on_update
+        self.poll_s = poll_s
+        self.recovered = 0
+        self.exhausted = 0
+        self._active: set[tuple[str, str]] = set()
+        self._wake = asyncio.Event()
+        self._deadline: float | None = None
+
+    def add(self, record: pd.Series | dict[str, Any], result: dict[str, Any], slot: str, error: str) -> bool:
+        """Queue one failed slot; returns False when ``slot`` has no chain."""
+        chain = self.chains.get(slot)
+        if chain is None:
+            return False
+        fields = record.to_dict() if isinstance(record, pd.Series) else dict(record)
+        fields = {k: v for k, v in fields.items() if not str(k).startswith("_")}
+        self.queue.add(fields, result, slot, error or "exit", chain[0].label)
+        self._wake.set()
+        return True
+
+    def observe(self, row: pd.Series, payloads: dict[str, dict[str, Any]], result: dict[str, Any]) -> None:
+        """``RecordScreener`` row hook: queue every failed provider call of ``row``."""
+        for slot, payload in payloads.items():
+            if payload.get("_failed"):
+                self.add(row, result, slot, payload.get("_error", "exit"))
+
+    def add_failures(self, results: pd.DataFrame, records: pd.DataFrame | None = None) -> int:
+        """Queue the failed slots of an existing results table.
+
+        Args:
+            results: Screening output.
+            records: Input records by ``record_id`` supplying the prompt
+                fields; without them the result row (title only) is used.
+
+        Returns:
+            Number of slots queued.
+        """
+        failures = failed_slots(results)
+        if len(failures) == 0:
+            return 0
+        by_id = results.assign(_key=results["record_id"].astype(str)).drop_duplicates("_key").set_index("_key")
+        inputs = None
+        if records is not None:
+            inputs = records.assign(_key=records["record_id"].astype(str)).drop_duplicates("_key").set_index("_key")
+        queued = 0
+        for record_id, slot, error in failures.itertuples(index=False):
+            result = by_id.loc[record_id].to_dict()
+            record = inputs.loc[record_id] if inputs is not None and record_id in inputs.index else result
+            queued += self.add(record, result, slot, error)
+        return queued
+
+    async def attempt(self, item: RetryItem) -> None:
+        """Make one call for a queued slot and reschedule or resolve it."""
+        chain = self.chains[item.slot]
+        provider = chain[item.step]
+        record, _ = self.queue.record(item.record_id)
+        payload = await provider.invoke(build_prompt(record, self.template), self.timeout_s)
+        item.calls += payload.get("_attempt", 1)
+        if not payload.get("_failed"):
+            # Re-read the row: the record's other slot may have been recovered meanwhile.
+            _, result = self.queue.record(item.record_id)
+            row = recovered_row(result, item.slot, provider, payload, item.calls)
+            self.queue.resolve(item, row)
+            self.queue.provider_ok(provider.label)
+            self.recovered += 1
+            logger.debug("%s %s recovered by %s", item.record_id, item.slot, provider.label)
+            if self.on_update is not None:
+                self.on_update(row, item.slot)
+            return
+
+        now = time.time()
+        item.error = payload.get("_error", "exit")
+        item.attempts += 1
+        if item.error in CONGESTION_ERRORS:
+            cooldown = self.queue.provider_failed(provider.label, self.policy)
+            logger.info("%s %s; cooling down for %.0fs", provider.label, item.error, cooldown)
+        if item.error in ADVANCE_ERRORS or item.attempts >= self.policy.max_attempts:
+            item.step += 1
+            item.attempts = 0
+            item.next_at = now
+            if item.step >= len(chain):
+                item.status = "failed"
+                self.exhausted += 1
+                logger.warning("%s %s: fallback chain exhausted (%s)", item.record_id, item.slot, item.error)
+                self.queue.reschedule(item, "")
+                return
+        else:
+            item.next_at = now + self.policy.delay(item.attempts)
+        self.queue.reschedule(item, chain[item.step].label)
+
+    async def run(self) -> None:
+        """Work the queue until ``stop`` is called and the drain window closes."""
+        tasks: set[asyncio.Task[None]] = set()
+        try:
+            while True:
+                now = time.time()
+                free = self.workers - len(tasks)
+                if free > 0:
+                    for item in self.queue.due(now, free + len(self._active)):
+                        key = (item.record_id, item.slot)
+                        if key in self._active or free == 0:
+                            continue
+                        self._active.add(key)
+                        task = asyncio.create_task(self.attempt(item))
+                        task.add_done_callback(lambda _t, key=key: self._active.discard(key))
+                        tasks.add(task)
+                        free -= 1
+                wakeup = self.queue.next_wakeup()
+                if self._deadline is not None and not tasks and (wakeup is None or wakeup > self._deadline):
+                    return
+                timeout = self.poll_s if wakeup is None else min(self.poll_s, max(0.01, wakeup - now))
+                self._wake.clear()
+                waiter = asyncio.create_task(self._wake.wait())
+                done, _ = await asyncio.wait({*tasks, waiter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                for task in done - {waiter}:
+                    tasks.discard(task)
+                    task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self, drain_s: float = 0.0) -> None:
+        """Let ``run`` return once nothing is in flight or due within ``drain_s`` seconds."""
+        self._deadline = time.time() + drain_s
+        self._wake.set()
+
+    async def drain(self, drain_s: float = 0.0) -> None:
+        """Work the queue now, waiting up to ``drain_s`` seconds for backoffs."""
+        self.stop(drain_s)
+        await self.run()
+
+    @asynccontextmanager
+    async def running(self, drain_s: float = 0.0) -> AsyncIterator["Recovery"]:
+        """Retry in the background while the block runs, then drain for ``drain_s`` seconds."""
+        self._deadline = None
+        task = asyncio.create_task(self.run())
+        try:
+            yield self
+        except BaseException:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        self.stop(drain_s)
+        await task
+
+    def summary(self) -> str:
+        counts = self.queue.counts()
+        return (
+            f"recovery: {self.recovered} slots recovered, {self.exhausted} chains exhausted this run; "
+            f"queue {counts.get('pending', 0)} pending, {counts.get('recovered', 0)} recovered, "
+            f"{counts.get('failed', 0)} failed"
+        )
+
+
+def recovery_settings(config: dict[str, Any]) -> dict[str, Any]:
+    """The ``screening_recovery`` config block with defaults filled in."""
+    block = config.get("screening_recovery", {}) or {}
+    return {
+        "chains": {**DEFAULT_CHAINS, **block.get("chains", {})},
+        "commands": block.get("commands", {}),
+        "template": block.get("template", "retry"),
+        "lenient": bool(block.get("lenient", False)),
+        "policy": RetryPolicy(**block.get("backoff", {})),
+    }
+
+
+def recovery_from_config(
+    config: dict[str, Any],
+    queue: RetryQueue,
+    timeout_s: int,
+    workers: int = 2,
+    cache: ResponseCache | None = None,
+    control: AdaptiveControl | None = None,
+    on_update: Callable[[dict[str, Any], str], None] | None = None,
+    telemetry: Telemetry | None = None,
+) -> Recovery:
+    """Build a ``Recovery`` from the ``screening_recovery`` config block.
+
+    Chain providers share ``cache``, the per-provider limits of ``control``
+    and the metrics of ``telemetry`` with the main run.
+    """
+    settings = recovery_settings(config)
+    chains: dict[str, list[Provider]] = {}
+    for slot, specs in settings["chains"].items():
+        chain: list[Provider] = []
+        for spec in specs:
+            provider: Provider = chain_provider(spec, settings["commands"], lenient=settings["lenient"])
+            if telemetry is not None:
+                provider = telemetry.wrap(provider)
+            if control is not None:
+                provider = control.wrap(provider)
+            if cache is not None:
+                provider = cache.wrap(provider, settings["template"])
+            chain.append(provider)
+        chains[slot] = chain
+    return Recovery(
+        queue, chains, timeout_s, policy=settings["policy"], template=settings["template"],
+        workers=workers, on_update=on_update,
+    )
+
+
+def add_recovery_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the background-recovery options shared by screening CLIs."""
+    parser.add_argument(
+        "--recover", action="store_true",
+        help="Retry failed provider calls in the background through the screening_recovery fallback chains",
+    )
+    parser.add_argument("--recover-workers", type=int, default=2, help="Concurrent retry calls (default: 2)")
+    parser.add_argument(
+        "--recover-wait", type=float, default=600.0,
+        help="Seconds to keep retrying after screening ends; later retries stay queued (default: 600)",
+    )
+    parser.add_argument(
+        "--retry-queue", type=str, default=None,
+        help="SQLite retry queue (default: <output>.retry.sqlite)",
+    )
+
+
+def recovery_from_args(
+    args: argparse.Namespace,
+    config: dict[str, Any],
+    output_path: str | Path,
+    resume: bool = False,
+    cache: ResponseCache | None = None,
+    control: AdaptiveControl | None = None,
+    on_update: Callable[[dict[str, Any], str], None] | None = None,
+    telemetry: Telemetry | None = None,
+) -> Recovery | None:
+    """Build the ``Recovery`` selected by ``add_recovery_arguments`` options.
+
+    The queue is kept across ``resume`` runs and started afresh otherwise.
+    """
+    if not args.recover:
+        return None
+    queue = RetryQueue(args.retry_queue or retry_queue_path_for(output_path), reset=not resume)
+    return recovery_from_config(
+        config, queue, args.timeout, workers=args.recover_workers, cache=cache, control=control,
+        on_update=on_update, telemetry=telemetry,
+    )
@@ -0,0 +1,237 @@
+"""Shared async scheduler for screening runs.
+
+``run_pool`` runs a screening coroutine over records through a bounded
+producer/consumer queue; ``ScreeningRun`` adds the result journal, resume and progress
+reporting on top of it and owns the output file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator
+
+import pandas as pd
+
+from .journal import ResultJournal, compact, journal_path_for
+from .telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+# Screens one record (pd.Series -> row) or, in batch mode, a chunk
+# (pd.DataFrame -> list of rows).
+ScreenFn = Callable[[Any], Awaitable[Any]]
+
+# Sentinel telling a consumer that the queue is exhausted.
+_DONE = object()
+
+
+def prepare_record_id(df: pd.DataFrame) -> pd.DataFrame:
+    if "record_id" in df.columns:
+        return df
+    out = df.copy()
+    out.insert(0, "record_id", range(1, len(out) + 1))
+    return out
+
+
+def load_records(path: str | Path) -> pd.DataFrame:
+    """Read an input CSV and ensure it has a ``record_id`` column."""
+    return prepare_record_id(pd.read_csv(path))
+
+
+def iter_items(rows: pd.DataFrame, batch_size: int = 1) -> Iterator[Any]:
+    """Lazily yield records (``pd.Series``) or chunks (``pd.DataFrame``)."""
+    if batch_size > 1:
+        for start in range(0, len(rows), batch_size):
+            yield rows.iloc[start:start + batch_size]
+    else:
+        for _, row in rows.iterrows():
+            yield row
+
+
+async def run_pool(
+    rows: pd.DataFrame,
+    screen_fn: ScreenFn,
+    workers: int,
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+    label: str = "screening",
+    progress_every: int = 100,
+    batch_size: int = 1,
+    collect: bool = True,
+    telemetry: Telemetry | None = None,
+) -> list[dict[str, Any]]:
+    """Screen records with ``workers`` consumers over a bounded queue.
+
+    A producer feeds records from ``iter_items`` into an ``asyncio.Queue``
+    of size ``2 * workers``; each consumer screens one item at a time. Only
+    the queued and in-flight items exist at any moment, so memory and
+    scheduler overhead do not grow with the input size.
+
+    Args:
+        rows: Records to screen.
+        screen_fn: Coroutine function screening one record, or, when
+            ``batch_size`` > 1, a chunk of records returning one result each.
+        workers: Number of consumers, i.e. concurrent records (or chunks).
+        on_result: Called with each result as it completes.
+        label: Name used in progress logs.
+        progress_every: Log progress every this many completed records.
+        batch_size: Records per ``screen_fn`` call.
+        collect: Return the results; disable when ``on_result`` consumes
+            them to keep memory flat.
+        telemetry: Receives the queue and per-record progress as stage
+            ``label``.
+
+    Returns:
+        Results in completion order (empty when ``collect`` is False).
+    """
+    workers = max(1, workers)
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=2 * workers)
+    total = len(rows)
+    results: list[dict[str, Any]] = []
+    done = 0
+    next_report = progress_every
+    t_start = time.monotonic()
+    stage = telemetry.stage(label, total) if telemetry is not None else None
+    if stage is not None:
+        stage.queue = queue
+        stage.started_at = t_start
+
+    async def produce() -> None:
+        for item in iter_items(rows, batch_size):
+            await queue.put(item)
+        for _ in range(workers):
+            await queue.put(_DONE)
+
+    async def consume() -> None:
+        nonlocal done, next_report
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            out = await screen_fn(item)
+            for result in out if batch_size > 1 else [out]:
+                if collect:
+                    results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                done += 1
+                if stage is not None:
+                    stage.done += 1
+            if done >= next_report:
+                next_report = (done // progress_every + 1) * progress_every
+                elapsed = time.monotonic() - t_start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                remaining = (total - done) / rate if rate > 0 else 0.0
+                logger.info(
+                    "%s progress: %s/%s (%.1f rec/min, ~%.0fm left)",
+                    label, done, total, rate * 60, remaining / 60,
+                )
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(consume()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    if stage is not None:
+        stage.finished_at = time.monotonic()
+    return results
+
+
+class ScreeningRun:
+    """Result journal and output writer for one output file.
+
+    Results are appended to a JSONL journal next to the output
+    (``<output>.journal.jsonl``) as they complete, so checkpointing costs
+    O(1) per record. ``finish`` compacts the journal into the output CSV.
+
+    Args:
+        output_path: CSV receiving the results.
+        save_every: Journal ``fsync`` interval in completed records.
+        resume: Treat records in ``output_path`` and in a leftover journal
+            as done; otherwise a leftover journal is discarded.
+        telemetry: Live metrics every ``run`` reports its stage to.
+    """
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        save_every: int = 50,
+        resume: bool = False,
+        telemetry: Telemetry | None = None,
+    ) -> None:
+        self.output_path = Path(output_path)
+        self.telemetry = telemetry
+        self.journal_path = journal_path_for(self.output_path)
+        self.resume = resume
+        self.done_ids: set[str] = set()
+        self.completed = 0
+        if resume:
+            if self.output_path.exists():
+                existing = pd.read_csv(self.output_path, usecols=["record_id"])
+                self.done_ids.update(existing["record_id"].astype(str))
+            journaled = ResultJournal.read(self.journal_path)
+            self.done_ids.update(str(r["record_id"]) for r in journaled)
+            if journaled:
+                logger.info("Recovered %s records from journal %s", len(journaled), self.journal_path)
+        self.journal = ResultJournal(self.journal_path, sync_every=save_every, truncate=not resume)
+
+    def pending(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Records not yet present in the output or journal."""
+        if not self.done_ids:
+            return records
+        todo = records[~records["record_id"].astype(str).isin(self.done_ids)].copy()
+        logger.info("Resume: %s done, %s remaining", len(self.done_ids), len(todo))
+        return todo
+
+    def add(self, result: dict[str, Any]) -> None:
+        self.journal.append(result)
+        self.done_ids.add(str(result["record_id"]))
+        self.completed += 1
+
+    def extend(self, results: list[dict[str, Any]]) -> None:
+        for result in results:
+            self.add(result)
+
+    def add_frame(self, results: pd.DataFrame) -> None:
+        """Record a frame of results built column-wise (e.g. ``tier1_results``)."""
+        self.journal.append_frame(results)
+        self.done_ids.update(results["record_id"].astype(str))
+        self.completed += len(results)
+
+    def update(self, result: dict[str, Any]) -> None:
+        """Journal a revised row for a record already recorded; it replaces the earlier row."""
+        self.journal.append(result)
+
+    def checkpoint(self) -> None:
+        """Force journaled results to disk."""
+        self.journal.sync()
+
+    async def run(
+        self,
+        rows: pd.DataFrame,
+        screen_fn: ScreenFn,
+        workers: int,
+        label: str = "screening",
+        batch_size: int = 1,
+    ) -> None:
+        """Screen ``rows`` and record every result."""
+        if len(rows) == 0:
+            return
+        t_start = time.monotonic()
+        await run_pool(
+            rows, screen_fn, workers, on_result=self.add, label=label, batch_size=batch_size, collect=False,
+            telemetry=self.telemetry,
+        )
+        logger.info("%s done: %s records in %.1f min", label, len(rows), (time.monotonic() - t_start) / 60)
+
+    def finish(self) -> pd.DataFrame:
+        """Compact the journal into the output CSV and return the results."""
+        self.journal.close()
+        df = compact(self.output_path, self.journal_path, keep_existing=self.resume)
+        logger.info("Output written: %s rows (%s new) to %s", len(df), self.completed, self.output_path)
+        return df
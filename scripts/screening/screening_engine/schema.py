@@ -0,0 +1,174 @@
+"""The single result schema written by every screening entry point."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+PROVIDERS = ("codex", "gemini")
+
+HUMAN_COLUMNS = [
+    "human1_decision",
+    "human2_decision",
+    "adjudicated_final_decision",
+    "exclude_code",
+    "decision_rationale",
+    "adjudicator_id",
+]
+
+RESULT_COLUMNS = [
+    "record_id",
+    "title",
+    "year",
+    "search_source",
+    "screen_decision_codex",
+    "screen_decision_gemini",
+    "screen_confidence_codex",
+    "screen_confidence_gemini",
+    "exclude_code_codex",
+    "exclude_code_gemini",
+    "rationale_codex",
+    "rationale_gemini",
+    "screen_consensus",
+    "screening_tier",
+    "oauth_auth_method_codex",
+    "oauth_auth_method_gemini",
+    "status_codex",
+    "status_gemini",
+    "error_class_codex",
+    "error_class_gemini",
+    "latency_ms_codex",
+    "latency_ms_gemini",
+    "attempt_codex",
+    "attempt_gemini",
+    "provider_model_codex",
+    "provider_model_gemini",
+    *HUMAN_COLUMNS,
+]
+
+# ``status_*`` values: answered by a call, answered from the response cache,
+# call failed (``error_class_*`` holds the ``parsing.ERROR_KINDS`` value),
+# provider not asked, or decided by a rule such as the Tier-1 keyword filter.
+STATUSES = ("ok", "cached", "failed", "not_run", "rule")
+
+# Placeholder used for a provider that was not asked to screen a record.
+NOT_RUN = {"decision": "N/A", "confidence": 0.0, "exclude_code": "N/A", "rationale": "", "_status": "not_run"}
+
+
+def provider_columns(provider: str) -> list[str]:
+    """Result columns owned by one provider."""
+    return [
+        f"screen_decision_{provider}",
+        f"screen_confidence_{provider}",
+        f"exclude_code_{provider}",
+        f"rationale_{provider}",
+        f"status_{provider}",
+        f"error_class_{provider}",
+        f"latency_ms_{provider}",
+        f"attempt_{provider}",
+        f"provider_model_{provider}",
+    ]
+
+
+def payload_status(payload: dict[str, Any]) -> str:
+    """The ``STATUSES`` value of a normalized payload."""
+    if payload.get("_status"):
+        return payload["_status"]
+    if payload.get("_failed"):
+        return "failed"
+    return "cached" if payload.get("_cached") else "ok"
+
+
+def provider_values(provider: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Map a normalized payload onto the provider's result columns.
+
+    The structured columns come from the payload's internal keys: ``_error``
+    (``error_class``), ``_latency_ms``, ``_attempt`` and ``_model``, as set
+    by ``Provider.invoke``.
+    """
+    status = payload_status(payload)
+    called = status in ("ok", "cached", "failed")
+    return {
+        f"screen_decision_{provider}": payload["decision"],
+        f"screen_confidence_{provider}": payload["confidence"],
+        f"exclude_code_{provider}": payload["exclude_code"],
+        f"rationale_{provider}": payload["rationale"],
+        f"status_{provider}": status,
+        f"error_class_{provider}": payload.get("_error", "exit") if status == "failed" else "",
+        f"latency_ms_{provider}": int(payload.get("_latency_ms", 0)),
+        f"attempt_{provider}": int(payload.get("_attempt", 1 if called else 0)),
+        f"provider_model_{provider}": payload.get("_model", ""),
+    }
+
+
+def build_result_row(
+    row: pd.Series | dict[str, Any],
+    payloads: dict[str, dict[str, Any]],
+    consensus: str,
+    tier: str = "",
+    auth_methods: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Assemble one output row in ``RESULT_COLUMNS`` order.
+
+    Args:
+        row: Input record.
+        payloads: Normalized payload per provider; providers missing from
+            the mapping are filled with ``NOT_RUN``.
+        consensus: Value for ``screen_consensus``.
+        tier: Value for ``screening_tier``.
+        auth_methods: ``oauth_auth_method_*`` value per provider; defaults to
+            ``oauth`` for providers that ran and ``N/A`` otherwise.
+
+    Returns:
+        Output row.
+    """
+    auth_methods = auth_methods or {}
+    out: dict[str, Any] = {
+        "record_id": row["record_id"],
+        "title": row.get("title", ""),
+        "year": row.get("year", ""),
+        "search_source": row.get("search_source", row.get("source_database", "")),
+    }
+    for provider in PROVIDERS:
+        out.update(provider_values(provider, payloads.get(provider, NOT_RUN)))
+    out["screen_consensus"] = consensus
+    out["screening_tier"] = tier
+    for provider in PROVIDERS:
+        default = "oauth" if provider in payloads else "N/A"
+        out[f"oauth_auth_method_{provider}"] = auth_methods.get(provider, default)
+    for col in HUMAN_COLUMNS:
+        out[col] = ""
+    return {col: out[col] for col in RESULT_COLUMNS}
+
+
+def apply_updates(df: pd.DataFrame, updates: list[dict[str, Any]]) -> pd.DataFrame:
+    """Write per-record updates into a results table by ``record_id``.
+
+    Every key other than ``record_id`` is treated as a column to overwrite;
+    unknown columns are created. Records not present in ``df`` are ignored.
+
+    Args:
+        df: Results table, modified in place.
+        updates: Partial rows keyed by ``record_id``.
+
+    Returns:
+        ``df``.
+    """
+    if not updates:
+        return df
+    upd = pd.DataFrame(updates).drop_duplicates("record_id", keep="last")
+    ids = df["record_id"].astype(str)
+    first = ~ids.duplicated().to_numpy()
+    lookup = pd.Index(ids[first]).get_indexer(upd["record_id"].astype(str))
+    found = lookup >= 0
+    upd = upd[found]
+    positions = np.flatnonzero(first)[lookup[found]]
+    for col in upd.columns.drop("record_id"):
+        if col not in df.columns:
+            df[col] = pd.Series([pd.NA] * len(df), index=df.index, dtype=object)
+        if df[col].dtype != upd[col].dtype:
+            df[col] = df[col].astype(object)
+        df.iloc[positions, df.columns.get_loc(col)] = upd[col].to_numpy()
+    return df
@@ -0,0 +1,234 @@
+"""Per-record and batched screening: prompt, fan out to providers, build result rows."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+import pandas as pd
+
+from .cache import ResponseCache
+from .parsing import consensus, parse_batch_response
+from .prompts import PROMPT_VERSIONS, build_batch_prompt, build_batch_record, build_prompt
+from .providers import Provider
+from .schema import build_result_row
+
+logger = logging.getLogger(__name__)
+
+
+class RecordScreener:
+    """Screen one record with one or two providers.
+
+    With two providers the calls run concurrently and the row's consensus is
+    the strict agreement of both; with a single provider its decision is the
+    consensus.
+
+    Args:
+        providers: Providers to call, keyed into result columns by ``name``.
+        timeout_s: Per-call timeout in seconds.
+        template: Prompt template key.
+        tier: Value written to ``screening_tier``.
+        placeholders: Payload written for providers that are not called,
+            keyed by provider name.
+        auth_methods: ``oauth_auth_method_*`` value per provider.
+        cache: Response cache consulted before every provider call.
+        on_row: Called with ``(record, payloads, result_row)`` for every
+            built row, e.g. ``Recovery.observe``.
+    """
+
+    def __init__(
+        self,
+        providers: list[Provider],
+        timeout_s: int,
+        template: str = "full",
+        tier: str = "",
+        placeholders: dict[str, dict[str, Any]] | None = None,
+        auth_methods: dict[str, str] | None = None,
+        cache: ResponseCache | None = None,
+        on_row: Callable[[pd.Series, dict[str, dict[str, Any]], dict[str, Any]], None] | None = None,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one provider is required")
+        if cache is not None:
+            providers = [cache.wrap(p, template) for p in providers]
+        self.providers = list(providers)
+        self.timeout_s = timeout_s
+        self.template = template
+        self.tier = tier
+        self.placeholders = placeholders or {}
+        self.auth_methods = auth_methods
+        self.on_row = on_row
+
+    async def screen_payloads(self, row: pd.Series) -> dict[str, dict[str, Any]]:
+        """Call every provider on the record's prompt concurrently."""
+        prompt = build_prompt(row, self.template)
+        results = await asyncio.gather(*(p.invoke(prompt, self.timeout_s) for p in self.providers))
+        return {p.name: payload for p, payload in zip(self.providers, results)}
+
+    async def __call__(self, row: pd.Series) -> dict[str, Any]:
+        t0 = time.monotonic()
+        payloads = await self.screen_payloads(row)
+        logger.debug("%s done in %.1fs", row["record_id"], time.monotonic() - t0)
+
+        return self.build_row(row, payloads)
+
+    def build_row(self, row: pd.Series, payloads: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """Combine provider payloads into one result row."""
+        decisions = [payloads[p.name]["decision"] for p in self.providers]
+        agreed = decisions[0] if len(decisions) == 1 else consensus(decisions[0], decisions[1])
+        return self.observed(row, payloads, build_result_row(
+            row,
+            {**self.placeholders, **payloads},
+            consensus=agreed,
+            tier=self.tier,
+            auth_methods=self._auth_methods(),
+        ))
+
+    def observed(
+        self, row: pd.Series, payloads: dict[str, dict[str, Any]], result: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Pass a built row to ``on_row`` and return it."""
+        if self.on_row is not None:
+            self.on_row(row, payloads, result)
+        return result
+
+    def _auth_methods(self) -> dict[str, str]:
+        methods = {name: "N/A" for name in self.placeholders}
+        methods.update(self.auth_methods or {})
+        return methods
+
+
+class BatchScreener(RecordScreener):
+    """Screen several records per provider call.
+
+    Records are packed into one ``build_batch_prompt`` prompt keyed by
+    ``record_id``. Each element of the returned JSON array is validated on
+    its own; records whose element is missing or invalid are re-screened
+    individually with the ``full`` prompt. A failed batch call (timeout,
+    non-zero exit, exhausted quota) is recorded as a failure for every
+    record in the batch.
+
+    Args:
+        providers: Providers to call.
+        timeout_s: Per-call timeout in seconds, for batched and single calls.
+        tier: Value written to ``screening_tier``.
+        placeholders: Payload written for providers that are not called.
+        auth_methods: ``oauth_auth_method_*`` value per provider.
+        cache: Response cache; batched answers are cached per record under
+            the ``batch`` prompt version, and answers cached by individual
+            ``full`` calls are reused.
+        on_row: Called with ``(record, payloads, result_row)`` for every
+            built row.
+    """
+
+    def __init__(
+        self,
+        providers: list[Provider],
+        timeout_s: int,
+        tier: str = "",
+        placeholders: dict[str, dict[str, Any]] | None = None,
+        auth_methods: dict[str, str] | None = None,
+        cache: ResponseCache | None = None,
+        on_row: Callable[[pd.Series, dict[str, dict[str, Any]], dict[str, Any]], None] | None = None,
+    ) -> None:
+        super().__init__(
+            providers, timeout_s, tier=tier, placeholders=placeholders,
+            auth_methods=auth_methods, cache=cache, on_row=on_row,
+        )
+        self.batch_providers = list(providers)
+        self.cache = cache
+        self.batch_calls = 0
+        self.requeued = 0
+
+    async def screen_batch(self, rows: pd.DataFrame) -> list[dict[str, Any]]:
+        """Screen a chunk of records; returns one result row per record, in order."""
+        row_list = [row for _, row in rows.iterrows()]
+        keys = [str(row["record_id"]) for row in row_list]
+        per_provider = await asyncio.gather(*(
+            self._provider_payloads(batch_provider, single_provider, row_list, keys)
+            for batch_provider, single_provider in zip(self.batch_providers, self.providers)
+        ))
+        return [
+            self.build_row(row, {p.name: found[key] for p, found in zip(self.providers, per_provider)})
+            for row, key in zip(row_list, keys)
+        ]
+
+    async def _provider_payloads(
+        self,
+        provider: Provider,
+        single: Provider,
+        rows: list[pd.Series],
+        keys: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        version = PROMPT_VERSIONS["batch"]
+        blocks = {key: build_batch_record(row, key) for row, key in zip(rows, keys)}
+        found: dict[str, dict[str, Any]] = {}
+        if self.cache is not None:
+            # A record answered either inside a batch or by an individual
+            # re-screen needs no further call.
+            model = provider.model or provider.name
+            single_version = PROMPT_VERSIONS[self.template]
+            for row, key in zip(rows, keys):
+                cached = self.cache.get(provider.name, model, version, blocks[key], provider.command)
+                if cached is None:
+                    cached = self.cache.get(
+                        provider.name, model, single_version, build_prompt(row, self.template), provider.command
+                    )
+                if cached is not None:
+                    cached["_cached"] = True
+                    cached["_latency_ms"] = 0
+                    found[key] = cached
+
+        pending = [(row, key) for row, key in zip(rows, keys) if key not in found]
+        if len(pending) > 1:
+            self.batch_calls += 1
+            prompt = build_batch_prompt([row for row, _ in pending], [key for _, key in pending])
+            t0 = time.monotonic()
+            completion = await provider.complete(prompt, self.timeout_s)
+            # Every record of the batch reports the latency of the shared call.
+            call = {
+                "_model": completion.model,
+                "_latency_ms": round((time.monotonic() - t0) * 1000),
+                "_attempt": completion.attempts,
+            }
+            if completion.failure is not None:
+                for _, key in pending:
+                    found[key] = {**completion.failure, **call}
+                return found
+            for key, payload in parse_batch_response(completion.text, [k for _, k in pending]).items():
+                payload["raw_output"] = completion.text
+                payload.update(call)
+                if self.cache is not None:
+                    self.cache.put(
+                        provider.name, completion.model, version, blocks[key], payload, command=provider.command
+                    )
+                found[key] = payload
+
+        retry = [(row, key) for row, key in pending if key not in found]
+        if retry and len(pending) > 1:
+            self.requeued += len(retry)
+            logger.debug("%s: re-screening %s records individually", provider.label, len(retry))
+        singles = await asyncio.gather(*(
+            single.invoke(build_prompt(row, self.template), self.timeout_s) for row, _ in retry
+        ))
+        for (_, key), payload in zip(retry, singles):
+            found[key] = payload
+        return found
+
+
+def build_screener(
+    providers: list[Provider], timeout_s: int, batch_size: int = 1, **kwargs: Any
+) -> RecordScreener:
+    """Return a ``BatchScreener`` when ``batch_size`` > 1, else a ``RecordScreener``."""
+    if batch_size > 1:
+        return BatchScreener(providers, timeout_s, **kwargs)
+    return RecordScreener(providers, timeout_s, **kwargs)
+
+
+def screen_fn(screener: RecordScreener, batch_size: int = 1) -> Any:
+    """The coroutine function to hand to ``run_pool`` for ``batch_size``."""
+    if batch_size > 1:
+        return screener.screen_batch  # type: ignore[attr-defined]
+    return screener
@@ -0,0 +1,155 @@
+"""Deterministic record sharding for screening on several machines.
+
+``--shard i/N`` keeps the records whose ``record_id`` hashes to shard ``i``
+of ``N`` (1-based). The hash is the first 8 bytes of the SHA-256 of the
+record id's string form, so every machine, Python and pandas version puts
+a record in the same shard, and adding records to the input does not move
+existing ones. ``merge_shards`` combines the shard outputs and verifies
+that together they cover the input exactly once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse ``"i/N"`` into ``(i, N)`` with ``1 <= i <= N``."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, e.g. 2/4: {spec!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}: {spec!r}")
+    return index, count
+
+
+def shard_of(record_ids: pd.Series, count: int) -> np.ndarray:
+    """1-based shard of every record id for ``count`` shards."""
+    digests = [
+        int.from_bytes(hashlib.sha256(str(rid).encode("utf-8")).digest()[:8], "big")
+        for rid in record_ids
+    ]
+    return np.array(digests, dtype=np.uint64) % np.uint64(count) + 1
+
+
+def select_shard(records: pd.DataFrame, index: int, count: int) -> pd.DataFrame:
+    """Records of shard ``index`` of ``count``."""
+    if count == 1:
+        return records
+    keep = shard_of(records["record_id"], count) == index
+    logger.info("Shard %s/%s: %s of %s records", index, count, int(keep.sum()), len(records))
+    return records[keep]
+
+
+@dataclass
+class ShardMergeReport:
+    """Coverage check of a set of shard outputs.
+
+    Attributes:
+        rows: Rows read from every shard output.
+        duplicates: Record ids present more than once.
+        missing: Input record ids absent from every output.
+        unexpected: Output record ids not in the input.
+        misplaced: Per output file, record ids hashing to a different shard
+            than the file's majority (outputs of runs with another ``N``).
+    """
+
+    rows: int = 0
+    duplicates: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    unexpected: list[str] = field(default_factory=list)
+    misplaced: dict[str, list[str]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.duplicates or self.missing or self.unexpected or self.misplaced)
+
+    def summary(self) -> str:
+        parts = [f"{self.rows} rows"]
+        for name in ("duplicates", "missing", "unexpected"):
+            ids = getattr(self, name)
+            if ids:
+                parts.append(f"{len(ids)} {name} (e.g. {', '.join(ids[:5])})")
+        for path, ids in self.misplaced.items():
+            parts.append(f"{len(ids)} misplaced in {path} (e.g. {', '.join(ids[:5])})")
+        return "; ".join(parts)
+
+
+def merge_shards(
+    paths: list[str | Path],
+    records: pd.DataFrame | None = None,
+    count: int | None = None,
+) -> tuple[pd.DataFrame, ShardMergeReport]:
+    """Concatenate shard outputs and check their coverage.
+
+    Args:
+        paths: Shard output CSVs.
+        records: Input records; enables the missing/unexpected checks and
+            orders the merged rows like the input.
+        count: Number of shards; checks that each output holds exactly one
+            shard and that all ``count`` shards are present.
+
+    Returns:
+        Merged results and the coverage report.
+    """
+    frames = [pd.read_csv(path) for path in paths]
+    report = ShardMergeReport()
+    if count is not None:
+        seen: dict[int, str] = {}
+        for path, frame in zip(paths, frames):
+            if len(frame) == 0:
+                continue
+            shards = pd.Series(shard_of(frame["record_id"], count), index=frame.index)
+            majority = int(shards.mode().iloc[0])
+            off = frame.loc[shards != majority, "record_id"].astype(str).tolist()
+            if off:
+                report.misplaced[str(path)] = off
+            if majority in seen:
+                report.duplicates.append(f"shard {majority}/{count} in {seen[majority]} and {path}")
+            seen[majority] = str(path)
+        absent = sorted(set(range(1, count + 1)) - set(seen))
+        report.missing.extend(f"shard {i}/{count}" for i in absent)
+
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["record_id"])
+    report.rows = len(merged)
+    keys = merged["record_id"].astype(str)
+    report.duplicates.extend(keys[keys.duplicated()].unique().tolist())
+    if records is not None:
+        expected = records["record_id"].astype(str)
+        report.missing.extend(expected[~expected.isin(keys)].tolist())
+        report.unexpected.extend(keys[~keys.isin(expected)].unique().tolist())
+        order = pd.Index(expected).get_indexer(keys)
+        merged = merged.iloc[np.argsort(np.where(order < 0, len(expected), order), kind="stable")]
+    return merged.reset_index(drop=True), report
+
+
+def _shard_arg(spec: str) -> tuple[int, int]:
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--shard`` option shared by screening CLIs."""
+    parser.add_argument(
+        "--shard", type=_shard_arg, default=None, metavar="i/N",
+        help="Screen only shard i of N (1-based, stable hash of record_id); combine with merge_shards.py",
+    )
+
+
+def shard_from_args(args: argparse.Namespace, records: pd.DataFrame) -> pd.DataFrame:
+    """Apply the ``--shard`` option to the input records."""
+    if not args.shard:
+        return records
+    return select_shard(records, *args.shard)
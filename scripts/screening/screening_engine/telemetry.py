@@ -0,0 +1,362 @@
+"""Live throughput and latency metrics for screening runs.
+
+``Telemetry`` collects, while a run is in progress,
+
+- per provider: calls, in-flight calls, p50/p95/p99 latency over the last
+  ``window`` calls, and timeout/quota/error rates (``MeteredProvider``
+  measures every call), and
+- per stage (``run_pool`` label, e.g. ``T2``/``T3``): records done out of
+  the expected total, scheduler queue depth, records/min and ETA.
+
+``exporting`` publishes the snapshot as a Prometheus text endpoint on
+localhost (``--metrics-port``) and/or a JSON file rewritten in place every
+``--metrics-every`` seconds (``--metrics-json``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import numpy as np
+
+from .providers import Completion, Provider
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _seconds(ms: float | None) -> float | None:
+    return ms / 1000 if ms is not None else None
+
+
+class ProviderStats:
+    """Call counters and a latency window for one provider.
+
+    Args:
+        window: Number of recent calls kept for the latency percentiles.
+    """
+
+    def __init__(self, window: int = 2000) -> None:
+        self.calls = 0
+        self.in_flight = 0
+        self.errors: Counter[str] = Counter()
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.latency_sum_s = 0.0
+
+    def observe(self, latency_s: float, error: str | None) -> None:
+        self.calls += 1
+        self.latencies.append(latency_s)
+        self.latency_sum_s += latency_s
+        if error:
+            self.errors[error] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        quantiles = (
+            [round(float(v), 1) for v in np.quantile(np.fromiter(self.latencies, dtype=float), QUANTILES) * 1000]
+            if self.latencies else [None] * len(QUANTILES)
+        )
+        calls = max(1, self.calls)
+        return {
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "latency_ms": {f"p{round(q * 100)}": v for q, v in zip(QUANTILES, quantiles)},
+            "latency_sum_s": round(self.latency_sum_s, 3),
+            "timeout_rate": self.errors["timeout"] / calls,
+            "quota_rate": self.errors["quota"] / calls,
+            "error_rate": sum(self.errors.values()) / calls,
+            "errors": dict(self.errors),
+        }
+
+
+class StageStats:
+    """Progress of one ``run_pool`` stage.
+
+    Args:
+        total: Records expected in the stage.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.queue: asyncio.Queue[Any] | None = None
+
+    @property
+    def rate_per_min(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return self.done / elapsed * 60 if elapsed > 0 else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        if self.finished_at is not None:
+            state = "done"
+        elif self.started_at is not None:
+            state = "running"
+        else:
+            state = "pending"
+        rate = self.rate_per_min
+        remaining = max(0, self.total - self.done)
+        return {
+            "state": state,
+            "total": self.total,
+            "done": self.done,
+            "queue_depth": self.queue.qsize() if self.queue is not None and state == "running" else 0,
+            "records_per_min": round(rate, 2),
+            "eta_s": round(remaining / rate * 60) if rate > 0 else None,
+        }
+
+
+class MeteredProvider(Provider):
+    """Provider decorator reporting every call to ``Telemetry``."""
+
+    def __init__(self, inner: Provider, telemetry: "Telemetry") -> None:
+        self.inner = inner
+        self.telemetry = telemetry
+        self.name = inner.name
+        self.label = inner.label
+
+    @property
+    def model(self) -> str:  # type: ignore[override]
+        return self.inner.model
+
+    @property
+    def lenient(self) -> bool:  # type: ignore[override]
+        return self.inner.lenient
+
+    @property
+    def command(self) -> str:  # type: ignore[override]
+        return self.inner.command
+
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        stats = self.telemetry.provider(self.label)
+        stats.in_flight += 1
+        t0 = time.monotonic()
+        try:
+            completion = await self.inner.complete(prompt, timeout_s)
+        finally:
+            stats.in_flight -= 1
+        error = completion.failure.get("_error", "exit") if completion.failure is not None else None
+        stats.observe(time.monotonic() - t0, error)
+        return completion
+
+
+class Telemetry:
+    """Metrics of one screening run.
+
+    Args:
+        window: Recent calls per provider kept for latency percentiles.
+    """
+
+    def __init__(self, window: int = 2000) -> None:
+        self.window = window
+        self.providers: dict[str, ProviderStats] = {}
+        self.stages: dict[str, StageStats] = {}
+        self.sources: dict[str, Any] = {}
+        self.started = time.monotonic()
+
+    def provider(self, label: str) -> ProviderStats:
+        if label not in self.providers:
+            self.providers[label] = ProviderStats(self.window)
+        return self.providers[label]
+
+    def wrap(self, provider: Provider) -> MeteredProvider:
+        return MeteredProvider(provider, self)
+
+    def stage(self, label: str, total: int | None = None) -> StageStats:
+        """The stats of stage ``label``, registering it (or its new total)."""
+        if label not in self.stages:
+            self.stages[label] = StageStats(total or 0)
+        elif total is not None:
+            self.stages[label].total = total
+        return self.stages[label]
+
+    def add_source(self, name: str, snapshot: Any) -> None:
+        """Include ``snapshot()`` (e.g. ``AdaptiveControl.snapshot``) under ``name``."""
+        self.sources[name] = snapshot
+
+    def eta_s(self) -> float | None:
+        """Seconds until every registered stage is done, at the current rate."""
+        running = [s for s in self.stages.values() if s.started_at is not None and s.rate_per_min > 0]
+        if not running:
+            return None
+        # Stages run one after another; later ones are assumed to run at the
+        # rate of the most recent one.
+        rate = running[-1].rate_per_min
+        remaining = sum(max(0, s.total - s.done) for s in self.stages.values())
+        return remaining / rate * 60
+
+    def snapshot(self) -> dict[str, Any]:
+        eta = self.eta_s()
+        snap: dict[str, Any] = {
+            "timestamp": time.time(),
+            "elapsed_s": round(time.monotonic() - self.started, 1),
+            "eta_s": round(eta) if eta is not None else None,
+            "providers": {label: stats.snapshot() for label, stats in self.providers.items()},
+            "stages": {label: stage.snapshot() for label, stage in self.stages.items()},
+        }
+        for name, source in self.sources.items():
+            snap[name] = source()
+        return snap
+
+    def prometheus(self) -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict[str, str], Any]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                tags = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{tags}}} {value}" if tags else f"{name} {value}")
+
+        providers = snap["providers"]
+        metric(
+            "screening_provider_latency_seconds", "summary",
+            "Provider call latency over recent calls",
+            [
+                ({"provider": p, "quantile": str(q)}, _seconds(s["latency_ms"][f"p{round(q * 100)}"]))
+                for p, s in providers.items() for q in QUANTILES
+            ],
+        )
+        lines.extend(f'screening_provider_latency_seconds_sum{{provider="{p}"}} {s["latency_sum_s"]}'
+                     for p, s in providers.items())
+        lines.extend(f'screening_provider_latency_seconds_count{{provider="{p}"}} {s["calls"]}'
+                     for p, s in providers.items())
+        metric("screening_provider_in_flight", "gauge", "Provider calls in progress",
+               [({"provider": p}, s["in_flight"]) for p, s in providers.items()])
+        metric("screening_provider_errors_total", "counter", "Failed provider calls by error kind",
+               [({"provider": p, "kind": k}, n) for p, s in providers.items() for k, n in s["errors"].items()])
+        for rate in ("timeout_rate", "quota_rate", "error_rate"):
+            metric(f"screening_provider_{rate}", "gauge", f"Share of calls failing ({rate.replace('_', ' ')})",
+                   [({"provider": p}, round(s[rate], 6)) for p, s in providers.items()])
+
+        stages = snap["stages"]
+        for key, name, kind, help_text in (
+            ("total", "screening_stage_records", "gauge", "Records expected in the stage"),
+            ("done", "screening_stage_done_total", "counter", "Records screened in the stage"),
+            ("queue_depth", "screening_stage_queue_depth", "gauge", "Records queued for the stage's workers"),
+            ("records_per_min", "screening_stage_records_per_minute", "gauge", "Stage throughput"),
+            ("eta_s", "screening_stage_eta_seconds", "gauge", "Estimated seconds until the stage is done"),
+        ):
+            metric(name, kind, help_text, [({"stage": label}, st[key]) for label, st in stages.items()])
+        metric("screening_eta_seconds", "gauge", "Estimated seconds until every stage is done",
+               [({}, snap["eta_s"])])
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str | Path) -> None:
+        """Replace ``path`` atomically with the current snapshot."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), indent=2, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def log_summary(self) -> None:
+        for label, stage in self.stages.items():
+            snap = stage.snapshot()
+            if snap["state"] != "running":
+                continue
+            eta = f"{snap['eta_s'] / 60:.0f}m" if snap["eta_s"] is not None else "?"
+            logger.info(
+                "%s: %s/%s (%.1f rec/min, queue %s, ~%s left)",
+                label, snap["done"], snap["total"], snap["records_per_min"], snap["queue_depth"], eta,
+            )
+        for label, stats in self.providers.items():
+            if not stats.calls:
+                continue
+            snap = stats.snapshot()
+            lat = snap["latency_ms"]
+            logger.info(
+                "%s: in_flight=%s calls=%s p50=%.0fms p95=%.0fms p99=%.0fms timeouts=%.1f%% quota=%.1f%%",
+                label, snap["in_flight"], snap["calls"], lat["p50"], lat["p95"], lat["p99"],
+                snap["timeout_rate"] * 100, snap["quota_rate"] * 100,
+            )
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            path = request.split()[1].decode() if len(request.split()) > 1 else "/"
+            if path in ("/", "/metrics"):
+                status, kind, body = "200 OK", "text/plain; version=0.0.4", self.prometheus()
+            elif path == "/metrics.json":
+                status, kind, body = "200 OK", "application/json", json.dumps(self.snapshot(), default=str)
+            else:
+                status, kind, body = "404 Not Found", "text/plain", "not found\n"
+            data = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {kind}\r\nContent-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n".encode("ascii") + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+        """Serve ``/metrics`` (Prometheus) and ``/metrics.json`` on ``host:port``."""
+        server = await asyncio.start_server(self._handle, host, port)
+        logger.info("Metrics endpoint: http://%s:%s/metrics", host, port)
+        return server
+
+    async def export_every(self, interval_s: float, json_path: str | Path | None) -> None:
+        """Log a summary and rewrite ``json_path`` every ``interval_s`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval_s)
+            self.log_summary()
+            if json_path is not None:
+                self.write_json(json_path)
+
+    @asynccontextmanager
+    async def exporting(
+        self, interval_s: float, port: int | None = None, json_path: str | Path | None = None,
+    ) -> AsyncIterator["Telemetry"]:
+        """Publish metrics while the block runs; the JSON file gets a final snapshot."""
+        server = await self.serve(port) if port else None
+        task = asyncio.create_task(self.export_every(interval_s, json_path))
+        try:
+            yield self
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            if json_path is not None:
+                self.write_json(json_path)
+
+
+def add_telemetry_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the metrics-export options shared by screening CLIs."""
+    parser.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics (JSON at /metrics.json)",
+    )
+    parser.add_argument(
+        "--metrics-json", type=str, default=None,
+        help="Rewrite this JSON file with the live metrics every --metrics-every seconds",
+    )
+
+
+def telemetry_from_args(args: argparse.Namespace) -> Telemetry | None:
+    """Build a ``Telemetry`` when ``add_telemetry_arguments`` options ask for an export."""
+    if args.metrics_port is None and args.metrics_json is None:
+        return None
+    return Telemetry()
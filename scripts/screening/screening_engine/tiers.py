@@ -0,0 +1,242 @@
+"""Keyword tier classification for the tiered screener.
+
+Tier 1 (instant):   no AI terms, or AI terms without education and adoption
+                    terms; auto-excluded without a provider call.
+Tier 2 (single AI): AI terms plus either education or adoption terms.
+Tier 3 (dual AI):   AI, education and adoption terms all present.
+
+``classify_tier`` is the per-record reference; ``keyword_hits`` and
+``classify_tiers`` evaluate whole columns with pandas string methods on an
+object-dtype copy, so they run on ``re`` like the reference. Arrow-backed
+strings (the pandas default when pyarrow is installed) would use RE2, whose
+word boundaries and word characters are ASCII-only and disagree with ``re``
+next to non-ASCII letters (e.g. "日本AI", "AIé").
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .schema import HUMAN_COLUMNS, PROVIDERS, RESULT_COLUMNS, build_result_row
+
+AI_TERMS = [
+    "artificial intelligence", "machine learning", "deep learning",
+    "intelligent tutoring", "chatbot", "ChatGPT", "GPT-4", "GPT-3",
+    "large language model", "LLM", "natural language processing", "NLP",
+    "automated grading", "adaptive learning", "conversational AI",
+    "AI tutor", "AI agent", "agentic AI", "neural network",
+    "computer vision", "generative AI", "Copilot", "Gemini", "Claude", "Bard",
+    "reinforcement learning", "intelligent agent", "recommendation system",
+    "predictive model", "text mining", "sentiment analysis",
+    "speech recognition", "virtual assistant", r"robot\w*", "AI",
+]
+
+EDU_TERMS = [
+    "education", "student", "teacher", "instructor", "faculty", "professor",
+    "university", "college", "school", "classroom", "pedagogy", "learning",
+    "academic", "K-12", "higher education", "undergraduate", "graduate",
+    "curriculum", "MOOC", "e-learning", "online learning", "blended learning",
+    "tutoring", "learner", "teaching", "coursework", "semester",
+]
+
+ADOPT_TERMS = [
+    r"adopt\w*", "acceptance", "intention", "TAM", "UTAUT",
+    "technology acceptance", "perceived usefulness", "perceived ease",
+    "self-efficacy", "behavioral intention", "trust", "resistance",
+    "usage", "satisfaction", "continuance", "willingness", "readiness",
+    "attitude", "motivation", "engagement", "barrier",
+]
+
+
+def family_pattern(terms: list[str]) -> re.Pattern:
+    """Whole-word, case-insensitive alternation of regex ``terms``."""
+    return re.compile(r"\b(" + "|".join(terms) + r")\b", re.IGNORECASE)
+
+
+AI_PATTERN = family_pattern(AI_TERMS)
+EDU_PATTERN = family_pattern(EDU_TERMS)
+ADOPT_PATTERN = family_pattern(ADOPT_TERMS)
+
+FAMILY_TERMS = {"ai": AI_TERMS, "edu": EDU_TERMS, "adopt": ADOPT_TERMS}
+
+FAMILIES = {"ai": AI_PATTERN, "edu": EDU_PATTERN, "adopt": ADOPT_PATTERN}
+
+
+def _column_pattern(pattern: re.Pattern, capture: bool = False) -> str:
+    """Inline-flag form of a family pattern for ``Series.str``.
+
+    Inner groups become non-capturing; with ``capture`` the whole match is
+    the only group, as ``str.extractall`` expects.
+    """
+    body = pattern.pattern.replace(r"\b(", r"\b(?:")
+    return f"(?i)({body})" if capture else f"(?i){body}"
+
+
+def record_text(records: pd.DataFrame) -> pd.Series:
+    """Title, abstract and keywords joined into the text the classifier sees."""
+    return (
+        records["title"].fillna("")
+        + " " + records["abstract"].fillna("")
+        + " " + records["keywords"].fillna("")
+    )
+
+
+def keyword_hits(text: pd.Series, terms: bool = False) -> pd.DataFrame:
+    """Count keyword-family hits for a whole column.
+
+    Args:
+        text: Record text, e.g. from ``record_text``.
+        terms: Also return the distinct matched terms per family. Term
+            extraction runs through ``re`` and is much slower than counting.
+
+    Returns:
+        Frame indexed like ``text`` with ``<family>_hits`` counts and, with
+        ``terms``, ``<family>_terms`` strings of lower-cased terms joined by
+        ``"; "`` in order of first appearance.
+    """
+    out = pd.DataFrame(index=text.index)
+    text = text.astype(object)  # ``re`` semantics, not RE2 (see module docstring)
+    for family, pattern in FAMILIES.items():
+        out[f"{family}_hits"] = text.str.count(_column_pattern(pattern)).fillna(0).astype("int64")
+    if terms:
+        for family, pattern in FAMILIES.items():
+            found = text.str.extractall(_column_pattern(pattern, capture=True))[0].str.lower()
+            pairs = found.droplevel("match").rename("term").reset_index().drop_duplicates()
+            joined = pairs.groupby(pairs.columns[0], sort=False)["term"].agg("; ".join)
+            out[f"{family}_terms"] = joined.reindex(text.index, fill_value="")
+    return out
+
+
+def assign_tiers(has_ai: np.ndarray, has_edu: np.ndarray, has_adopt: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Apply the tier rule of ``classify_tier`` to boolean family-hit arrays.
+
+    Returns:
+        (tier, exclude_reason) string arrays.
+    """
+    tier = np.select(
+        [~has_ai, has_edu & has_adopt, has_edu | has_adopt], ["T1", "T3", "T2"], default="T1",
+    )
+    reason = np.select(
+        [~has_ai, ~(has_edu | has_adopt)], ["E2:no_ai_terms", "E2+E3:ai_no_edu_no_adopt"], default="",
+    )
+    return tier, reason
+
+
+def classify_tiers(text: pd.Series, terms: bool = False) -> pd.DataFrame:
+    """Vectorized ``classify_tier`` over a whole column.
+
+    Args:
+        text: Record text, e.g. from ``record_text``.
+        terms: Include matched terms (see ``keyword_hits``).
+
+    Returns:
+        ``keyword_hits`` frame plus ``tier`` and ``exclude_reason`` columns.
+    """
+    hits = keyword_hits(text, terms=terms)
+    hits["tier"], hits["exclude_reason"] = assign_tiers(
+        hits["ai_hits"].to_numpy() > 0,
+        hits["edu_hits"].to_numpy() > 0,
+        hits["adopt_hits"].to_numpy() > 0,
+    )
+    return hits
+
+
+def classify_tier(text: str) -> tuple[str, str]:
+    """Classify a record into T1/T2/T3 and return (tier, exclude_reason)."""
+    has_ai = bool(AI_PATTERN.search(text))
+    if not has_ai:
+        return ("T1", "E2:no_ai_terms")
+    has_edu = bool(EDU_PATTERN.search(text))
+    has_adopt = bool(ADOPT_PATTERN.search(text))
+    if has_edu and has_adopt:
+        return ("T3", "")
+    if has_edu:
+        return ("T2", "")  # AI + education but no adoption terms
+    if has_adopt:
+        return ("T2", "")  # AI + adoption but no education terms
+    return ("T1", "E2+E3:ai_no_edu_no_adopt")  # AI but neither edu nor adopt
+
+
+T1_RATIONALES = {
+    "no_ai_terms": "T1 keyword pre-filter: no AI-related terms found in title/abstract/keywords",
+    "ai_no_edu_no_adopt": "T1 keyword pre-filter: AI terms present but no education context AND no adoption/acceptance constructs",
+}
+
+
+def tier1_auto_exclude(row: pd.Series, exclude_reason: str) -> dict[str, Any]:
+    """Build the auto-exclude result row for a Tier 1 record.
+
+    Args:
+        row: Input record.
+        exclude_reason: Reason from ``classify_tier``, e.g. ``E2:no_ai_terms``
+            or ``E2+E3:ai_no_edu_no_adopt``.
+
+    Returns:
+        Output row in ``RESULT_COLUMNS`` order.
+    """
+    code_part = exclude_reason.split(":")[0] if ":" in exclude_reason else "E2"
+    reason_part = exclude_reason.split(":", 1)[1] if ":" in exclude_reason else exclude_reason
+    rationale = T1_RATIONALES.get(reason_part, f"T1 keyword pre-filter: {exclude_reason}")
+
+    # For compound codes like "E2+E3", use primary code
+    payload = {
+        "decision": "exclude",
+        "confidence": 1.0,
+        "exclude_code": code_part.split("+")[0],
+        "rationale": rationale,
+        "_status": "rule",
+        "_model": "keyword_filter",
+    }
+    return build_result_row(
+        row,
+        {"codex": payload, "gemini": payload},
+        consensus="exclude",
+        tier=f"T1_keyword({code_part})",
+        auth_methods={"codex": "keyword_filter", "gemini": "keyword_filter"},
+    )
+
+
+def tier1_results(records: pd.DataFrame) -> pd.DataFrame:
+    """Column-wise ``tier1_auto_exclude`` for every row of ``records``.
+
+    Args:
+        records: Tier 1 records with an ``_exclude_reason`` column.
+
+    Returns:
+        Result frame in ``RESULT_COLUMNS`` order.
+    """
+    reason = records["_exclude_reason"].astype(str)
+    parts = reason.str.partition(":")
+    has_code = reason.str.contains(":", regex=False)
+    code_part = parts[0].where(has_code, "E2")
+    reason_part = parts[2].where(has_code, reason)
+    rationale = reason_part.map(T1_RATIONALES).fillna("T1 keyword pre-filter: " + reason)
+
+    empty = pd.Series("", index=records.index)
+    out = pd.DataFrame({
+        "record_id": records["record_id"],
+        "title": records["title"] if "title" in records else empty,
+        "year": records["year"] if "year" in records else empty,
+        "search_source": records.get("search_source", records.get("source_database", empty)),
+    })
+    for provider in PROVIDERS:
+        out[f"screen_decision_{provider}"] = "exclude"
+        out[f"screen_confidence_{provider}"] = 1.0
+        out[f"exclude_code_{provider}"] = code_part.str.split("+").str[0]
+        out[f"rationale_{provider}"] = rationale
+    out["screen_consensus"] = "exclude"
+    out["screening_tier"] = "T1_keyword(" + code_part + ")"
+    for provider in PROVIDERS:
+        out[f"oauth_auth_method_{provider}"] = "keyword_filter"
+        out[f"status_{provider}"] = "rule"
+        out[f"error_class_{provider}"] = ""
+        out[f"latency_ms_{provider}"] = 0
+        out[f"attempt_{provider}"] = 0
+        out[f"provider_model_{provider}"] = "keyword_filter"
+    for col in HUMAN_COLUMNS:
+        out[col] = ""
+    return out[RESULT_COLUMNS]
@@ -0,0 +1,216 @@
+"""Long-lived provider worker processes.
+
+``CLIProvider`` spawns the provider CLI once per call, paying process start,
+auth and config load every time. ``WorkerProvider`` instead keeps a pool of
+long-running worker processes and streams prompts to them over stdin, one
+JSON object per line::
+
+    -> {"id": 7, "prompt": "...", "model": "gemini-2.5-flash"}
+    <- {"id": 7, "text": "{...screening JSON...}"}
+    <- {"id": 7, "error": "quota", "message": "429 resource exhausted"}
+
+``error`` is one of ``parsing.ERROR_KINDS``. Each worker handles one prompt at
+a time; a worker that times out or dies is killed and restarted on its next
+call. ``scripts/screening/provider_worker.py`` implements the protocol over
+in-process API clients.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import shlex
+from typing import Any
+
+from .parsing import ERROR_KINDS, failure_payload
+from .providers import Completion, Provider, load_provider_config, provider_from_config
+
+logger = logging.getLogger(__name__)
+
+# Largest response line accepted from a worker.
+LINE_LIMIT = 16 * 1024 * 1024
+
+
+class _Worker:
+    """One worker process; not safe for concurrent use."""
+
+    def __init__(self, cmd: list[str]) -> None:
+        self.cmd = cmd
+        self.proc: asyncio.subprocess.Process | None = None
+        self.killed = False
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None and not self.killed
+
+    async def start(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=LINE_LIMIT,
+        )
+        self.killed = False
+        logger.debug("Started worker pid %s: %s", self.proc.pid, self.cmd)
+
+    async def request(self, message: dict[str, Any]) -> dict[str, Any] | None:
+        """Send one request and read its response; None if the worker exited."""
+        assert self.proc is not None and self.proc.stdin is not None and self.proc.stdout is not None
+        self.proc.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+        await self.proc.stdin.drain()
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                return None
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                # Stray output from the worker; responses are single JSON lines.
+                continue
+            if isinstance(response, dict) and response.get("id") == message["id"]:
+                return response
+
+    async def stop(self) -> None:
+        if not self.alive:
+            return
+        if self.proc.stdin is not None:
+            self.proc.stdin.close()
+        try:
+            await asyncio.wait_for(self.proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.kill()
+            await self.proc.wait()
+
+    def kill(self) -> None:
+        if self.alive:
+            self.proc.kill()
+        self.killed = True
+
+
+class WorkerProvider(Provider):
+    """Provider backed by a pool of long-lived worker processes.
+
+    Workers start lazily on first use, so a pool larger than the call
+    concurrency costs nothing. Call ``aclose`` when screening is done.
+
+    Args:
+        name: Provider family.
+        cmd: Worker command; ``{model}`` is substituted.
+        size: Number of worker processes.
+        model: Model sent with every request.
+        label: Display name, defaults to ``name`` or ``name(model)``.
+        lenient: Use keyword fallback when the output has no JSON object.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cmd: list[str],
+        size: int = 4,
+        model: str = "",
+        label: str | None = None,
+        lenient: bool = False,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Worker pool size must be at least 1")
+        self.name = name
+        self.model = model
+        self.label = label or (f"{name}({model})" if model else name)
+        self.lenient = lenient
+        self.cmd = [part.replace("{model}", model) for part in cmd]
+        self.command = shlex.join(self.cmd)
+        self.workers = [_Worker(self.cmd) for _ in range(size)]
+        self._idle: asyncio.Queue[_Worker] = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+        self._ids = itertools.count(1)
+        self.restarts = 0
+
+    async def complete(self, prompt: str, timeout_s: int) -> Completion:
+        model = self.model or self.name
+        worker = await self._idle.get()
+        try:
+            return await self._call(worker, prompt, timeout_s, model)
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def _call(self, worker: _Worker, prompt: str, timeout_s: int, model: str) -> Completion:
+        if not worker.alive:
+            if worker.proc is not None:
+                self.restarts += 1
+            try:
+                await worker.start()
+            except OSError as exc:
+                return Completion("", model, failure_payload(f"{self.label} failed: {str(exc)[:200]}", error="spawn"))
+
+        message = {"id": next(self._ids), "prompt": prompt, "model": self.model}
+        try:
+            response = await asyncio.wait_for(worker.request(message), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            # The late response would desynchronize the stream; replace the worker.
+            worker.kill()
+            logger.warning("%s timed out after %ss", self.label, timeout_s)
+            return Completion("", model, failure_payload(f"{self.label} timed out after {timeout_s}s", error="timeout"))
+        except (BrokenPipeError, ConnectionResetError):
+            response = None
+        except asyncio.CancelledError:
+            worker.kill()
+            raise
+
+        if response is None:
+            worker.kill()
+            return Completion("", model, failure_payload(f"{self.label} failed: worker exited"))
+
+        error = response.get("error")
+        if error:
+            kind = error if error in ERROR_KINDS else "exit"
+            detail = str(response.get("message", ""))[:200]
+            if kind == "quota":
+                rationale = f"{self.label} quota exhausted: {detail}"
+            elif kind == "empty":
+                rationale = f"{self.label} empty response: {detail[:100]}"
+            else:
+                rationale = f"{self.label} failed: {detail}"
+            return Completion("", response.get("model") or model, failure_payload(rationale, error=kind))
+
+        text = str(response.get("text") or "").strip()
+        if not text:
+            return Completion("", model, failure_payload(f"{self.label} empty response: ", error="empty"))
+        return Completion(text, response.get("model") or model)
+
+    async def aclose(self) -> None:
+        """Stop every worker process."""
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+
+
+def worker_provider_from_config(config: dict[str, Any], name: str, size: int) -> WorkerProvider:
+    """Build a worker pool from the ``screening_cli.<name>.worker_cmd`` entry."""
+    commands = load_provider_config(config, name)
+    if not commands.worker_cmd:
+        raise ValueError(f"screening_cli.{name}.worker_cmd is not configured")
+    return WorkerProvider(name, commands.worker_cmd, size=size)
+
+
+def add_worker_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--persistent-workers`` option shared by screening CLIs."""
+    parser.add_argument(
+        "--persistent-workers", type=int, default=0, metavar="N",
+        help="Keep N long-lived worker processes per provider (screening_cli.<provider>.worker_cmd) "
+             "instead of spawning the CLI per call (default: 0, off)",
+    )
+
+
+def providers_from_args(config: dict[str, Any], names: list[str], args: argparse.Namespace) -> list[Provider]:
+    """Build the named providers as worker pools or per-call CLI providers."""
+    size = getattr(args, "persistent_workers", 0)
+    if size > 0:
+        return [worker_provider_from_config(config, name, size) for name in names]
+    return [provider_from_config(config, name) for name in names]
+
+
+async def close_providers(providers: list[Provider]) -> None:
+    """Stop the worker processes behind any ``WorkerProvider``."""
+    await asyncio.gather(*(p.aclose() for p in providers if isinstance(p, WorkerProvider)))
@@ -9,44 +9,105 @@ Databases handled: WoS (XLS), Scopus (CSV), IEEE (CSV), PsycINFO/ProQuest (CSV)
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from difflib import SequenceMatcher
+from collections import Counter, defaultdict
+import argparse
 import logging
 import re
+import time
+import unicodedata
 from datetime import datetime
 
+from dedup_engine import (
+    DEDUP_MODES,
+    block_pairs,
+    cluster_table,
+    collapse_clusters,
+    completeness_scores,
+    file_sha256,
+    parse_completeness_weights,
+    title_match,
+    title_match_pairs,
+    verify_pairs,
+)
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 RAW_DIR = BASE_DIR / "data" / "raw" / "search_results"
 OUTPUT_DIR = BASE_DIR / "data" / "processed"
-
-
-def load_wos(directory: Path) -> pd.DataFrame:
-    """Load and standardize Web of Science XLS files."""
-    xls_files = sorted(directory.glob("*.xls"))
-    if not xls_files:
-        logger.warning("No WoS XLS files found")
-        return pd.DataFrame()
-
-    dfs = []
-    for f in xls_files:
-        df = pd.read_excel(f)
-        dfs.append(df)
-        logger.info(f"  WoS: loaded {len(df)} records from {f.name}")
-
-    combined = pd.concat(dfs, ignore_index=True)
-
-    standardized = pd.DataFrame({
+CACHE_DIR = BASE_DIR / "data" / "01_identification" / "standardized_cache"
+
+# Part of every cache key: bump whenever a standardize_* mapping changes
+LOADER_VERSION = 3
+
+BLOCKING_STRATEGIES = ("prefix", "multikey")
+PREFIX_LENGTH = 30
+RARE_TOKENS_PER_RECORD = 3
+MAX_BLOCK_SIZE = 300
+
+# Shared schema of every standardized export
+STANDARD_COLUMNS = ['title', 'abstract', 'authors', 'year', 'journal', 'doi', 'volume', 'issue',
+                    'pages', 'language', 'keywords', 'issn', 'doc_type', 'source_database']
+STREAM_CHUNK_SIZE = 5000
+
+# Columns the dedup passes read in full; the rest are only checked for blanks
+DEDUP_COLUMNS = ['title', 'authors', 'year', 'doi', 'source_database']
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None  # pandas default (xlrd for .xls)
+
+# Function words ignored by the sorted-token and rare-token keys
+TITLE_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'of', 'in', 'on', 'for', 'to', 'and', 'or', 'with', 'by',
+    'at', 'from', 'as', 'its', 'is', 'are', 'into', 'via', 'among', 'using',
+})
+
+
+def text_column(df: pd.DataFrame, *names: str) -> pd.Series:
+    """
+    First of `names` present in `df` as a nullable string column.
+
+    Missing values stay NA, integral floats (page numbers read next to
+    blanks) lose their '.0', and an all-NA column is returned when none
+    of the names exist.
+    """
+    for name in names:
+        if name in df.columns:
+            col = df[name]
+            if pd.api.types.is_float_dtype(col) and (col.dropna() % 1 == 0).all():
+                col = col.astype('Int64')
+            return col.astype('string')
+    return pd.Series(pd.NA, index=df.index, dtype='string')
+
+
+def page_range(df: pd.DataFrame, start: str, end: str) -> pd.Series:
+    """'start-end', or whichever side exists; NA when both are missing."""
+    first, last = text_column(df, start), text_column(df, end)
+    return first.str.cat(last, sep='-').fillna(first).fillna(last)
+
+
+def standardize_wos(combined: pd.DataFrame) -> pd.DataFrame:
+    """Map Web of Science columns onto the shared schema."""
+    return pd.DataFrame({
         'title': combined.get('Article Title', combined.get('Title', '')),
         'abstract': combined.get('Abstract', ''),
         'authors': combined.get('Authors', combined.get('Author Full Names', '')),
-        'year': combined.get('Publication Year', ''),
+        'year': text_column(combined, 'Publication Year'),
         'journal': combined.get('Source Title', ''),
         'doi': combined.get('DOI', ''),
-        'volume': combined.get('Volume', ''),
-        'issue': combined.get('Issue', ''),
-        'pages': combined.get('Start Page', '').astype(str) + '-' + combined.get('End Page', '').astype(str),
+        'volume': text_column(combined, 'Volume'),
+        'issue': text_column(combined, 'Issue'),
+        'pages': page_range(combined, 'Start Page', 'End Page'),
         'language': combined.get('Language', ''),
         'keywords': combined.get('Author Keywords', ''),
         'issn': combined.get('ISSN', ''),
@@ -54,24 +115,19 @@ def load_wos(directory: Path) -> pd.DataFrame:
         'source_database': 'WoS'
     })
 
-    logger.info(f"WoS: {len(standardized)} records standardized")
-    return standardized
-
-
-def load_scopus(filepath: Path) -> pd.DataFrame:
-    """Load and standardize Scopus CSV."""
-    df = pd.read_csv(filepath)
 
-    standardized = pd.DataFrame({
+def standardize_scopus(df: pd.DataFrame) -> pd.DataFrame:
+    """Map Scopus columns onto the shared schema."""
+    return pd.DataFrame({
         'title': df.get('Title', ''),
         'abstract': df.get('Abstract', ''),
         'authors': df.get('Authors', ''),
-        'year': df.get('Year', ''),
+        'year': text_column(df, 'Year'),
         'journal': df.get('Source title', ''),
         'doi': df.get('DOI', ''),
-        'volume': df.get('Volume', ''),
-        'issue': df.get('Issue', ''),
-        'pages': df.get('Page start', '').astype(str) + '-' + df.get('Page end', '').astype(str),
+        'volume': text_column(df, 'Volume'),
+        'issue': text_column(df, 'Issue'),
+        'pages': page_range(df, 'Page start', 'Page end'),
         'language': df.get('Language of Original Document', ''),
         'keywords': df.get('Author Keywords', ''),
         'issn': df.get('ISSN', ''),
@@ -79,24 +135,19 @@ def load_scopus(filepath: Path) -> pd.DataFrame:
         'source_database': 'Scopus'
     })
 
-    logger.info(f"Scopus: {len(standardized)} records standardized")
-    return standardized
 
-
-def load_ieee(filepath: Path) -> pd.DataFrame:
-    """Load and standardize IEEE CSV."""
-    df = pd.read_csv(filepath)
-
-    standardized = pd.DataFrame({
+def standardize_ieee(df: pd.DataFrame) -> pd.DataFrame:
+    """Map IEEE Xplore columns onto the shared schema."""
+    return pd.DataFrame({
         'title': df.get('Document Title', ''),
         'abstract': df.get('Abstract', ''),
         'authors': df.get('Authors', ''),
-        'year': df.get('Publication Year', ''),
+        'year': text_column(df, 'Publication Year'),
         'journal': df.get('Publication Title', ''),
         'doi': df.get('DOI', ''),
-        'volume': df.get('Volume', ''),
-        'issue': df.get('Issue', ''),
-        'pages': df.get('Start Page', '').astype(str) + '-' + df.get('End Page', '').astype(str),
+        'volume': text_column(df, 'Volume'),
+        'issue': text_column(df, 'Issue'),
+        'pages': page_range(df, 'Start Page', 'End Page'),
         'language': '',
         'keywords': df.get('Author Keywords', ''),
         'issn': df.get('ISSN', ''),
@@ -104,29 +155,22 @@ def load_ieee(filepath: Path) -> pd.DataFrame:
         'source_database': 'IEEE'
     })
 
-    logger.info(f"IEEE: {len(standardized)} records standardized")
-    return standardized
-
-
-def load_psycinfo(filepath: Path) -> pd.DataFrame:
-    """Load and standardize PsycINFO/ProQuest CSV."""
-    df = pd.read_csv(filepath)
 
+def standardize_psycinfo(df: pd.DataFrame) -> pd.DataFrame:
+    """Map PsycINFO/ProQuest columns onto the shared schema."""
     # Extract year from PubDate
-    year = df.get('PubDate', df.get('AlphaDate', '')).astype(str)
-    year = year.apply(lambda x: re.search(r'(20\d{2})', str(x)).group(1)
-                      if re.search(r'(20\d{2})', str(x)) else '')
+    year = text_column(df, 'PubDate', 'AlphaDate').str.extract(r'(20\d{2})', expand=False)
 
-    standardized = pd.DataFrame({
+    return pd.DataFrame({
         'title': df.get('Title', ''),
         'abstract': df.get('Abstract', ''),
         'authors': df.get('Author', ''),
         'year': year,
         'journal': df.get('Publication', ''),
         'doi': df.get('DOI', ''),
-        'volume': df.get('Volume', ''),
-        'issue': df.get('Issue', ''),
-        'pages': df.get('StartPage', df.get('PageRange', '')).astype(str),
+        'volume': text_column(df, 'Volume'),
+        'issue': text_column(df, 'Issue'),
+        'pages': text_column(df, 'StartPage', 'PageRange'),
         'language': df.get('Language', ''),
         'keywords': '',
         'issn': df.get('ISSN', ''),
@@ -134,10 +178,228 @@ def load_psycinfo(filepath: Path) -> pd.DataFrame:
         'source_database': 'PsycINFO'
     })
 
+
+def read_wos_file(path: Path) -> pd.DataFrame:
+    """Read one WoS export, with the Rust-based calamine reader when installed."""
+    return pd.read_excel(path, engine=EXCEL_ENGINE)
+
+
+def cached_standardize(path: Path, db_name: str, read, cache_dir: Path = None) -> pd.DataFrame:
+    """
+    Standardize one export file, reusing a Parquet copy keyed by its content.
+
+    The cache file name holds the database, the SHA-256 of the source file
+    and LOADER_VERSION, so an edited export or a changed mapping misses the
+    cache and is re-parsed. Cached and fresh results are both all-string.
+
+    Args:
+        path: Export file
+        db_name: Key into STANDARDIZERS
+        read: Callable parsing `path` into the raw export frame
+        cache_dir: Cache directory (None = no caching)
+
+    Returns:
+        Standardized DataFrame
+    """
+    if cache_dir is None:
+        return STANDARDIZERS[db_name](read(path))
+
+    cache_path = Path(cache_dir) / f"{db_name}-{file_sha256(path)}-v{LOADER_VERSION}.parquet"
+    if cache_path.exists():
+        logger.info(f"  {db_name}: cache hit for {Path(path).name}")
+        return pd.read_parquet(cache_path)
+
+    standardized = STANDARDIZERS[db_name](read(path)).reindex(columns=STANDARD_COLUMNS).astype('string')
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp')
+    standardized.to_parquet(tmp_path, index=False)
+    tmp_path.replace(cache_path)
+    logger.info(f"  {db_name}: cached {Path(path).name} as {cache_path.name}")
+    return standardized
+
+
+def load_wos(directory: Path, cache_dir: Path = None) -> pd.DataFrame:
+    """Load and standardize Web of Science XLS files."""
+    xls_files = sorted(directory.glob("*.xls"))
+    if not xls_files:
+        logger.warning("No WoS XLS files found")
+        return pd.DataFrame()
+
+    if cache_dir is not None:
+        # Cache per workbook so adding one export re-parses only that file
+        standardized = pd.concat([cached_standardize(f, 'WoS', read_wos_file, cache_dir)
+                                  for f in xls_files], ignore_index=True)
+        logger.info(f"WoS: {len(standardized)} records standardized")
+        return standardized
+
+    dfs = []
+    for f in xls_files:
+        df = read_wos_file(f)
+        dfs.append(df)
+        logger.info(f"  WoS: loaded {len(df)} records from {f.name}")
+
+    combined = pd.concat(dfs, ignore_index=True)
+    standardized = standardize_wos(combined)
+
+    logger.info(f"WoS: {len(standardized)} records standardized")
+    return standardized
+
+
+def load_scopus(filepath: Path, cache_dir: Path = None) -> pd.DataFrame:
+    """Load and standardize Scopus CSV."""
+    standardized = cached_standardize(filepath, 'Scopus', pd.read_csv, cache_dir)
+    logger.info(f"Scopus: {len(standardized)} records standardized")
+    return standardized
+
+
+def load_ieee(filepath: Path, cache_dir: Path = None) -> pd.DataFrame:
+    """Load and standardize IEEE CSV."""
+    standardized = cached_standardize(filepath, 'IEEE', pd.read_csv, cache_dir)
+    logger.info(f"IEEE: {len(standardized)} records standardized")
+    return standardized
+
+
+def load_psycinfo(filepath: Path, cache_dir: Path = None) -> pd.DataFrame:
+    """Load and standardize PsycINFO/ProQuest CSV."""
+    standardized = cached_standardize(filepath, 'PsycINFO', pd.read_csv, cache_dir)
     logger.info(f"PsycINFO: {len(standardized)} records standardized")
     return standardized
 
 
+def iter_export_chunks(db_name: str, source: Path, chunksize: int = STREAM_CHUNK_SIZE):
+    """
+    Yield raw export chunks: one per WoS workbook, `chunksize` rows per CSV.
+
+    WoS exports are capped at 1,000 records per file, so a workbook is
+    already a bounded chunk.
+    """
+    if db_name == 'WoS':
+        xls_files = sorted(Path(source).glob("*.xls"))
+        if not xls_files:
+            logger.warning("No WoS XLS files found")
+        for f in xls_files:
+            yield read_wos_file(f)
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def stream_to_parquet(sources: dict, output_path: Path,
+                      chunksize: int = STREAM_CHUNK_SIZE) -> dict:
+    """
+    Standardize exports chunk by chunk into one Parquet staging file.
+
+    Only one raw chunk and its standardized copy are in memory at a time;
+    every column is written as string so all chunks share one schema, and
+    year/volume/issue go through text_column in the standardizers so a
+    chunk with blanks writes '2020', not '2020.0'. Each chunk is one row
+    group, which read_dedup_frame and write_staged_records rely on.
+
+    Args:
+        sources: Database name -> export path (WoS: directory of XLS files)
+        output_path: Parquet file to write
+        chunksize: CSV rows per chunk
+
+    Returns:
+        Database name -> records written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Streaming standardization requires pyarrow: pip install pyarrow") from e
+
+    schema = pa.schema([(col, pa.string()) for col in STANDARD_COLUMNS])
+    counts = {}
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for db_name, source in sources.items():
+            counts[db_name] = 0
+            for chunk in iter_export_chunks(db_name, source, chunksize):
+                standardized = STANDARDIZERS[db_name](chunk)
+                standardized = standardized.reindex(columns=STANDARD_COLUMNS).astype('string')
+                writer.write_table(pa.Table.from_pandas(standardized, schema=schema, preserve_index=False))
+                counts[db_name] += len(standardized)
+            logger.info(f"{db_name}: {counts[db_name]} records streamed to {output_path.name}")
+    return counts
+
+
+def read_dedup_frame(staging_path: Path) -> pd.DataFrame:
+    """
+    Read a staging file for deduplication, one row group at a time.
+
+    DEDUP_COLUMNS keep their values. Every other column keeps blank values
+    (as completeness_scores judges them) and has the rest replaced by 'x',
+    so completeness scores and missing-data counts are unchanged while
+    abstracts and keywords are never held in memory together. `_row` is
+    the record's position in the staging file.
+
+    Args:
+        staging_path: File written by stream_to_parquet
+
+    Returns:
+        STANDARD_COLUMNS frame plus `_row`
+    """
+    import pyarrow.parquet as pq
+
+    staging = pq.ParquetFile(staging_path)
+    parts, offset = [], 0
+    for group in range(staging.num_row_groups):
+        chunk = staging.read_row_group(group).to_pandas()
+        for col in STANDARD_COLUMNS:
+            if col not in DEDUP_COLUMNS:
+                blank = completeness_scores(chunk[[col]], {col: 1.0}) == 0
+                chunk[col] = chunk[col].where(blank, 'x')
+        chunk['_row'] = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        parts.append(chunk)
+    if not parts:
+        return pd.DataFrame(columns=STANDARD_COLUMNS + ['_row'])
+    return pd.concat(parts, ignore_index=True)
+
+
+def write_staged_records(staging_path: Path, deduped: pd.DataFrame, output_path: Path,
+                         chunksize: int = STREAM_CHUNK_SIZE):
+    """
+    Write the full records behind a deduplicated read_dedup_frame result.
+
+    Rows are written in `deduped` order, `chunksize` at a time: each batch
+    reads only the staging row groups holding its records. The STANDARD_COLUMNS
+    come from the staging file, source_database and the provenance columns
+    added by deduplicate come from `deduped`.
+    """
+    import pyarrow.parquet as pq
+
+    staging = pq.ParquetFile(staging_path)
+    starts = np.cumsum([0] + [staging.metadata.row_group(g).num_rows
+                              for g in range(staging.num_row_groups)])
+    derived = ['source_database'] + [c for c in deduped.columns
+                                     if c not in STANDARD_COLUMNS and c != '_row']
+    columns = STANDARD_COLUMNS + derived[1:]
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(columns=columns).to_csv(output_path, index=False)
+    for start in range(0, len(deduped), chunksize):
+        batch = deduped.iloc[start:start + chunksize]
+        rows = batch['_row'].to_numpy()
+        groups = np.searchsorted(starts, rows, side='right') - 1
+        pieces = []
+        for group in np.unique(groups):
+            wanted = rows[groups == group]
+            table = staging.read_row_group(int(group)).take(wanted - starts[group])
+            pieces.append(table.to_pandas().set_axis(wanted))
+        full = pd.concat(pieces).loc[rows].reset_index(drop=True)
+        for col in derived:
+            full[col] = batch[col].to_numpy()
+        full[columns].to_csv(output_path, mode='a', header=False, index=False)
+
+
+STANDARDIZERS = {
+    'WoS': standardize_wos,
+    'Scopus': standardize_scopus,
+    'IEEE': standardize_ieee,
+    'PsycINFO': standardize_psycinfo,
+}
+
+
 def normalize_doi(doi_val) -> str:
     """Normalize DOI for comparison."""
     if pd.isna(doi_val) or str(doi_val).strip() == '':
@@ -148,6 +410,31 @@ def normalize_doi(doi_val) -> str:
     return doi
 
 
+def normalize_doi_series(dois: pd.Series) -> pd.Series:
+    """Vectorized normalize_doi for a whole column."""
+    return (dois.fillna('').astype(str).str.strip().str.lower()
+            .str.replace(r'^https?://doi\.org/', '', regex=True)
+            .str.replace(r'^doi:\s*', '', regex=True))
+
+
+def add_provenance(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add source_record_id ('DB:n', 1-based per database) and lineage_ids.
+
+    Mirrors dedup_merge.merge_databases; existing columns are left untouched.
+    """
+    if 'source_record_id' not in df.columns:
+        ordinal = df.groupby('source_database', sort=False).cumcount() + 1
+        df['source_record_id'] = df['source_database'].astype(str) + ':' + ordinal.astype(str)
+    if 'lineage_ids' not in df.columns:
+        df['lineage_ids'] = df['source_record_id']
+    return df
+
+
+def _join_unique(values) -> str:
+    return '; '.join(dict.fromkeys(values))
+
+
 def normalize_title(title: str) -> str:
     """Normalize title for fuzzy comparison."""
     if pd.isna(title):
@@ -158,28 +445,122 @@ def normalize_title(title: str) -> str:
     return t
 
 
-def deduplicate(df: pd.DataFrame, title_threshold: float = 0.90) -> pd.DataFrame:
-    """Two-pass deduplication: exact DOI match, then fuzzy title match."""
+# Key families exempt from MAX_BLOCK_SIZE: prefix keeps baseline recall,
+# sorted-token blocks hold identical content words
+UNCAPPED_KEYS = ('p:', 's:')
+
+
+def first_author_surname(authors) -> str:
+    """
+    Best-effort surname of the first listed author.
+
+    Handles 'Smith, J.; Doe, A.' (WoS/PsycINFO), 'Smith J., Doe A.' (Scopus)
+    and 'J. Smith; A. Doe' (IEEE).
+    """
+    if pd.isna(authors):
+        return ''
+    first = str(authors).split(';')[0].split(',')[0]
+    first = unicodedata.normalize('NFKD', first).encode('ascii', 'ignore').decode()
+    words = [w for w in re.findall(r"[A-Za-z][A-Za-z'\-]*\.?", first)
+             if not w.endswith('.') and not (len(w) <= 2 and w.isupper())]
+    return words[-1].lower().replace("'", '') if words else ''
+
+
+def _parse_year(value):
+    match = re.search(r'(\d{4})', '' if pd.isna(value) else str(value))
+    return int(match.group(1)) if match else None
+
+
+def build_blocking_keys(titles: list, authors: list, years: list,
+                        strategy: str = 'multikey') -> list:
+    """
+    Blocking keys per record.
+
+    'prefix' reproduces the original 30-character title prefix blocking.
+    'multikey' adds keys that survive a changed first word or reordered
+    subtitle:
+      - s: sorted content tokens of the title
+      - r: the RARE_TOKENS_PER_RECORD rarest content tokens shared with
+           at least one other record
+      - a: first-author surname with year and year + 1, so records whose
+           years differ by at most one share a key
+
+    Args:
+        titles: Normalized titles
+        authors: Raw author strings
+        years: Raw year values
+        strategy: One of BLOCKING_STRATEGIES
+
+    Returns:
+        List of key lists (empty titles get no keys)
+    """
+    if strategy not in BLOCKING_STRATEGIES:
+        raise ValueError(f"Unknown blocking strategy '{strategy}'. Choose from {BLOCKING_STRATEGIES}")
+
+    keys = [[f"p:{t[:PREFIX_LENGTH]}"] if t else [] for t in titles]
+    if strategy == 'prefix':
+        return keys
+
+    content = [sorted({w for w in t.split() if w not in TITLE_STOPWORDS}) for t in titles]
+    doc_freq = Counter(w for words in content for w in words)
+
+    for pos, (title, words) in enumerate(zip(titles, content)):
+        if not title:
+            continue
+        if words:
+            keys[pos].append("s:" + ' '.join(words))
+        shared = sorted((doc_freq[w], w) for w in words if doc_freq[w] > 1)
+        keys[pos].extend(f"r:{w}" for _, w in shared[:RARE_TOKENS_PER_RECORD])
+        surname = first_author_surname(authors[pos])
+        year = _parse_year(years[pos])
+        if surname and year is not None:
+            keys[pos].extend([f"a:{surname}|{year}", f"a:{surname}|{year + 1}"])
+    return keys
+
+
+def deduplicate(df: pd.DataFrame, title_threshold: float = 0.90,
+                blocking: str = 'multikey', mode: str = 'greedy',
+                completeness_weights: dict = None, workers: int = 1) -> pd.DataFrame:
+    """
+    Two-pass deduplication: exact DOI match, then fuzzy title match.
+
+    Pass 2 compares only pairs sharing a blocking key (see
+    build_blocking_keys); records with empty titles are never title matches.
+    In 'cluster' mode each pass collapses union-find clusters of all
+    matched pairs to the most complete record (see
+    dedup_engine.collapse_clusters) instead of keeping the first one.
+    With workers > 1 candidate pairs are verified in a process pool
+    first; the output is identical to the single-process run.
+    """
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode '{mode}'. Choose from {DEDUP_MODES}")
     logger.info(f"=== DEDUPLICATION START: {len(df)} records ===")
 
-    # Normalize DOIs
-    df['doi_norm'] = df['doi'].apply(normalize_doi)
+    add_provenance(df)
+    df['doi_norm'] = normalize_doi_series(df['doi'])
 
     # --- Pass 1: DOI dedup ---
-    has_doi = df[df['doi_norm'] != ''].copy()
-    no_doi = df[df['doi_norm'] == ''].copy()
+    has_doi_mask = df['doi_norm'] != ''
+    has_doi = df[has_doi_mask].sort_values('doi_norm', kind='stable')
+    no_doi = df[~has_doi_mask]
 
     before = len(has_doi)
-    # Keep first occurrence, but track which databases contributed
-    doi_groups = has_doi.groupby('doi_norm')
-    keep_rows = []
-    for doi_val, group in doi_groups:
-        first = group.iloc[0].copy()
-        if len(group) > 1:
-            first['source_database'] = '; '.join(group['source_database'].unique())
-        keep_rows.append(first)
-
-    has_doi_dedup = pd.DataFrame(keep_rows)
+    if mode == 'cluster':
+        has_doi = has_doi.reset_index(drop=True)
+        groups = has_doi.groupby('doi_norm', sort=False).indices.values()
+        pairs = [(g[0], k) for g in groups for k in g[1:]]
+        has_doi_dedup = collapse_clusters(has_doi, pairs, completeness_weights)
+    else:
+        # Keep first occurrence; merge databases and lineage of the whole DOI group
+        has_doi_dedup = has_doi.drop_duplicates('doi_norm').set_index('doi_norm')
+        shared = has_doi[has_doi['doi_norm'].duplicated(keep=False)]
+        merged = shared.groupby('doi_norm', sort=False).agg(
+            source_database=('source_database', _join_unique),
+            lineage_ids=('lineage_ids', '; '.join),
+        )
+        has_doi_dedup.loc[merged.index, ['source_database', 'lineage_ids']] = merged
+        has_doi_dedup = has_doi_dedup.reset_index()[df.columns]
+
     doi_dupes = before - len(has_doi_dedup)
     logger.info(f"Pass 1 (DOI): removed {doi_dupes} duplicates ({before} -> {len(has_doi_dedup)})")
 
@@ -187,42 +568,149 @@ def deduplicate(df: pd.DataFrame, title_threshold: float = 0.90) -> pd.DataFrame
 
     # --- Pass 2: Fuzzy title dedup ---
     combined['title_norm'] = combined['title'].apply(normalize_title)
+    titles = combined['title_norm'].tolist()
+
+    keys = build_blocking_keys(titles, combined['authors'].tolist(),
+                               combined['year'].tolist(), strategy=blocking)
+    pairs, skipped = block_pairs(keys, max_block_size=MAX_BLOCK_SIZE, uncapped=UNCAPPED_KEYS)
+    logger.info(f"Pass 2 blocking ({blocking}): {len(pairs):,} candidate pairs, "
+                f"{skipped} oversized blocks skipped")
+
+    if mode == 'cluster':
+        matches = verify_pairs(titles, pairs, title_threshold, workers=workers)
+        deduped = collapse_clusters(combined, matches, completeness_weights)
+        title_dupes = len(combined) - len(deduped)
+        logger.info(f"Pass 2 (Title): {len(matches):,} matched pairs, collapsed {title_dupes} fuzzy duplicates")
+        deduped = deduped.drop(columns=['doi_norm', 'title_norm'])
+        logger.info(f"=== DEDUPLICATION COMPLETE: {len(deduped)} unique records ===")
+        return deduped, doi_dupes, title_dupes
+
+    # In parallel mode only verified matches remain as candidates
+    pre_verified = workers > 1
+    if pre_verified:
+        pairs = verify_pairs(titles, pairs, title_threshold, workers=workers)
+
+    partners = defaultdict(list)
+    for i, j in sorted(pairs):
+        partners[i].append(j)
 
     keep_mask = [True] * len(combined)
     title_dupes = 0
 
-    # Group by first 30 chars of normalized title to reduce O(n^2) comparisons
-    combined['title_prefix'] = combined['title_norm'].str[:30]
-
-    for prefix, group in combined.groupby('title_prefix'):
-        if len(group) < 2:
+    for i in range(len(combined)):
+        if not keep_mask[i]:
             continue
-        indices = group.index.tolist()
-        for i_pos, i in enumerate(indices):
-            if not keep_mask[i]:
+        for j in partners.get(i, ()):
+            if not keep_mask[j]:
                 continue
-            for j in indices[i_pos + 1:]:
-                if not keep_mask[j]:
-                    continue
-                sim = SequenceMatcher(None, combined.at[i, 'title_norm'],
-                                      combined.at[j, 'title_norm']).ratio()
-                if sim >= title_threshold:
-                    keep_mask[j] = False
-                    title_dupes += 1
-                    # Merge source databases
-                    src_i = combined.at[i, 'source_database']
-                    src_j = combined.at[j, 'source_database']
-                    if src_j not in src_i:
-                        combined.at[i, 'source_database'] = f"{src_i}; {src_j}"
+            if pre_verified or title_match(titles[i], titles[j], title_threshold):
+                keep_mask[j] = False
+                title_dupes += 1
+                # Merge source databases
+                src_i = combined.at[i, 'source_database']
+                src_j = combined.at[j, 'source_database']
+                if src_j not in src_i:
+                    combined.at[i, 'source_database'] = f"{src_i}; {src_j}"
+                combined.at[i, 'lineage_ids'] += '; ' + combined.at[j, 'lineage_ids']
 
     logger.info(f"Pass 2 (Title): removed {title_dupes} fuzzy duplicates")
 
-    deduped = combined[keep_mask].drop(columns=['doi_norm', 'title_norm', 'title_prefix']).reset_index(drop=True)
+    deduped = combined[keep_mask].drop(columns=['doi_norm', 'title_norm']).reset_index(drop=True)
     logger.info(f"=== DEDUPLICATION COMPLETE: {len(deduped)} unique records ===")
 
     return deduped, doi_dupes, title_dupes
 
 
+def compare_blocking(df: pd.DataFrame, title_threshold: float = 0.90) -> dict:
+    """
+    Measure recall and throughput of each blocking strategy on one frame.
+
+    Ground truth is every above-threshold title pair, found losslessly with
+    the q-gram count filter in dedup_engine. Run this on the DOI-deduplicated
+    frame so the numbers describe Pass 2 only.
+
+    Args:
+        df: Records with title, authors and year columns
+        title_threshold: SequenceMatcher ratio for a duplicate
+
+    Returns:
+        Dict with 'records', 'true_matches' and per-strategy statistics
+    """
+    titles = df['title'].apply(normalize_title).tolist()
+    authors = df['authors'].tolist()
+    years = df['year'].tolist()
+
+    t0 = time.perf_counter()
+    truth = set(title_match_pairs(titles, title_threshold))
+    truth_elapsed = time.perf_counter() - t0
+
+    report = {'records': len(titles), 'threshold': title_threshold,
+              'true_matches': len(truth), 'truth_elapsed': truth_elapsed, 'strategies': {}}
+    found_by = {}
+    for strategy in BLOCKING_STRATEGIES:
+        t0 = time.perf_counter()
+        keys = build_blocking_keys(titles, authors, years, strategy=strategy)
+        pairs, skipped = block_pairs(keys, max_block_size=MAX_BLOCK_SIZE, uncapped=UNCAPPED_KEYS)
+        t_block = time.perf_counter() - t0
+        matches = {(i, j) for i, j in pairs if title_match(titles[i], titles[j], title_threshold)}
+        elapsed = time.perf_counter() - t0
+        found_by[strategy] = matches
+        report['strategies'][strategy] = {
+            'candidate_pairs': len(pairs),
+            'skipped_blocks': skipped,
+            'matches': len(matches),
+            'recall': len(matches) / len(truth) if truth else 1.0,
+            'blocking_seconds': t_block,
+            'total_seconds': elapsed,
+            'pairs_per_second': len(pairs) / elapsed if elapsed > 0 else 0.0,
+        }
+
+    report['multikey_only'] = len(found_by['multikey'] - found_by['prefix'])
+    report['prefix_only'] = len(found_by['prefix'] - found_by['multikey'])
+    return report
+
+
+def write_blocking_report(report: dict, output_path: Path):
+    """Write the prefix vs multi-key blocking comparison as text."""
+    n = report['records']
+    lines = [
+        "=" * 70,
+        "TITLE BLOCKING REPORT — prefix baseline vs multi-key",
+        "=" * 70,
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Records (after DOI pass):      {n:>10,}",
+        f"Similarity threshold:          {report['threshold']:>10.2f}",
+        f"All possible pairs:            {n * (n - 1) // 2:>10,}",
+        f"True duplicate pairs:          {report['true_matches']:>10,}"
+        f"  (exhaustive q-gram reference, {report['truth_elapsed']:.2f}s)",
+        "",
+    ]
+    for strategy, s in report['strategies'].items():
+        lines.extend([
+            strategy.upper(),
+            "-" * 70,
+            f"  Candidate pairs:             {s['candidate_pairs']:>10,}",
+            f"  Oversized blocks skipped:    {s['skipped_blocks']:>10,}",
+            f"  Duplicate pairs found:       {s['matches']:>10,}",
+            f"  Recall:                      {s['recall'] * 100:>9.2f}%",
+            f"  Blocking time:               {s['blocking_seconds']:>9.2f}s",
+            f"  Total time:                  {s['total_seconds']:>9.2f}s",
+            f"  Throughput:                  {s['pairs_per_second']:>10,.0f} pairs/s",
+            "",
+        ])
+    lines.extend([
+        f"Pairs found only by multikey:  {report['multikey_only']:>10,}",
+        f"Pairs found only by prefix:    {report['prefix_only']:>10,}",
+        "=" * 70,
+    ])
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        f.write('\n'.join(lines))
+
+    logger.info(f"Blocking report saved: {output_path}")
+
+
 def generate_report(original_counts: dict, final_df: pd.DataFrame,
                     doi_dupes: int, title_dupes: int, output_path: Path):
     """Generate PRISMA-compatible deduplication report."""
@@ -285,43 +773,96 @@ def generate_report(original_counts: dict, final_df: pd.DataFrame,
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Standardize, merge, and deduplicate database exports")
+    parser.add_argument('--title-threshold', type=float, default=0.90,
+                        help='Title similarity threshold (default: 0.90)')
+    parser.add_argument('--blocking', choices=BLOCKING_STRATEGIES, default='multikey',
+                        help='Candidate blocking for the fuzzy title pass (default: multikey)')
+    parser.add_argument('--mode', choices=DEDUP_MODES, default='greedy',
+                        help='greedy: keep first of each match; cluster: collapse union-find clusters')
+    parser.add_argument('--completeness-weights', default=None,
+                        help='Canonical record weights for cluster mode, e.g. "abstract=3,doi=2,year=1"')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for fuzzy title verification (default: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Re-parse every export instead of using the Parquet cache in {CACHE_DIR}')
+    parser.add_argument('--stream', action='store_true',
+                        help='Standardize exports chunk by chunk into a Parquet staging file '
+                             '(bounded memory; requires pyarrow)')
+    parser.add_argument('--blocking-report', action='store_true',
+                        help='Also write a recall/throughput report comparing blocking strategies')
+    args = parser.parse_args()
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     # --- Load all databases ---
     logger.info("Loading database exports...")
 
-    wos_df = load_wos(RAW_DIR / "wos")
-    scopus_df = load_scopus(next((RAW_DIR / "scopus").glob("*.csv")))
-    ieee_df = load_ieee(next((RAW_DIR / "ieee").glob("*.csv")))
-    psycinfo_df = load_psycinfo(next((RAW_DIR / "psycinfo").glob("*.csv")))
-
-    original_counts = {
-        'WoS': len(wos_df),
-        'Scopus': len(scopus_df),
-        'IEEE': len(ieee_df),
-        'PsycINFO': len(psycinfo_df),
-    }
-
-    # --- Merge ---
-    merged = pd.concat([wos_df, scopus_df, ieee_df, psycinfo_df], ignore_index=True)
-    logger.info(f"Total merged: {len(merged)} records")
-
-    # --- Save merged (pre-dedup) ---
-    merged.to_csv(OUTPUT_DIR / "merged_all_databases.csv", index=False)
+    if args.stream:
+        sources = {
+            'WoS': RAW_DIR / "wos",
+            'Scopus': next((RAW_DIR / "scopus").glob("*.csv")),
+            'IEEE': next((RAW_DIR / "ieee").glob("*.csv")),
+            'PsycINFO': next((RAW_DIR / "psycinfo").glob("*.csv")),
+        }
+        staging_path = OUTPUT_DIR / "merged_all_databases.parquet"
+        original_counts = stream_to_parquet(sources, staging_path)
+        merged = read_dedup_frame(staging_path)
+        logger.info(f"Total merged: {len(merged)} records (staged in {staging_path.name})")
+    else:
+        cache_dir = None if args.no_cache else CACHE_DIR
+        if cache_dir is not None and not HAS_PYARROW:
+            logger.warning("pyarrow not installed; export cache disabled")
+            cache_dir = None
+        wos_df = load_wos(RAW_DIR / "wos", cache_dir)
+        scopus_df = load_scopus(next((RAW_DIR / "scopus").glob("*.csv")), cache_dir)
+        ieee_df = load_ieee(next((RAW_DIR / "ieee").glob("*.csv")), cache_dir)
+        psycinfo_df = load_psycinfo(next((RAW_DIR / "psycinfo").glob("*.csv")), cache_dir)
+
+        original_counts = {
+            'WoS': len(wos_df),
+            'Scopus': len(scopus_df),
+            'IEEE': len(ieee_df),
+            'PsycINFO': len(psycinfo_df),
+        }
+
+        # --- Merge ---
+        merged = pd.concat([wos_df, scopus_df, ieee_df, psycinfo_df], ignore_index=True)
+        logger.info(f"Total merged: {len(merged)} records")
+
+        # --- Save merged (pre-dedup) ---
+        merged.to_csv(OUTPUT_DIR / "merged_all_databases.csv", index=False)
 
     # --- Deduplicate ---
-    deduped, doi_dupes, title_dupes = deduplicate(merged)
+    weights = parse_completeness_weights(args.completeness_weights) if args.completeness_weights else None
+    deduped, doi_dupes, title_dupes = deduplicate(merged, title_threshold=args.title_threshold,
+                                                  blocking=args.blocking, mode=args.mode,
+                                                  completeness_weights=weights, workers=args.workers)
 
     # --- Save deduplicated ---
     timestamp = datetime.now().strftime('%Y%m%d')
     dedup_path = OUTPUT_DIR / f"deduplicated_{len(deduped)}_{timestamp}.csv"
-    deduped.to_csv(dedup_path, index=False)
+    if args.stream:
+        write_staged_records(staging_path, deduped, dedup_path)
+        deduped = deduped.drop(columns='_row')
+    else:
+        deduped.to_csv(dedup_path, index=False)
     logger.info(f"Deduplicated file saved: {dedup_path}")
 
     # --- Generate report ---
     report_path = OUTPUT_DIR / f"dedup_report_{timestamp}.txt"
     generate_report(original_counts, deduped, doi_dupes, title_dupes, report_path)
 
+    if args.mode == 'cluster':
+        clusters_path = OUTPUT_DIR / f"dedup_clusters_{timestamp}.csv"
+        cluster_table(deduped, weights).to_csv(clusters_path, index=False)
+        logger.info(f"Cluster audit file saved: {clusters_path}")
+
+    if args.blocking_report:
+        doi_unique = merged[~merged['doi_norm'].duplicated() | (merged['doi_norm'] == '')]
+        blocking = compare_blocking(doi_unique.reset_index(drop=True), args.title_threshold)
+        write_blocking_report(blocking, OUTPUT_DIR / f"blocking_report_{timestamp}.txt")
+
     # --- Summary ---
     total = sum(original_counts.values())
     logger.info(f"\n{'='*50}")
@@ -0,0 +1,186 @@
+"""Tests for scripts/screening/dedup_engine.py"""
+
+import sys
+import random
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "screening"))
+
+import pandas as pd
+
+import dedup_engine
+from dedup_engine import (
+    QGramTitleIndex,
+    UnionFind,
+    cluster_table,
+    collapse_clusters,
+    greedy_title_dedup,
+    max_partner_length,
+    min_partner_length,
+    parse_completeness_weights,
+    title_match_pairs,
+    verify_pairs,
+)
+
+
+def _random_titles(n, seed=7):
+    """Word-salad titles with injected near duplicates."""
+    rng = random.Random(seed)
+    vocab = ("artificial intelligence adoption education students teachers "
+             "acceptance model trust chatgpt learning higher university survey "
+             "structural equation intention perceived usefulness ease").split()
+    titles = []
+    for _ in range(n):
+        if titles and rng.random() < 0.3:
+            words = rng.choice(titles).split()
+            words.insert(rng.randrange(len(words) + 1), rng.choice(["the", "a", "of"]))
+            titles.append(" ".join(words))
+        else:
+            titles.append(" ".join(rng.choice(vocab) for _ in range(rng.randint(2, 12))))
+    return titles
+
+
+def _brute_force(titles, threshold):
+    kept, removed = [], set()
+    for i, a in enumerate(titles):
+        if i in removed:
+            continue
+        kept.append(i)
+        for j in range(i + 1, len(titles)):
+            b = titles[j]
+            if j not in removed and a and b and SequenceMatcher(None, a, b).ratio() >= threshold:
+                removed.add(j)
+    return kept
+
+
+def test_length_bounds_are_symmetric():
+    for length in (5, 40, 117):
+        hi = max_partner_length(length, 0.9)
+        assert min_partner_length(hi, 0.9) <= length
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_greedy_dedup_matches_brute_force(threshold):
+    titles = _random_titles(100)
+    kept, removed = greedy_title_dedup(titles, threshold)
+    assert kept == _brute_force(titles, threshold)
+    assert len(kept) + len(removed) == len(titles)
+
+
+def test_query_returns_every_true_match():
+    """No indexed title reaching the threshold may be filtered out."""
+    titles = _random_titles(120, seed=3)
+    index = QGramTitleIndex(titles, threshold=0.85)
+    probe = titles[10] + " revisited"
+    found = set(index.query(probe))
+    for pos, title in enumerate(titles):
+        if SequenceMatcher(None, title, probe).ratio() >= 0.85:
+            assert pos in found
+
+
+def test_empty_titles_never_match():
+    kept, removed = greedy_title_dedup(["", "", "ai", ""], 0.9)
+    assert kept == [0, 1, 2, 3]
+    assert not removed
+
+
+# ---------------------------------------------------------------------------
+# Union-find clustering
+# ---------------------------------------------------------------------------
+
+def test_union_find_labels_are_smallest_member():
+    uf = UnionFind(6)
+    uf.union(4, 2)
+    uf.union(2, 5)
+    uf.union(0, 1)
+    assert uf.labels().tolist() == [0, 0, 2, 3, 2, 2]
+
+
+def test_title_match_pairs_is_exhaustive():
+    titles = _random_titles(80, seed=11)
+    expected = [(i, j) for i in range(len(titles)) for j in range(i + 1, len(titles))
+                if titles[i] and titles[j]
+                and SequenceMatcher(None, titles[i], titles[j]).ratio() >= 0.8]
+    assert title_match_pairs(titles, 0.8) == expected
+
+
+def _provenance_frame():
+    return pd.DataFrame({
+        "title": ["chain a", "chain b", "chain c", "single"],
+        "abstract": ["", "full abstract", "", "x"],
+        "doi": ["", "", "10.1/c", ""],
+        "source_database": ["WoS", "Scopus", "WoS", "IEEE"],
+        "source_record_id": ["WoS:1", "Scopus:1", "WoS:2", "IEEE:1"],
+        "lineage_ids": ["WoS:1", "Scopus:1", "WoS:2", "IEEE:1"],
+    })
+
+
+def test_collapse_clusters_merges_transitive_chain():
+    """A~B and B~C form one cluster even though A and C never matched."""
+    collapsed = collapse_clusters(_provenance_frame(), [(0, 1), (1, 2)])
+    assert len(collapsed) == 2
+    canonical = collapsed.iloc[0]
+    assert canonical["title"] == "chain b"  # has the abstract (weight 3)
+    assert canonical["source_database"] == "WoS; Scopus"
+    assert canonical["lineage_ids"] == "WoS:1; Scopus:1; WoS:2"
+    assert collapsed["cluster_size"].tolist() == [3, 1]
+
+
+def test_collapse_clusters_custom_weights_and_cluster_table():
+    collapsed = collapse_clusters(_provenance_frame(), [(0, 1), (1, 2)], weights={"doi": 5})
+    assert collapsed.iloc[0]["title"] == "chain c"
+    table = cluster_table(collapsed, weights={"doi": 5})
+    assert len(table) == 1
+    assert table.iloc[0]["cluster_id"] == "CL00001"
+    assert table.iloc[0]["canonical_record"] == "WoS:2"
+    assert table.iloc[0]["canonical_score"] == 5
+
+
+def test_collapse_clusters_accumulates_sizes_across_passes():
+    first = collapse_clusters(_provenance_frame(), [(0, 1)])
+    second = collapse_clusters(first, [(0, 1)])
+    assert second["cluster_size"].tolist() == [3, 1]
+    assert second.iloc[0]["lineage_ids"] == "WoS:1; Scopus:1; WoS:2"
+
+
+def test_parse_completeness_weights():
+    assert parse_completeness_weights("abstract=3, doi=2.5") == {"abstract": 3.0, "doi": 2.5}
+    with pytest.raises(ValueError):
+        parse_completeness_weights("abstract")
+
+
+# ---------------------------------------------------------------------------
+# Parallel matching
+# ---------------------------------------------------------------------------
+
+def test_parallel_matching_identical_to_serial(monkeypatch):
+    """Small chunks force several work units per worker."""
+    monkeypatch.setattr(dedup_engine, "INDEX_CHUNK_SIZE", 7)
+    monkeypatch.setattr(dedup_engine, "PAIR_CHUNK_SIZE", 50)
+    titles = _random_titles(120, seed=5)
+
+    assert title_match_pairs(titles, 0.8, workers=2) == title_match_pairs(titles, 0.8)
+    assert greedy_title_dedup(titles, 0.8, workers=2) == greedy_title_dedup(titles, 0.8)
+
+    pairs = {(i, j) for i in range(len(titles)) for j in range(i + 1, len(titles))}
+    assert verify_pairs(titles, pairs, 0.8, workers=2) == title_match_pairs(titles, 0.8)
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.6, 0.8])
+def test_bounds_never_reject_pairs_on_the_threshold(threshold):
+    """Short small-alphabet titles hit ratio == threshold exactly and often."""
+    rng = random.Random(int(threshold * 10))
+    titles = ["".join(rng.choice("abe ") for _ in range(rng.randint(1, 12))) for _ in range(60)]
+    titles += ["ab  bad", "eb  bead"]  # ratio exactly 0.8
+    on_threshold = 0
+    for a in titles:
+        for b in titles:
+            ratio = SequenceMatcher(None, a, b).ratio()
+            on_threshold += ratio == threshold
+            assert dedup_engine.title_match(a, b, threshold) == (bool(a and b) and ratio >= threshold)
+    assert on_threshold
+    kept, _ = greedy_title_dedup(titles, threshold)
+    assert kept == _brute_force(titles, threshold)
@@ -7,7 +7,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "screening"))
 
-from dedup_merge import RecordDeduplicator
+from dedup_merge import RecordDeduplicator, main as dedup_main
+from dedup_engine import CorpusTitleIndex
 
 
 # ---------------------------------------------------------------------------
@@ -113,6 +114,29 @@ def test_merge_databases(tmp_path):
         assert row["lineage_ids"].startswith(row["source_database"])
 
 
+def test_merge_databases_single_read_schema_columns(tmp_path):
+    """Exports are parsed once, as text, keeping only schema columns."""
+    df = pd.DataFrame({
+        "title": ["Study A", "Study B"],
+        "doi": ["10.1000/0001", ""],
+        "year": ["2021", "2022"],
+        "authors": ["Kim, H.", "Lee, K."],
+        "Times Cited": [3, 5],
+    })
+    path = tmp_path / "wos.csv"
+    df.to_csv(path, index=False)
+
+    dedup = RecordDeduplicator()
+    merged = dedup.merge_databases([path], ["WoS"])
+
+    assert dedup.original_counts == {"WoS": 2}
+    assert "Times Cited" not in merged.columns
+    assert "authors" in merged.columns
+    assert merged.loc[0, "doi"] == "10.1000/0001"
+    assert merged.loc[0, "year"] == "2021"
+    assert merged["source_record_id"].tolist() == ["WoS:1", "WoS:2"]
+
+
 # ---------------------------------------------------------------------------
 # generate_dedup_report
 # ---------------------------------------------------------------------------
@@ -136,3 +160,253 @@ def test_generate_dedup_report(tmp_path):
     assert "Scopus" in content
     # Total original = 8, final = 2, removed = 6
     assert "6" in content or "Duplicates removed" in content
+
+
+# ---------------------------------------------------------------------------
+# Indexed title engine
+# ---------------------------------------------------------------------------
+
+def _near_duplicate_titles():
+    base = [
+        "Examining AI adoption intention in higher education using TAM",
+        "Students' acceptance of ChatGPT for academic writing",
+        "Teacher trust in intelligent tutoring systems: a UTAUT perspective",
+        "Completely different study on quantum computing",
+    ]
+    variants = [
+        "Examining AI adoption intention in higher education using TAM model",
+        "STUDENTS ACCEPTANCE OF CHATGPT FOR ACADEMIC WRITING.",
+        "The teacher trust in intelligent tutoring systems: a UTAUT perspective",
+        "AI",
+        "",
+    ]
+    return base + variants + ["AI", "Students' acceptance of ChatGPT for academic writing"]
+
+
+@pytest.mark.parametrize("threshold", [0.6, 0.9, 1.0])
+def test_indexed_engine_matches_pairwise(threshold):
+    """The indexed engine must keep exactly the records the pairwise scan keeps."""
+    df = pd.DataFrame({"title": _near_duplicate_titles()})
+    indexed = RecordDeduplicator(title_similarity_threshold=threshold, engine="indexed")
+    pairwise = RecordDeduplicator(title_similarity_threshold=threshold, engine="pairwise")
+
+    result_indexed = indexed.deduplicate_by_title(df)
+    result_pairwise = pairwise.deduplicate_by_title(df)
+
+    assert result_indexed["title"].tolist() == result_pairwise["title"].tolist()
+
+
+def test_indexed_engine_records_pass_stats():
+    """Title pass should report candidate/pruned pair counts and timings."""
+    dedup = RecordDeduplicator()
+    df = pd.DataFrame({"title": _near_duplicate_titles()})
+    dedup.deduplicate_by_title(df)
+
+    stats = dedup.pass_stats[-1]
+    n = len(df)
+    assert stats.total_pairs == n * (n - 1) // 2
+    assert stats.candidate_pairs + stats.pruned_pairs == stats.total_pairs
+    assert stats.pruned_pairs > 0
+    assert stats.removed == stats.matches
+    assert "verification" in stats.timings
+
+
+def test_unknown_engine_rejected():
+    with pytest.raises(ValueError, match="Unknown title engine"):
+        RecordDeduplicator(engine="magic")
+
+
+def test_report_includes_pass_statistics(tmp_path):
+    """Report should list per-pass timing once passes have run."""
+    dedup = RecordDeduplicator()
+    df = pd.DataFrame({
+        "title": _near_duplicate_titles(),
+        "doi": [""] * len(_near_duplicate_titles()),
+        "source_database": ["WoS"] * len(_near_duplicate_titles()),
+    })
+    final_df = dedup.deduplicate_by_title(dedup.deduplicate_by_doi(df))
+    report_path = tmp_path / "report.txt"
+
+    dedup.generate_dedup_report({"WoS": len(df)}, final_df, report_path)
+
+    content = report_path.read_text()
+    assert "PASS STATISTICS" in content
+    assert "Fuzzy title match" in content
+    assert "pruned" in content
+
+
+# ---------------------------------------------------------------------------
+# Cluster mode
+# ---------------------------------------------------------------------------
+
+def test_cluster_mode_keeps_most_complete_record_and_lineage(tmp_path):
+    """Cluster mode collapses DOI and title duplicates without losing lineage."""
+    dedup = RecordDeduplicator(mode="cluster")
+    df = pd.DataFrame({
+        "title": ["AI adoption in higher education: a survey",
+                  "AI adoption in higher education - a survey",
+                  "AI adoption in higher education a survey",
+                  "Unrelated study"],
+        "abstract": ["", "Full abstract", "", ""],
+        "doi": ["10.1/a", "", "10.1/a", ""],
+        "source_database": ["WoS", "Scopus", "IEEE", "WoS"],
+        "source_record_id": ["WoS:1", "Scopus:1", "IEEE:1", "WoS:2"],
+    })
+    df["lineage_ids"] = df["source_record_id"]
+    result = dedup.deduplicate_by_title(dedup.deduplicate_by_doi(df))
+    assert len(result) == 2
+    canonical = result[result["cluster_size"] == 3].iloc[0]
+    assert canonical["abstract"] == "Full abstract"
+    assert set(canonical["lineage_ids"].split("; ")) == {"WoS:1", "IEEE:1", "Scopus:1"}
+    assert set(canonical["source_database"].split("; ")) == {"WoS", "Scopus", "IEEE"}
+
+    path = tmp_path / "clusters.csv"
+    dedup.save_cluster_report(result, path)
+    clusters = pd.read_csv(path)
+    assert clusters["cluster_size"].tolist() == [3]
+    assert clusters["canonical_record"].tolist() == ["Scopus:1"]
+
+
+@pytest.mark.parametrize("engine", ["indexed", "pairwise"])
+def test_cluster_mode_engines_agree(engine):
+    titles = _near_duplicate_titles()
+    df = pd.DataFrame({"title": titles, "doi": [""] * len(titles)})
+    result = RecordDeduplicator(engine=engine, mode="cluster").deduplicate_by_title(df)
+    reference = RecordDeduplicator(mode="cluster").deduplicate_by_title(df)
+    assert result["title"].tolist() == reference["title"].tolist()
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        RecordDeduplicator(mode="merge")
+
+
+# ---------------------------------------------------------------------------
+# Incremental mode
+# ---------------------------------------------------------------------------
+
+CORPUS = pd.DataFrame({
+    "record_id": ["REC_00001", "REC_00002", "REC_00003"],
+    "title": ["Teacher acceptance of AI tutors in primary schools",
+              "ChatGPT use among university students: a survey",
+              "Trust in algorithmic grading"],
+    "doi": ["10.1/a", "", "10.1/c"],
+    "source_database": ["WoS", "Scopus", "IEEE"],
+})
+
+NEW_BATCH = pd.DataFrame({
+    "title": ["Chatgpt use among university students - a survey",   # title dup of corpus
+              "A new study of generative AI in nursing education",
+              "A new study of generative AI in nursing education.",  # dup within batch
+              "Renamed but same DOI",                                 # DOI dup of corpus
+              "Learning analytics dashboards for instructors"],
+    "doi": ["", "", "", "10.1/c", "10.9/z"],
+})
+
+
+def test_incremental_dedup_against_corpus():
+    dedup = RecordDeduplicator()
+    index = dedup.build_corpus_index(CORPUS)
+    assert index.next_record_number == 4
+
+    new_uniques = dedup.deduplicate_incremental(NEW_BATCH.copy(), index)
+
+    assert new_uniques["title"].tolist() == [
+        "Learning analytics dashboards for instructors",
+        "A new study of generative AI in nursing education",
+    ]
+    assert new_uniques["record_id"].tolist() == ["REC_00004", "REC_00005"]
+    assert list(new_uniques.columns) == list(CORPUS.columns)
+    assert len(index) == 5 and index.next_record_number == 6
+    assert "10.9/z" in index.dois
+
+    # A second run with the same batch adds nothing
+    assert dedup.deduplicate_incremental(NEW_BATCH.copy(), index).empty
+
+
+def test_corpus_index_roundtrip_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(CorpusTitleIndex, "MAX_SEGMENTS", 2)
+    index = CorpusTitleIndex(threshold=0.9)
+    titles = ["teacher acceptance of ai tutors", "chatgpt use among students",
+              "trust in algorithmic grading", "learning analytics dashboards"]
+    for k, title in enumerate(titles):
+        index.add([title], [f"10.{k}/x"])
+    assert index.n_segments <= 2
+
+    path = tmp_path / "corpus.index.pkl"
+    index.save(path)
+    loaded = CorpusTitleIndex.load(path)
+    assert loaded.find_title_match("learning analytics dashboard") == 3
+    assert loaded.find_title_match("unrelated") is None
+
+    rebuilt = CorpusTitleIndex.load(path, threshold=0.5)
+    assert rebuilt.threshold == 0.5 and rebuilt.n_segments == 1
+
+
+def _run_incremental(tmp_path, corpus_path, batch_path, *extra):
+    old_argv = sys.argv
+    try:
+        sys.argv = [
+            "dedup_merge.py",
+            "--inputs", str(batch_path),
+            "--names", "ERIC",
+            "--output", str(tmp_path / "new.csv"),
+            "--report", str(tmp_path / "report.txt"),
+            "--corpus", str(corpus_path),
+            *extra,
+        ]
+        dedup_main()
+    finally:
+        sys.argv = old_argv
+
+
+def test_main_incremental_appends_to_corpus(tmp_path):
+    corpus_path = tmp_path / "deduplicated.csv"
+    CORPUS.to_csv(corpus_path, index=False)
+    batch_path = tmp_path / "eric.csv"
+    NEW_BATCH.to_csv(batch_path, index=False)
+
+    _run_incremental(tmp_path, corpus_path, batch_path)
+
+    corpus = pd.read_csv(corpus_path)
+    assert corpus["record_id"].tolist()[:3] == CORPUS["record_id"].tolist()
+    assert corpus["record_id"].tolist()[3:] == ["REC_00004", "REC_00005"]
+    assert (tmp_path / "deduplicated.csv.index.pkl").exists()
+    assert len(pd.read_csv(tmp_path / "new.csv")) == 2
+
+
+def test_main_incremental_rebuilds_stale_index(tmp_path):
+    """An index that does not match the corpus file is rebuilt, not trusted."""
+    corpus_path = tmp_path / "deduplicated.csv"
+    CORPUS.to_csv(corpus_path, index=False)
+    batch_path = tmp_path / "eric.csv"
+    NEW_BATCH.to_csv(batch_path, index=False)
+    index_path = tmp_path / "deduplicated.csv.index.pkl"
+
+    # Index of the original corpus, then the corpus grows without it (a run
+    # interrupted between the append and the index save).
+    stale = RecordDeduplicator().build_corpus_index(CORPUS)
+    _run_incremental(tmp_path, corpus_path, batch_path)
+    stale.save(index_path)
+
+    _run_incremental(tmp_path, corpus_path, batch_path)
+    corpus = pd.read_csv(corpus_path)
+    assert corpus["record_id"].tolist() == CORPUS["record_id"].tolist() + ["REC_00004", "REC_00005"]
+    assert pd.read_csv(tmp_path / "new.csv").empty
+    assert CorpusTitleIndex.load(index_path).matches(corpus_path)
+    assert not (tmp_path / "deduplicated.csv.tmp").exists()
+
+
+def test_main_rejects_corpus_with_cluster_mode(tmp_path, capsys):
+    corpus_path = tmp_path / "deduplicated.csv"
+    CORPUS.to_csv(corpus_path, index=False)
+    corpus_bytes = corpus_path.read_bytes()
+    batch_path = tmp_path / "eric.csv"
+    NEW_BATCH.to_csv(batch_path, index=False)
+
+    with pytest.raises(SystemExit) as exc:
+        _run_incremental(tmp_path, corpus_path, batch_path, "--mode", "cluster")
+    assert exc.value.code == 2
+    assert "--mode greedy only" in capsys.readouterr().err
+    assert corpus_path.read_bytes() == corpus_bytes
+    assert not (tmp_path / "deduplicated.csv.index.pkl").exists()
@@ -211,3 +211,32 @@ def test_merge_empty_csv(tmp_path):
         assert val is None or str(val).strip() == "", (
             f"Row {row_num}: cell should be empty after empty-CSV merge"
         )
+
+
+def test_merge_fills_only_empty_cells_last_csv_row_wins(tmp_path):
+    """The skip-non-empty rule applies per cell; repeated CSV ids use the last row."""
+    xlsx_path = _make_xlsx(tmp_path, n=3, prefill_ai=False, prefill_human=False)
+    wb = openpyxl.load_workbook(xlsx_path)
+    ws = wb["SCREENING"]
+    header = {cell.value: idx + 1 for idx, cell in enumerate(ws[1])}
+    ws.cell(row=2, column=header["screen_consensus"]).value = "exclude"
+    ws.cell(row=3, column=header["rationale_codex"]).value = "   "
+    wb.save(xlsx_path)
+
+    csv_path = _make_ai_csv(tmp_path, record_ids=[1, 2, 2])
+    df = pd.read_csv(csv_path)
+    df.loc[2, "rationale_codex"] = "Second row for 2"
+    df.loc[2, "screen_confidence_gemini"] = None
+    df.to_csv(csv_path, index=False)
+
+    _run_merge(csv_path, xlsx_path)
+
+    ws = openpyxl.load_workbook(xlsx_path)["SCREENING"]
+    assert ws.cell(row=2, column=header["screen_consensus"]).value == "exclude"
+    assert ws.cell(row=2, column=header["screen_decision_codex"]).value == "include"
+    assert ws.cell(row=2, column=header["screen_confidence_codex"]).value == 0.90
+    # Whitespace-only counts as empty; the last CSV row for record 2 wins.
+    assert ws.cell(row=3, column=header["rationale_codex"]).value == "Second row for 2"
+    assert ws.cell(row=3, column=header["screen_consensus"]).value == "include"
+    assert ws.cell(row=3, column=header["screen_confidence_gemini"]).value is None
+    assert ws.cell(row=4, column=header["screen_decision_codex"]).value is None
@@ -0,0 +1,920 @@
+"""Tests for scripts/screening/screening_engine"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "screening"))
+
+from screening_engine import (
+    AIMDLimiter,
+    AdaptiveControl,
+    Completion,
+    BatchScreener,
+    CascadePolicy,
+    CascadeScreener,
+    CLIProvider,
+    FAMILY_TERMS,
+    FallbackProvider,
+    MatchSpanCache,
+    NOT_RUN,
+    RESULT_COLUMNS,
+    RecordScreener,
+    Recovery,
+    ResponseCache,
+    RetryItem,
+    RetryPolicy,
+    RetryQueue,
+    ScreeningRun,
+    Telemetry,
+    TierCalibrator,
+    TokenBucket,
+    WorkerProvider,
+    apply_updates,
+    build_batch_prompt,
+    build_prompt,
+    cache_key,
+    classify_tier,
+    classify_tiers,
+    failed_slots,
+    failure_payload,
+    journal_path_for,
+    lenient_consensus,
+    load_candidates,
+    merge_shards,
+    parse_batch_response,
+    parse_rate_limits,
+    provider_from_config,
+    run_pool,
+    select_shard,
+    shard_of,
+    simulate_cascade,
+    parse_response,
+    tier1_auto_exclude,
+    tier1_results,
+)
+
+
+def fake_cli(stdout: str = "", stderr: str = "", exit_code: int = 0, sleep: float = 0.0) -> list[str]:
+    """Command template for a stand-in provider CLI."""
+    code = (
+        "import sys, time; "
+        f"time.sleep({sleep}); "
+        f"sys.stdout.write({stdout!r}); sys.stderr.write({stderr!r}); "
+        f"sys.exit({exit_code})"
+    )
+    return [sys.executable, "-c", code, "{prompt}"]
+
+
+INCLUDE_JSON = '{"decision": "include", "confidence": 0.9, "exclude_code": "NA", "rationale": "ok"}'
+EXCLUDE_JSON = '{"decision": "excluded", "confidence": "0.8", "exclude_code": "E3", "rationale": "no"}'
+
+
+def record(record_id=1, title="ChatGPT acceptance among students"):
+    return pd.Series({
+        "record_id": record_id,
+        "title": title,
+        "abstract": "A TAM survey of university students.",
+        "keywords": "AI; TAM",
+        "year": 2024,
+        "source_database": "Scopus",
+    })
+
+
+# ---------------------------------------------------------------------------
+# Prompts and parsing
+# ---------------------------------------------------------------------------
+
+def test_build_prompt_templates():
+    row = record()
+    assert "Scopus" in build_prompt(row)
+    assert "Scopus" in build_prompt(row, "retry")
+    compact = build_prompt(row, "compact")
+    assert "ChatGPT acceptance among students" in compact
+    assert "Keywords" not in compact
+    with pytest.raises(ValueError):
+        build_prompt(row, "missing")
+
+
+def test_parse_response_strict_and_lenient():
+    assert parse_response(EXCLUDE_JSON, "codex")["decision"] == "exclude"
+    strict = parse_response("I would include this paper.", "codex")
+    assert strict["decision"] == "uncertain"
+    assert "JSON parse error from codex" in strict["rationale"]
+    lenient = parse_response("I would include this paper.", "codex", lenient=True)
+    assert lenient["decision"] == "include"
+    assert lenient["confidence"] == 0.7
+
+
+def test_lenient_consensus_defers_to_decided_provider():
+    assert lenient_consensus("uncertain", "exclude") == "exclude"
+    assert lenient_consensus("include", "exclude") == "conflict"
+    assert lenient_consensus("uncertain", "uncertain") == "uncertain"
+
+
+# ---------------------------------------------------------------------------
+# Providers
+# ---------------------------------------------------------------------------
+
+def test_cli_provider_parses_output():
+    payload = asyncio.run(CLIProvider("codex", fake_cli(EXCLUDE_JSON)).invoke("prompt", 10))
+    assert payload["decision"] == "exclude"
+    assert payload["confidence"] == 0.8
+    assert payload["exclude_code"] == "E3"
+
+
+def test_cli_provider_failures_are_uncertain():
+    failed = asyncio.run(CLIProvider("gemini", fake_cli(stderr="boom", exit_code=2)).invoke("p", 10))
+    assert failed["decision"] == "uncertain"
+    assert failed["rationale"] == "gemini failed: boom"
+
+    timed_out = asyncio.run(CLIProvider("gemini", fake_cli(INCLUDE_JSON, sleep=5)).invoke("p", 1))
+    assert timed_out["rationale"] == "gemini timed out after 1s"
+
+    empty = asyncio.run(CLIProvider("gemini", fake_cli()).invoke("p", 10))
+    assert empty["rationale"].startswith("gemini empty response")
+
+
+def test_fallback_provider_advances_on_quota():
+    chain = FallbackProvider("codex", [
+        CLIProvider("codex", fake_cli(stderr="You hit your usage limit", exit_code=1), model="mini"),
+        CLIProvider("codex", fake_cli(INCLUDE_JSON), model="spark"),
+    ])
+    payload = asyncio.run(chain.invoke("p", 10))
+    assert payload["decision"] == "include"
+    assert payload["_model"] == "spark"
+    assert chain.position == 1
+    assert chain.model == "spark"
+
+
+def test_quota_marker_in_a_valid_answer_is_not_a_quota_error():
+    answer = '{"decision": "include", "confidence": 0.9, "rationale": "Teachers cite the usage limit of ChatGPT"}'
+    chain = FallbackProvider("codex", [
+        CLIProvider("codex", fake_cli(answer), model="mini"),
+        CLIProvider("codex", fake_cli(INCLUDE_JSON), model="spark"),
+    ])
+    payload = asyncio.run(chain.invoke("p", 10))
+    assert payload["decision"] == "include"
+    assert "usage limit" in payload["rationale"]
+    assert not payload.get("_failed")
+    assert chain.position == 0
+
+    # Without a JSON answer the marker on stdout still means quota.
+    plain = asyncio.run(CLIProvider("codex", fake_cli("You hit your usage limit.")).invoke("p", 10))
+    assert plain["_error"] == "quota"
+
+
+def test_fallback_provider_all_exhausted():
+    chain = FallbackProvider("codex", [
+        CLIProvider("codex", fake_cli(stderr="usage limit", exit_code=1), model="mini"),
+    ])
+    payload = asyncio.run(chain.invoke("p", 10))
+    assert payload["rationale"] == "codex all models exhausted"
+
+
+def test_cli_provider_sends_prompt_on_stdin_without_placeholder():
+    echo_len = "import sys, json; print(json.dumps({'decision': 'include', 'rationale': str(len(sys.stdin.read()))}))"
+    provider = CLIProvider("codex", [sys.executable, "-c", echo_len])
+    assert provider.stdin
+    long_prompt = "x" * 300_000  # over the 128 KiB per-argument limit
+    payload = asyncio.run(provider.invoke(long_prompt, 10))
+    assert payload["rationale"] == "300000"
+
+
+SCREENING_DIR = Path(__file__).parent.parent / "scripts" / "screening"
+
+
+def fake_worker(body: str) -> list[str]:
+    """Worker command serving ``provider_worker.serve`` with a scripted backend."""
+    code = (
+        "import os, sys, time, json; "
+        f"sys.path.insert(0, {str(SCREENING_DIR)!r}); "
+        "from provider_worker import serve\n"
+        f"def complete(prompt, model):\n{body}\n"
+        "serve(complete)"
+    )
+    return [sys.executable, "-c", code]
+
+
+def test_worker_provider_reuses_processes():
+    body = (
+        "    if prompt == 'quota': raise RuntimeError('429 RESOURCE_EXHAUSTED')\n"
+        "    if prompt == 'crash': os._exit(3)\n"
+        "    return json.dumps({'decision': 'include', 'rationale': str(os.getpid())})"
+    )
+    provider = WorkerProvider("gemini", fake_worker(body), size=2, model="flash")
+
+    async def run_all():
+        try:
+            first = await asyncio.gather(*(provider.invoke("p", 10) for _ in range(6)))
+            quota = await provider.invoke("quota", 10)
+            crashed = await provider.invoke("crash", 10)
+            after = await asyncio.gather(*(provider.invoke("p", 10) for _ in range(2)))
+            return first, quota, crashed, after
+        finally:
+            await provider.aclose()
+
+    first, quota, crashed, after = asyncio.run(run_all())
+    assert all(p["decision"] == "include" and p["_model"] == "flash" for p in first)
+    assert len({p["rationale"] for p in first}) == 2  # six calls served by two processes
+    assert quota["_error"] == "quota"
+    assert quota["rationale"].startswith("gemini(flash) quota exhausted: 429")
+    assert crashed["_error"] == "exit"
+    assert crashed["rationale"] == "gemini(flash) failed: worker exited"
+    assert all(p["decision"] == "include" for p in after)
+    assert provider.restarts == 1
+
+
+def test_worker_provider_replaces_timed_out_worker():
+    body = (
+        "    if prompt == 'slow': time.sleep(5)\n"
+        "    return json.dumps({'decision': 'exclude', 'rationale': 'ok'})"
+    )
+    provider = WorkerProvider("codex", fake_worker(body), size=1)
+
+    async def run_all():
+        try:
+            return await provider.invoke("slow", 1), await provider.invoke("p", 10)
+        finally:
+            await provider.aclose()
+
+    timed_out, recovered = asyncio.run(run_all())
+    assert timed_out["rationale"] == "codex timed out after 1s"
+    assert timed_out["_error"] == "timeout"
+    assert recovered["decision"] == "exclude"
+    assert provider.restarts == 1
+
+
+# ---------------------------------------------------------------------------
+# Schema, screener and scheduler
+# ---------------------------------------------------------------------------
+
+def test_record_screener_dual_and_single():
+    codex = CLIProvider("codex", fake_cli(INCLUDE_JSON))
+    gemini = CLIProvider("gemini", fake_cli(EXCLUDE_JSON))
+    dual = asyncio.run(RecordScreener([codex, gemini], timeout_s=10, tier="T3_dual_ai")(record()))
+    assert list(dual) == RESULT_COLUMNS
+    assert dual["screen_consensus"] == "conflict"
+    assert dual["screening_tier"] == "T3_dual_ai"
+
+    single = RecordScreener(
+        [gemini], timeout_s=10,
+        placeholders={"codex": {**NOT_RUN, "rationale": "T2: single-AI tier, Gemini only"}},
+    )
+    row = asyncio.run(single(record()))
+    assert row["screen_consensus"] == "exclude"
+    assert row["screen_decision_codex"] == "N/A"
+    assert row["oauth_auth_method_codex"] == "N/A"
+    assert row["oauth_auth_method_gemini"] == "oauth"
+
+
+def test_result_rows_carry_structured_provider_status():
+    quota = CLIProvider("codex", fake_cli("usage limit reached", exit_code=1), model="mini")
+    chain = FallbackProvider("codex", [quota, CLIProvider("codex", fake_cli(INCLUDE_JSON), model="spark")])
+    gemini = CLIProvider("gemini", fake_cli(sleep=2), model="flash")
+    row = asyncio.run(RecordScreener([chain, gemini], timeout_s=1)(record()))
+    assert (row["status_codex"], row["error_class_codex"], row["attempt_codex"]) == ("ok", "", 2)
+    assert row["provider_model_codex"] == "spark"
+    assert (row["status_gemini"], row["error_class_gemini"], row["attempt_gemini"]) == ("failed", "timeout", 1)
+    assert row["provider_model_gemini"] == "flash"
+    assert row["latency_ms_gemini"] >= 1000
+
+    single = RecordScreener(
+        [CLIProvider("gemini", fake_cli(INCLUDE_JSON))], timeout_s=10,
+        placeholders={"codex": {**NOT_RUN, "rationale": "T2: single-AI tier, Gemini only"}},
+    )
+    row = asyncio.run(single(record()))
+    assert (row["status_codex"], row["attempt_codex"], row["provider_model_codex"]) == ("not_run", 0, "")
+    assert row["status_gemini"] == "ok"
+
+
+def test_tier1_auto_exclude_uses_result_schema():
+    row = tier1_auto_exclude(record(), "E2+E3:ai_no_edu_no_adopt")
+    assert list(row) == RESULT_COLUMNS
+    assert row["exclude_code_codex"] == "E2"
+    assert row["screening_tier"] == "T1_keyword(E2+E3)"
+
+
+TIER_TEXTS = [
+    "ChatGPT acceptance among university students",
+    "Machine learning for crop yields",  # "learning" also counts as education
+    "Deep learning model trust calibration",
+    "AI in hospitals",
+    "Soil chemistry of wetlands",
+    "",
+]
+
+
+def test_classify_tiers_matches_per_record_classifier():
+    text = pd.Series(TIER_TEXTS)
+    tiers = classify_tiers(text, terms=True)
+    expected = [classify_tier(t) for t in TIER_TEXTS]
+    assert list(zip(tiers["tier"], tiers["exclude_reason"])) == expected
+    assert tiers.loc[0, ["ai_hits", "edu_hits", "adopt_hits"]].tolist() == [1, 1, 1]
+    assert tiers.loc[0, "edu_terms"] == "university"  # whole words only: not "students"
+    assert tiers.loc[1, "ai_terms"] == "machine learning"
+    assert tiers.loc[4, "ai_terms"] == ""
+
+
+def test_classify_tiers_matches_per_record_classifier_on_non_ascii_text():
+    texts = [
+        "日本AI learning trust",  # re sees no word boundary between 本 and AI
+        "AIé education adoption",
+        "Künstliche Intelligenz: AI für Schüler, acceptance",
+        "ChatGPT acceptance among université students",
+        "robotique éducative and trust",
+        "Ésta AI tutor mejora la adopción",
+        "学生 ChatGPT 接受度 adoption",
+    ]
+    tiers = classify_tiers(pd.Series(texts))
+    assert list(zip(tiers["tier"], tiers["exclude_reason"])) == [classify_tier(t) for t in texts]
+    assert tiers.loc[0, "tier"] == tiers.loc[1, "tier"] == "T1"
+
+
+def test_tier1_results_match_row_builder():
+    records = pd.DataFrame([record(1), record(2, "Soil chemistry")])
+    records["_exclude_reason"] = ["E2:no_ai_terms", "E2+E3:ai_no_edu_no_adopt"]
+    frame = tier1_results(records)
+    rows = pd.DataFrame([tier1_auto_exclude(r, r["_exclude_reason"]) for _, r in records.iterrows()])
+    assert list(frame.columns) == RESULT_COLUMNS
+    pd.testing.assert_frame_equal(frame.reset_index(drop=True), rows, check_dtype=False)
+
+
+def test_tier_calibrator_scores_candidates_from_cached_spans(tmp_path):
+    records = pd.DataFrame([record(i, t) for i, t in enumerate(TIER_TEXTS, 1)]).assign(abstract="", keywords="")
+    labels = pd.Series({"1": "I", "2": "X", "4": "I", "5": "X"})
+    spec = tmp_path / "candidates.yaml"
+    spec.write_text(
+        "candidates:\n"
+        "  clinical:\n    add: {edu: ['hospital\\w*']}\n"
+        "  no_chatgpt:\n    drop: {ai: [ChatGPT]}\n"
+    )
+    candidates = load_candidates(spec)
+    assert candidates["clinical"]["edu"][-1] == r"hospital\w*"
+    assert "ChatGPT" not in candidates["no_chatgpt"]["ai"]
+    assert candidates["no_chatgpt"]["edu"] == FAMILY_TERMS["edu"]
+
+    cache = MatchSpanCache(tmp_path / "spans.sqlite")
+    summary = TierCalibrator(records, labels, cache).compare(candidates)
+    assert summary.loc["current", ["T1_records", "T2_records", "T3_records"]].tolist() == [3, 1, 2]
+    assert summary.loc["current", "calls_saved"] == 3 * 2 + 1
+    assert summary.loc["current", "false_negatives"] == 1  # "AI in hospitals"
+    assert summary.loc["current", "recall"] == 0.5
+    assert summary.loc["current", "t1_precision"] == 0.5
+    assert summary.loc["clinical", "recall"] == 1.0
+    assert summary.loc["no_chatgpt", "false_negatives"] == 2
+    scans = cache.scans
+    cache.close()
+
+    cache = MatchSpanCache(tmp_path / "spans.sqlite")
+    calibrator = TierCalibrator(records, labels, cache)
+    assert calibrator.score(candidates["no_chatgpt"], "no_chatgpt")["false_negative_ids"] == ["1", "4"]
+    assert scans > 0 and cache.scans == 0  # every term came from the cache
+    explained = calibrator.explain(["1"])
+    assert explained["term"].tolist() == ["ChatGPT", "acceptance", "university"]
+    assert explained["context"].iloc[0].startswith("ChatGPT acceptance")
+    cache.close()
+
+
+def test_apply_updates_by_record_id():
+    df = pd.DataFrame({
+        "record_id": [1, 2, 3],
+        "screen_decision_gemini": ["uncertain", "include", "uncertain"],
+        "screen_confidence_gemini": [0.0, 0.9, 0.0],
+    })
+    apply_updates(df, [
+        {"record_id": 3, "screen_decision_gemini": "exclude", "screen_confidence_gemini": 0.7, "model": "m"},
+        {"record_id": 99, "screen_decision_gemini": "include"},
+    ])
+    assert list(df["screen_decision_gemini"]) == ["uncertain", "include", "exclude"]
+    assert df.loc[2, "screen_confidence_gemini"] == 0.7
+    assert df.loc[2, "model"] == "m"
+    assert pd.isna(df.loc[0, "model"])
+
+
+def test_screening_run_journals_and_resumes_after_crash(tmp_path):
+    output = tmp_path / "out.csv"
+    records = pd.DataFrame([record(i, f"Title {i}") for i in range(1, 6)])
+
+    async def screen(row):
+        return {"record_id": row["record_id"], "screen_consensus": "exclude"}
+
+    run = ScreeningRun(output, save_every=2)
+    asyncio.run(run.run(records.iloc[:3], screen, workers=2))
+    run.journal.close()  # crash before finish(): nothing compacted yet
+    assert not output.exists()
+    with open(journal_path_for(output), "a", encoding="utf-8") as fh:
+        fh.write('{"record_id": 4, "screen_cons')  # torn write
+
+    resumed = ScreeningRun(output, save_every=2, resume=True)
+    todo = resumed.pending(records)
+    assert list(todo["record_id"]) == [4, 5]
+    asyncio.run(resumed.run(todo, screen, workers=2))
+    out = resumed.finish()
+    assert sorted(out["record_id"]) == [1, 2, 3, 4, 5]
+    assert sorted(pd.read_csv(output)["record_id"]) == [1, 2, 3, 4, 5]
+    assert not journal_path_for(output).exists()
+
+
+def test_screening_run_resume_merges_existing_output(tmp_path):
+    output = tmp_path / "out.csv"
+    pd.DataFrame({"record_id": [1, 2], "screen_consensus": ["include", "exclude"]}).to_csv(output, index=False)
+    run = ScreeningRun(output, resume=True)
+    run.add({"record_id": 2, "screen_consensus": "include"})
+    run.add({"record_id": 3, "screen_consensus": "exclude"})
+    out = run.finish()
+    assert list(out["record_id"]) == [1, 2, 3]
+    assert list(out["screen_consensus"]) == ["include", "include", "exclude"]
+
+    # Without --resume a fresh run replaces the output.
+    fresh = ScreeningRun(output)
+    fresh.add({"record_id": 9, "screen_consensus": "exclude"})
+    assert list(fresh.finish()["record_id"]) == [9]
+
+
+def test_shards_partition_records_and_merge_checks_coverage(tmp_path):
+    records = pd.DataFrame({"record_id": range(1, 41), "title": [f"t{i}" for i in range(1, 41)]})
+    # Stable across processes and versions: ints and their string form agree.
+    assert list(shard_of(pd.Series([1, 2, 3]), 4)) == list(shard_of(pd.Series(["1", "2", "3"]), 4))
+    paths = []
+    for i in (1, 2, 3):
+        shard = select_shard(records, i, 3)
+        path = tmp_path / f"shard{i}.csv"
+        shard[["record_id"]].assign(screen_consensus="exclude").iloc[::-1].to_csv(path, index=False)
+        paths.append(path)
+    merged, report = merge_shards(paths, records=records, count=3)
+    assert report.ok, report.summary()
+    assert list(merged["record_id"]) == list(range(1, 41))
+
+    merged, report = merge_shards(paths[:2] + [paths[0]], records=records, count=3)
+    assert not report.ok
+    assert len(report.missing) == len(select_shard(records, 3, 3)) + 1  # records + "shard 3/3"
+    assert "shard 3/3" in report.missing
+    assert report.duplicates
+
+    # An output cut with a different N is flagged as misplaced.
+    mixed = tmp_path / "mixed.csv"
+    select_shard(records, 1, 2)[["record_id"]].to_csv(mixed, index=False)
+    _, report = merge_shards([mixed], count=3)
+    assert str(mixed) in report.misplaced
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+class CountingProvider(CLIProvider):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    async def complete(self, prompt, timeout_s):
+        self.calls += 1
+        return await super().complete(prompt, timeout_s)
+
+
+def test_cache_key_separates_model_and_prompt_version():
+    base = cache_key("codex", "mini", "full-v1", "prompt")
+    assert base == cache_key("codex", "mini", "full-v1", "prompt")
+    assert base != cache_key("codex", "spark", "full-v1", "prompt")
+    assert base != cache_key("codex", "mini", "full-v2", "prompt")
+    assert base != cache_key("gemini", "mini", "full-v1", "prompt")
+    assert base != cache_key("codex", "mini", "full-v1", "prompt", "codex exec -m gpt-5 {prompt}")
+
+
+def test_cached_screener_skips_repeat_calls(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    provider = CountingProvider("gemini", fake_cli(INCLUDE_JSON))
+    screener = RecordScreener([provider], timeout_s=10, cache=cache)
+    first = asyncio.run(screener(record()))
+    second = asyncio.run(screener(record()))
+    assert provider.calls == 1
+    assert (first["status_gemini"], second["status_gemini"]) == ("ok", "cached")
+    assert second["latency_ms_gemini"] == 0
+    same = [c for c in RESULT_COLUMNS if c not in ("status_gemini", "latency_ms_gemini")]
+    assert {c: first[c] for c in same} == {c: second[c] for c in same}
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+    # Persisted across runs; a different template is a different key.
+    reopened = ResponseCache(tmp_path / "cache.sqlite")
+    asyncio.run(RecordScreener([provider], timeout_s=10, cache=reopened)(record()))
+    asyncio.run(RecordScreener([provider], timeout_s=10, template="compact", cache=reopened)(record()))
+    assert provider.calls == 2
+    assert len(reopened) == 2
+
+
+def test_cache_misses_when_only_screen_cmd_changes(tmp_path):
+    """Switching the model inside config.yaml's screen_cmd must not reuse old answers."""
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+
+    def configured(model_flag):
+        cmd = fake_cli(INCLUDE_JSON)[:-1] + ["-m", model_flag, "{prompt}"]
+        return provider_from_config({"screening_cli": {"gemini": {"screen_cmd": cmd}}}, "gemini")
+
+    flash, pro = configured("gemini-2.5-flash"), configured("gemini-2.5-pro")
+    assert flash.model == pro.model == ""
+    assert flash.command != pro.command
+    first = asyncio.run(RecordScreener([flash], timeout_s=10, cache=cache)(record()))
+    second = asyncio.run(RecordScreener([pro], timeout_s=10, cache=cache)(record()))
+    again = asyncio.run(RecordScreener([flash], timeout_s=10, cache=cache)(record()))
+    assert (first["status_gemini"], second["status_gemini"], again["status_gemini"]) == ("ok", "ok", "cached")
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_cache_does_not_store_failures(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    provider = CountingProvider("gemini", fake_cli(stderr="boom", exit_code=1))
+    wrapped = cache.wrap(provider)
+    asyncio.run(wrapped.invoke("p", 10))
+    asyncio.run(wrapped.invoke("p", 10))
+    assert provider.calls == 2
+    assert len(cache) == 0
+
+
+# ---------------------------------------------------------------------------
+# Batched prompts
+# ---------------------------------------------------------------------------
+
+BATCH_CLI = (
+    "import json, re, sys\n"
+    "prompt = sys.argv[-1]\n"
+    "keys = re.findall(r'### record_key: (\\S+)', prompt)\n"
+    "if not keys:\n"
+    "    print(json.dumps({'decision': 'include', 'confidence': 0.6, 'rationale': 'single'}))\n"
+    "else:\n"
+    "    out = [{'record_key': k, 'decision': 'exclude', 'confidence': 0.9, 'rationale': 'batch'}\n"
+    "           for k in keys if k not in ('3', '4')]\n"
+    "    out.append({'record_key': '4', 'decision': 'maybe'})\n"
+    "    print('Here you go:\\n```json\\n' + json.dumps(out) + '\\n```')\n"
+)
+
+
+def test_build_batch_prompt_keys_every_record():
+    prompt = build_batch_prompt([record(1), record(2, "Second title")], ["1", "2"])
+    assert prompt.count("### record_key:") == 2
+    assert "Second title" in prompt
+    assert '"record_key"' in prompt
+    assert "Apply these criteria" in prompt
+
+
+def test_parse_batch_response_validates_each_element():
+    raw = (
+        '[{"record_key": "1", "decision": "included", "confidence": 0.8},'
+        ' {"record_key": "2", "decision": "perhaps"},'
+        ' {"record_key": "9", "decision": "exclude"},'
+        ' "junk"]'
+    )
+    parsed = parse_batch_response(raw, ["1", "2", "3"])
+    assert list(parsed) == ["1"]
+    assert parsed["1"]["decision"] == "include"
+    assert "record_key" not in parsed["1"]
+    assert parse_batch_response("not json", ["1"]) == {}
+
+
+def test_batch_screener_requeues_invalid_records(tmp_path):
+    provider = CountingProvider("gemini", [sys.executable, "-c", BATCH_CLI, "{prompt}"])
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    screener = BatchScreener([provider], timeout_s=10, tier="T2_single_ai", cache=cache)
+    rows = pd.DataFrame([record(i, f"Title {i}") for i in range(1, 6)])
+
+    out = asyncio.run(screener.screen_batch(rows))
+    assert [r["record_id"] for r in out] == [1, 2, 3, 4, 5]
+    assert [r["screen_decision_gemini"] for r in out] == ["exclude", "exclude", "include", "include", "exclude"]
+    assert all(list(r) == RESULT_COLUMNS for r in out)
+    assert screener.batch_calls == 1
+    assert screener.requeued == 2
+    assert provider.calls == 3  # one batch call, two individual re-screens
+
+    # Every record is now cached: a second pass makes no calls at all.
+    again = asyncio.run(BatchScreener([provider], timeout_s=10, cache=cache).screen_batch(rows))
+    assert [r["screen_decision_gemini"] for r in again] == [r["screen_decision_gemini"] for r in out]
+    assert provider.calls == 3
+
+
+def test_batch_failure_marks_whole_batch():
+    provider = CLIProvider("gemini", fake_cli(stderr="boom", exit_code=1))
+    rows = pd.DataFrame([record(i, f"Title {i}") for i in range(1, 4)])
+    out = asyncio.run(BatchScreener([provider], timeout_s=10).screen_batch(rows))
+    assert {r["rationale_gemini"] for r in out} == {"gemini failed: boom"}
+
+
+def test_run_pool_bounded_consumers():
+    rows = pd.DataFrame({"record_id": range(200)})
+    state = {"active": 0, "peak": 0, "tasks": 0}
+
+    async def screen(row):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        state["tasks"] = max(state["tasks"], len(asyncio.all_tasks()))
+        await asyncio.sleep(0)
+        state["active"] -= 1
+        return {"record_id": row["record_id"]}
+
+    results = asyncio.run(run_pool(rows, screen, workers=3))
+    assert state["peak"] == 3
+    assert state["tasks"] <= 5  # main + producer + three consumers, independent of len(rows)
+    assert sorted(r["record_id"] for r in results) == list(range(200))
+
+
+def test_run_pool_propagates_worker_errors():
+    rows = pd.DataFrame({"record_id": range(10)})
+
+    async def screen(row):
+        if row["record_id"] == 4:
+            raise RuntimeError("boom")
+        return {"record_id": row["record_id"]}
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(run_pool(rows, screen, workers=2))
+
+
+def test_screening_run_batches(tmp_path):
+    rows = pd.DataFrame([record(i, f"Title {i}") for i in range(1, 8)])
+    chunks = []
+
+    async def screen_chunk(chunk):
+        chunks.append(len(chunk))
+        return [{"record_id": rid, "screen_consensus": "exclude"} for rid in chunk["record_id"]]
+
+    run = ScreeningRun(tmp_path / "out.csv")
+    asyncio.run(run.run(rows, screen_chunk, workers=2, batch_size=3))
+    assert sorted(chunks) == [1, 3, 3]
+    assert sorted(run.finish()["record_id"]) == list(range(1, 8))
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting and adaptive concurrency
+# ---------------------------------------------------------------------------
+
+class ScriptedProvider(CLIProvider):
+    """In-process provider returning scripted outcomes after a short delay."""
+
+    def __init__(self, name, outcomes, delay=0.01):
+        super().__init__(name, [])
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def complete(self, prompt, timeout_s):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        error = self.outcomes.pop(0) if self.outcomes else None
+        if error:
+            return Completion("", "m", failure_payload(f"{self.name} {error}", error=error))
+        return Completion(INCLUDE_JSON, "m")
+
+
+def test_cascade_screener_escalates_only_when_needed():
+    gemini = CountingProvider("gemini", fake_cli(EXCLUDE_JSON))  # exclude at 0.8
+    codex = CountingProvider("codex", fake_cli(INCLUDE_JSON))
+    screener = CascadeScreener([gemini, codex], 10, policy=CascadePolicy(min_confidence=0.7), tier="T3_cascade")
+    row = asyncio.run(screener(record()))
+    assert codex.calls == 0
+    assert row["screen_consensus"] == "exclude"
+    assert row["screen_decision_codex"] == "N/A"
+    assert row["rationale_codex"] == "Cascade: not called, gemini exclude at confidence 0.80"
+    assert row["oauth_auth_method_codex"] == "N/A"
+
+    screener.policy = CascadePolicy(min_confidence=0.9)
+    row = asyncio.run(screener(record()))
+    assert codex.calls == 1
+    assert row["screen_consensus"] == "conflict"
+    assert screener.summary() == "cascade escalated 1/2 records to codex (1 calls saved)"
+
+
+def test_simulate_cascade_on_dual_output():
+    results = pd.DataFrame({
+        "record_id": ["a", "b", "c", "d", "e"],
+        "screen_decision_gemini": ["exclude", "exclude", "include", "uncertain", "N/A"],
+        "screen_confidence_gemini": [0.95, 0.9, 0.9, 0.0, 0.0],
+        "screen_decision_codex": ["exclude", "include", "include", "exclude", "exclude"],
+    })
+    report = simulate_cascade(results, "gemini", "codex", CascadePolicy(min_confidence=0.85),
+                              labels=pd.Series({"b": "I", "c": "I"}))
+    assert report["records"] == 4  # "e" was not dual-screened
+    assert report["escalated"] == 2
+    assert report["calls_saved"] == 2
+    assert report["changed"] == 1 and report["lost_includes"] == 1  # "b": codex include never asked
+    assert report["dual_recall"] == 1.0
+    assert report["cascade_recall"] == 0.5
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("codex=30, gemini=60") == {"codex": 30.0, "gemini": 60.0}
+    assert parse_rate_limits(None) == {}
+    with pytest.raises(ValueError):
+        parse_rate_limits("codex")
+
+
+def test_token_bucket_paces_calls():
+    async def take(n):
+        bucket = TokenBucket(rate_per_min=1200, burst=1)  # 20 calls/s
+        for _ in range(n):
+            await bucket.acquire()
+
+    start = time.monotonic()
+    asyncio.run(take(5))
+    assert time.monotonic() - start >= 0.18
+
+
+def test_aimd_limiter_increase_and_backoff():
+    limiter = AIMDLimiter(initial=4, maximum=8, cooldown_s=60)
+
+    async def cycle(congested):
+        await limiter.acquire()
+        await limiter.release(congested)
+
+    for _ in range(8):
+        asyncio.run(cycle(False))
+    assert 5.0 < limiter.limit < 6.0  # roughly +1 per window of `limit` successes
+    grown = limiter.limit
+    asyncio.run(cycle(True))
+    assert limiter.limit == pytest.approx(grown / 2)
+    asyncio.run(cycle(True))  # the cooldown blocks a second cut in the same wave
+    assert limiter.limit == pytest.approx(grown / 2)
+
+
+def test_controlled_provider_backs_off_on_quota_and_caps_concurrency():
+    control = AdaptiveControl(max_concurrency=4, initial=4)
+    inner = ScriptedProvider("gemini", ["quota", None, None, None, None, None])
+    provider = control.wrap(inner)
+
+    async def run_all():
+        return await asyncio.gather(*(provider.invoke("p", 10) for _ in range(6)))
+
+    payloads = asyncio.run(run_all())
+    snap = control.snapshot()[0]
+    assert inner.peak == 4
+    assert snap["calls"] == 6
+    assert snap["errors"] == {"quota": 1}
+    assert snap["limit"] < 4  # halved to 2, then grown back additively
+    assert sum(p["decision"] == "include" for p in payloads) == 5
+
+
+# ---------------------------------------------------------------------------
+# Live metrics
+# ---------------------------------------------------------------------------
+
+def test_telemetry_tracks_providers_and_stages(tmp_path):
+    telemetry = Telemetry()
+    gemini = telemetry.wrap(ScriptedProvider("gemini", ["timeout", None, "quota", None], delay=0.02))
+    screener = RecordScreener([gemini], timeout_s=10)
+    records = pd.DataFrame([record(i) for i in range(1, 5)])
+    telemetry.stage("T3", 6)  # registered ahead, never run
+
+    async def screen_and_scrape():
+        server = await telemetry.serve(0)
+        port = server.sockets[0].getsockname()[1]
+        await run_pool(records, screener, workers=2, label="T2", telemetry=telemetry)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(screen_and_scrape())
+    snap = telemetry.snapshot()
+    provider = snap["providers"]["gemini"]
+    assert provider["calls"] == 4 and provider["in_flight"] == 0
+    assert provider["timeout_rate"] == 0.25 and provider["quota_rate"] == 0.25
+    assert 15 <= provider["latency_ms"]["p50"] <= provider["latency_ms"]["p99"]
+    assert snap["stages"]["T2"]["state"] == "done" and snap["stages"]["T2"]["done"] == 4
+    assert snap["stages"]["T3"]["state"] == "pending"
+    assert snap["eta_s"] is not None  # T3 still to go, at the T2 rate
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert 'screening_provider_errors_total{provider="gemini",kind="timeout"} 1' in response
+    assert 'screening_provider_latency_seconds{provider="gemini",quantile="0.99"}' in response
+    assert 'screening_stage_done_total{stage="T2"} 4' in response
+
+    telemetry.write_json(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text())["stages"]["T3"]["total"] == 6
+
+
+# ---------------------------------------------------------------------------
+# Failure recovery
+# ---------------------------------------------------------------------------
+
+def scripted_chain(*steps):
+    """Chain of ScriptedProviders given as (family, label, outcomes) tuples."""
+    chain = []
+    for family, label, outcomes in steps:
+        provider = ScriptedProvider(family, outcomes, delay=0)
+        provider.label = label
+        chain.append(provider)
+    return chain
+
+
+def test_failed_slots_classifies_legacy_rationales():
+    results = pd.DataFrame({
+        "record_id": [1, 2, 3, 4],
+        "screen_decision_codex": ["uncertain", "include", "N/A", "uncertain"],
+        "rationale_codex": ["codex all models exhausted", "ok", "T2: single-AI tier, Gemini only",
+                            "JSON parse error from codex: x"],
+        "screen_decision_gemini": ["uncertain", "uncertain", "uncertain", "exclude"],
+        "rationale_gemini": ["gemini timed out after 300s", "gemini failed: [Errno 2] No such file",
+                             "gemini failed: boom", "no"],
+    })
+    slots = failed_slots(results)
+    assert list(zip(slots["record_id"], slots["slot"], slots["error"])) == [
+        ("1", "codex", "quota"), ("4", "codex", "parse"),
+        ("1", "gemini", "timeout"), ("2", "gemini", "spawn"), ("3", "gemini", "exit"),
+    ]
+
+    # Structured status columns win over the rationale where they are set.
+    results["status_gemini"] = ["failed", "ok", None, "rule"]
+    results["error_class_gemini"] = ["empty", "", None, ""]
+    slots = failed_slots(results)
+    assert list(zip(slots["record_id"], slots["slot"], slots["error"]))[2:] == [
+        ("1", "gemini", "empty"), ("3", "gemini", "exit"),
+    ]
+
+
+def test_recovery_walks_fallback_chain_with_backoff(tmp_path):
+    queue = RetryQueue(tmp_path / "out.csv.retry.sqlite")
+    gemini_chain = scripted_chain(
+        ("gemini", "gemini(pro)", ["quota"]),
+        ("gemini", "gemini(flash)", ["timeout", "timeout"]),
+        ("codex", "codex(mini)", [None]),
+    )
+    updates = []
+    recovery = Recovery(
+        queue, {"gemini": gemini_chain}, timeout_s=10,
+        policy=RetryPolicy(max_attempts=2, base_delay_s=0.01, max_delay_s=0.05),
+        on_update=lambda row, slot: updates.append((row, slot)),
+    )
+    result = {"record_id": 7, "screen_decision_codex": "include", "screen_decision_gemini": "uncertain",
+              "rationale_gemini": "gemini(pro) quota exhausted", "screen_consensus": "uncertain"}
+    assert recovery.add(record(7), result, "gemini", "quota")
+    assert not recovery.add(record(7), result, "claude", "exit")  # no chain configured
+
+    asyncio.run(recovery.drain(drain_s=5))
+    [(row, slot)] = updates
+    assert slot == "gemini"
+    assert row["screen_decision_gemini"] == "include"
+    assert row["rationale_gemini"] == "Codex-sub(m): ok"
+    assert row["oauth_auth_method_gemini"] == "retry_m"
+    assert row["screen_consensus"] == "include"
+    assert (row["status_gemini"], row["provider_model_gemini"], row["attempt_gemini"]) == ("ok", "m", 5)  # original call + 4 retries
+    assert [len(p.outcomes) for p in gemini_chain] == [0, 0, 0]
+    assert queue.counts() == {"recovered": 1}
+    # Quota and timeouts cooled the first two steps down; the answer cleared its own.
+    cooling = dict(queue.conn.execute("SELECT label, failures FROM providers").fetchall())
+    assert cooling == {"gemini(pro)": 1, "gemini(flash)": 2}
+
+    # A slot whose chain is exhausted stays failed; re-queuing it starts over.
+    recovery.chains["codex"] = scripted_chain(("codex", "codex(x)", ["exit", "exit"]))
+    recovery.add(record(8), {**result, "record_id": 8}, "codex", "exit")
+    asyncio.run(recovery.drain(drain_s=5))
+    assert recovery.exhausted == 1
+    assert queue.counts() == {"recovered": 1, "failed": 1}
+    recovery.add(record(8), {**result, "record_id": 8}, "codex", "exit")
+    assert queue.counts() == {"recovered": 1, "pending": 1}
+
+
+def test_recovery_runs_alongside_screening_and_persists_queue(tmp_path):
+    output = tmp_path / "out.csv"
+    queue_path = tmp_path / "out.csv.retry.sqlite"
+    run = ScreeningRun(output)
+    recovery = Recovery(
+        RetryQueue(queue_path), {"gemini": scripted_chain(("gemini", "gemini(flash)", [None]))},
+        timeout_s=10, policy=RetryPolicy(base_delay_s=0), on_update=lambda row, _slot: run.update(row),
+    )
+    screener = RecordScreener(
+        [CLIProvider("codex", fake_cli(INCLUDE_JSON)), CLIProvider("gemini", fake_cli(stderr="boom", exit_code=1))],
+        timeout_s=10, on_row=recovery.observe,
+    )
+    records = pd.DataFrame([record(i, f"Title {i}") for i in range(1, 4)])
+
+    async def screen_and_recover():
+        async with recovery.running(drain_s=5):
+            await run.run(records, screener, workers=2)
+
+    asyncio.run(screen_and_recover())
+    out = run.finish()
+    assert len(out) == 3 and run.completed == 3
+    assert (out["screen_decision_gemini"] == "include").all()
+    assert (out["screen_consensus"] == "include").all()
+    assert (out["oauth_auth_method_gemini"] == "retry_m").all()
+
+    # Slots still backing off survive a restart of the queue.
+    queue = RetryQueue(queue_path)
+    queue.add(record(9), {"record_id": 9}, "gemini", "timeout", "gemini(flash)")
+    queue.reschedule(RetryItem("9", "gemini", 0, 1, "timeout", time.time() + 60), "gemini(flash)")
+    queue.close()
+    reopened = RetryQueue(queue_path)
+    assert reopened.counts() == {"recovered": 3, "pending": 1}
+    assert reopened.due(time.time(), 10) == []
+    assert reopened.next_wakeup() > time.time() + 30
@@ -0,0 +1,375 @@
+"""Tests for scripts/screening/standardize_and_dedup.py"""
+
+import os
+import sys
+import time
+import random
+import pytest
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "screening"))
+
+from standardize_and_dedup import (
+    STANDARD_COLUMNS,
+    build_blocking_keys,
+    cached_standardize,
+    compare_blocking,
+    deduplicate,
+    first_author_surname,
+    load_ieee,
+    load_psycinfo,
+    load_scopus,
+    load_wos,
+    normalize_doi,
+    normalize_doi_series,
+    page_range,
+    read_dedup_frame,
+    standardize_ieee,
+    standardize_psycinfo,
+    standardize_scopus,
+    standardize_wos,
+    stream_to_parquet,
+    write_blocking_report,
+    write_staged_records,
+)
+
+
+def _frame(rows):
+    """Standardized frame from (title, authors, year, doi, source) tuples."""
+    return pd.DataFrame(rows, columns=["title", "authors", "year", "doi", "source_database"])
+
+
+LEADING_ARTICLE = _frame([
+    ("The influence of generative AI chatbots on undergraduate writing self-efficacy",
+     "Smith, J.; Doe, A.", 2023, "", "WoS"),
+    ("Influence of generative AI chatbots on undergraduate writing self-efficacy",
+     "Smith J., Doe A.", 2024, "", "Scopus"),
+    ("Teacher acceptance of intelligent tutoring systems in rural schools",
+     "Kim, H.", 2022, "", "PsycINFO"),
+])
+
+
+# ---------------------------------------------------------------------------
+# Blocking keys
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("authors,expected", [
+    ("Smith, J.; Doe, A.", "smith"),
+    ("Smith J., Doe A.", "smith"),
+    ("J. Smith; A. Doe", "smith"),
+    ("van der Berg, Anna", "berg"),
+    ("Müller, K.", "muller"),
+    (None, ""),
+])
+def test_first_author_surname(authors, expected):
+    assert first_author_surname(authors) == expected
+
+
+def test_prefix_keys_only_for_prefix_strategy():
+    keys = build_blocking_keys(["some title", ""], ["Smith, J.", ""], [2020, ""], strategy="prefix")
+    assert keys == [["p:some title"], []]
+
+
+def test_author_year_keys_cover_adjacent_years():
+    keys = build_blocking_keys(["a b c", "a b d"], ["Lee, K.", "Lee K."], [2020, 2021])
+    assert set(keys[0]) & set(keys[1]) >= {"a:lee|2021"}
+
+
+def test_unknown_blocking_strategy_raises():
+    with pytest.raises(ValueError):
+        build_blocking_keys(["x"], [""], [""], strategy="sorted")
+
+
+# ---------------------------------------------------------------------------
+# Deduplication
+# ---------------------------------------------------------------------------
+
+def test_multikey_finds_leading_article_duplicate():
+    """Prefix blocking misses the pair; multi-key blocking merges it."""
+    prefix, _, prefix_dupes = deduplicate(LEADING_ARTICLE.copy(), blocking="prefix")
+    multi, _, multi_dupes = deduplicate(LEADING_ARTICLE.copy(), blocking="multikey")
+    assert prefix_dupes == 0 and len(prefix) == 3
+    assert multi_dupes == 1 and len(multi) == 2
+    assert multi.loc[0, "source_database"] == "WoS; Scopus"
+
+
+def test_doi_pass_merges_sources():
+    df = _frame([
+        ("Title one about AI", "A, B", 2020, "https://doi.org/10.1/X", "WoS"),
+        ("Title one about AI", "A, B", 2020, "10.1/x", "Scopus"),
+    ])
+    deduped, doi_dupes, title_dupes = deduplicate(df)
+    assert (len(deduped), doi_dupes, title_dupes) == (1, 1, 0)
+    assert deduped.loc[0, "source_database"] == "WoS; Scopus"
+
+
+def test_normalize_doi_series_matches_scalar():
+    dois = pd.Series(["https://doi.org/10.1/AB", " DOI: 10.2/x ", None, float("nan"), "", "  ", "10.3/y"])
+    assert normalize_doi_series(dois).tolist() == [normalize_doi(d) for d in dois]
+
+
+def test_doi_pass_carries_lineage_and_keeps_first():
+    df = _frame([
+        ("First copy", "A, B", 2020, "10.1/x", "WoS"),
+        ("Unrelated record", "C, D", 2021, "10.9/z", "WoS"),
+        ("Second copy", "A, B", 2020, "https://doi.org/10.1/X", "Scopus"),
+        ("Third copy", "A, B", 2020, "doi:10.1/x", "WoS"),
+    ])
+    deduped, doi_dupes, _ = deduplicate(df)
+    assert doi_dupes == 2
+    row = deduped[deduped["doi"] == "10.1/x"].iloc[0]
+    assert row["title"] == "First copy"
+    assert row["source_database"] == "WoS; Scopus"
+    assert row["lineage_ids"] == "WoS:1; Scopus:1; WoS:3"
+    assert deduped[deduped["doi"] == "10.9/z"].iloc[0]["lineage_ids"] == "WoS:2"
+
+
+def test_title_pass_carries_lineage():
+    deduped, _, _ = deduplicate(LEADING_ARTICLE.copy())
+    assert deduped.loc[0, "lineage_ids"] == "WoS:1; Scopus:1"
+
+
+def test_cluster_mode_resolves_chain_by_completeness():
+    df = _frame([
+        ("Chatbots and learning outcomes in secondary school mathematics", "Lee, K.", 2021, "", "WoS"),
+        ("Chatbots and learning outcomes in secondary school mathematics classes", "Lee K.", 2021, "", "Scopus"),
+        ("Chatbots and learning outcomes in secondary-school mathematics classes!", "Lee, K.", 2021,
+         "10.5/m", "IEEE"),
+    ])
+    clustered, _, cluster_dupes = deduplicate(df.copy(), mode="cluster")
+    assert cluster_dupes == 2 and len(clustered) == 1
+    assert set(clustered.loc[0, "source_database"].split("; ")) == {"WoS", "Scopus", "IEEE"}
+    assert clustered.loc[0, "doi"] == "10.5/m"
+    assert sorted(clustered.loc[0, "lineage_ids"].split("; ")) == ["IEEE:1", "Scopus:1", "WoS:1"]
+    assert clustered.loc[0, "cluster_size"] == 3
+
+
+@pytest.mark.parametrize("mode", ["greedy", "cluster"])
+def test_parallel_deduplicate_is_byte_identical(mode, monkeypatch):
+    import dedup_engine
+    monkeypatch.setattr(dedup_engine, "PAIR_CHUNK_SIZE", 10)
+    rng = random.Random(9)
+    words = ["ai", "chatbot", "learning", "adoption", "teacher", "student", "trust", "model"]
+    rows = []
+    for i in range(60):
+        title = " ".join(rng.choice(words) for _ in range(8))
+        rows.append((title, f"Author{i % 7}, X.", 2020, "", "WoS"))
+        rows.append((title + "s", f"Author{i % 7}, X.", 2021, "", "Scopus"))
+    serial, _, _ = deduplicate(_frame(rows), mode=mode)
+    parallel, _, _ = deduplicate(_frame(rows), mode=mode, workers=2)
+    assert parallel.to_csv(index=False) == serial.to_csv(index=False)
+
+
+def test_empty_titles_are_not_title_duplicates():
+    df = _frame([("", "A", 2020, "", "WoS"), ("", "B", 2021, "", "IEEE")])
+    deduped, _, title_dupes = deduplicate(df)
+    assert title_dupes == 0 and len(deduped) == 2
+
+
+def test_multikey_recall_not_below_prefix():
+    rng = random.Random(3)
+    words = ["ai", "chatbot", "learning", "adoption", "teacher", "student", "higher",
+             "education", "acceptance", "model", "intention", "survey", "trust", "tutoring"]
+    rows = []
+    for i in range(150):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(6, 10)))
+        rows.append((title, f"Author{i % 40}, X.", 2018 + i % 6, "", "WoS"))
+        if i % 5 == 0:
+            rows.append(("The " + title, f"Author{i % 40} X.", 2019 + i % 6, "", "Scopus"))
+    report = compare_blocking(_frame(rows), 0.9)
+    multi = report["strategies"]["multikey"]
+    prefix = report["strategies"]["prefix"]
+    assert report["true_matches"] > 0
+    assert multi["recall"] >= prefix["recall"]
+    assert report["multikey_only"] > 0
+    assert multi["candidate_pairs"] < len(rows) * (len(rows) - 1) // 2
+
+
+def test_write_blocking_report(tmp_path):
+    report = compare_blocking(LEADING_ARTICLE, 0.9)
+    path = tmp_path / "blocking.txt"
+    write_blocking_report(report, path)
+    text = path.read_text()
+    assert "PREFIX" in text and "MULTIKEY" in text
+    assert "Recall" in text
+
+
+# ---------------------------------------------------------------------------
+# Streaming standardization
+# ---------------------------------------------------------------------------
+
+def _write_exports(root, n=12):
+    """Small raw exports in each database's native column layout."""
+    wos_dir = root / "wos"
+    wos_dir.mkdir()
+    for part in range(2):
+        pd.DataFrame({
+            "Article Title": [f"WoS study {part}-{i}" for i in range(n)],
+            "Authors": "Kim, H",
+            "Publication Year": 2020 + part,
+            "DOI": [f"10.1/w{part}{i}" for i in range(n)],
+            "Start Page": 1,
+            "End Page": 9,
+        }).to_excel(wos_dir / f"savedrecs_{part}.xls", index=False, engine="openpyxl")
+    scopus = root / "scopus.csv"
+    pd.DataFrame({"Title": [f"Scopus study {i}" for i in range(n)], "Year": 2022,
+                  "DOI": "", "Page start": 5, "Page end": None}).to_csv(scopus, index=False)
+    ieee = root / "ieee.csv"
+    pd.DataFrame({"Document Title": [f"IEEE study {i}" for i in range(n)], "Publication Year": 2023,
+                  "Start Page": 3, "End Page": 4}).to_csv(ieee, index=False)
+    psycinfo = root / "psycinfo.csv"
+    pd.DataFrame({"Title": [f"Psyc study {i}" for i in range(n)],
+                  "PubDate": ["Spring 2021", "n.d."] * (n // 2),
+                  "StartPage": 7}).to_csv(psycinfo, index=False)
+    return {"WoS": wos_dir, "Scopus": scopus, "IEEE": ieee, "PsycINFO": psycinfo}
+
+
+def test_stream_to_parquet_matches_in_memory_loaders(tmp_path):
+    sources = _write_exports(tmp_path)
+    staging = tmp_path / "staging.parquet"
+    counts = stream_to_parquet(sources, staging, chunksize=5)
+    assert counts == {"WoS": 24, "Scopus": 12, "IEEE": 12, "PsycINFO": 12}
+
+    streamed = pd.read_parquet(staging)
+    in_memory = pd.concat([load_wos(sources["WoS"]), load_scopus(sources["Scopus"]),
+                           load_ieee(sources["IEEE"]), load_psycinfo(sources["PsycINFO"])],
+                          ignore_index=True)
+    assert list(streamed.columns) == STANDARD_COLUMNS
+    pd.testing.assert_frame_equal(streamed, in_memory[STANDARD_COLUMNS].astype("string"),
+                                  check_dtype=False)
+
+    deduped, doi_dupes, _ = deduplicate(streamed)
+    assert doi_dupes == 0
+    assert set(deduped["source_database"]) == {"WoS", "Scopus", "IEEE", "PsycINFO"}
+    assert deduped["lineage_ids"].str.count("; ").sum() + len(deduped) == 60
+
+
+@pytest.mark.parametrize("mode", ["greedy", "cluster"])
+def test_streamed_dedup_matches_in_memory_dedup(tmp_path, mode):
+    sources = _write_exports(tmp_path)
+    # DOI and title duplicates of the WoS records, some more complete, with
+    # blank years in some CSV chunks only
+    pd.DataFrame({
+        "Title": [f"WoS study 0-{i}" for i in range(6)] + [f"WoS study 1-{i}" for i in range(6)],
+        "Year": [2020, None, 2020, 2020, 2020, 2020, None, 2021, 2021, 2021, 2021, 2021],
+        "DOI": [f"10.1/w0{i}" for i in range(6)] + [""] * 6,
+        "Abstract": ["Full abstract", ""] * 6,
+        "Volume": [3, None] * 6,
+    }).to_csv(sources["Scopus"], index=False)
+    staging = tmp_path / "staging.parquet"
+    stream_to_parquet(sources, staging, chunksize=4)
+
+    staged_years = pd.read_parquet(staging, columns=["year"])["year"].dropna()
+    assert not staged_years.str.contains(r"\.").any()
+
+    expected, doi_dupes, title_dupes = deduplicate(pd.read_parquet(staging), mode=mode)
+    assert doi_dupes == 6 and title_dupes > 0
+    slim = read_dedup_frame(staging)
+    assert set(slim["abstract"].dropna()) <= {"x", ""}
+    deduped, _, _ = deduplicate(slim, mode=mode)
+    out = tmp_path / "deduplicated.csv"
+    write_staged_records(staging, deduped, out, chunksize=7)
+
+    reference = tmp_path / "reference.csv"
+    expected.to_csv(reference, index=False)
+    pd.testing.assert_frame_equal(pd.read_csv(out), pd.read_csv(reference))
+
+
+# ---------------------------------------------------------------------------
+# Export cache
+# ---------------------------------------------------------------------------
+
+def test_cached_standardize_hits_and_invalidates(tmp_path, monkeypatch):
+    sources = _write_exports(tmp_path)
+    cache = tmp_path / "cache"
+    reads = []
+
+    def counting_read(path):
+        reads.append(path)
+        return pd.read_csv(path)
+
+    first = cached_standardize(sources["Scopus"], "Scopus", counting_read, cache)
+    second = cached_standardize(sources["Scopus"], "Scopus", counting_read, cache)
+    assert len(reads) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert len(list(cache.glob("Scopus-*-v*.parquet"))) == 1
+
+    # Changed content -> new key, re-parsed
+    with open(sources["Scopus"], "a") as f:
+        f.write("Extra Scopus study,2024,,1,2\n")
+    third = cached_standardize(sources["Scopus"], "Scopus", counting_read, cache)
+    assert len(reads) == 2 and len(third) == 13
+
+    # Loader version bump -> re-parsed
+    import standardize_and_dedup
+    monkeypatch.setattr(standardize_and_dedup, "LOADER_VERSION", 999)
+    cached_standardize(sources["Scopus"], "Scopus", counting_read, cache)
+    assert len(reads) == 3
+
+
+def test_cached_wos_matches_uncached(tmp_path):
+    sources = _write_exports(tmp_path)
+    cached = load_wos(sources["WoS"], cache_dir=tmp_path / "cache")
+    again = load_wos(sources["WoS"], cache_dir=tmp_path / "cache")
+    fresh = load_wos(sources["WoS"])
+    pd.testing.assert_frame_equal(cached, again)
+    pd.testing.assert_frame_equal(cached, fresh[STANDARD_COLUMNS].astype("string"))
+
+
+# ---------------------------------------------------------------------------
+# Loader column handling and throughput
+# ---------------------------------------------------------------------------
+
+def test_page_range_handles_missing_values():
+    df = pd.DataFrame({"start": [1, None, 3, None], "end": [9, 5, None, None]})
+    assert page_range(df, "start", "end").tolist() == ["1-9", "5", "3", pd.NA]
+    assert page_range(df, "absent", "end").tolist() == ["9", "5", pd.NA, pd.NA]
+
+
+def test_psycinfo_year_extraction():
+    df = pd.DataFrame({"PubDate": ["Spring 2021", None, "n.d.", "Dec 2019 - Jan 2020"]})
+    assert standardize_psycinfo(df)["year"].tolist() == ["2021", pd.NA, pd.NA, "2019"]
+
+
+LOADER_ROWS = 50_000
+# Rows per second every loader must sustain; vectorized loaders run ~10x faster.
+# Wall-clock floors are only asserted on request (RUN_BENCHMARKS=1) so a slow
+# or busy CI runner does not fail the unit suite.
+MIN_LOADER_THROUGHPUT = 100_000
+RUN_BENCHMARKS = os.environ.get("RUN_BENCHMARKS") == "1"
+
+
+def _synthetic_export(n):
+    rng = random.Random(0)
+    pages = [None if rng.random() < 0.2 else float(rng.randint(1, 500)) for _ in range(n)]
+    return pd.DataFrame({
+        "Title": [f"Synthetic study {i}" for i in range(n)],
+        "Article Title": [f"Synthetic study {i}" for i in range(n)],
+        "Document Title": [f"Synthetic study {i}" for i in range(n)],
+        "Abstract": "abstract",
+        "Authors": "Kim, H",
+        "Year": 2021,
+        "Publication Year": 2021,
+        "PubDate": [None if i % 10 == 0 else f"Spring {2000 + i % 25}" for i in range(n)],
+        "DOI": [f"10.1/{i}" for i in range(n)],
+        "Start Page": pages,
+        "End Page": pages,
+        "Page start": pages,
+        "Page end": pages,
+        "StartPage": pages,
+    })
+
+
+@pytest.mark.parametrize("standardize", [standardize_wos, standardize_scopus,
+                                         standardize_ieee, standardize_psycinfo])
+def test_loader_throughput_50k_rows(standardize):
+    """Micro-benchmark: catches a regression to per-row Python loops (RUN_BENCHMARKS=1)."""
+    export = _synthetic_export(LOADER_ROWS)
+    t0 = time.perf_counter()
+    standardized = standardize(export)
+    elapsed = time.perf_counter() - t0
+    assert len(standardized) == LOADER_ROWS
+    assert not standardized["pages"].astype(str).str.contains("nan").any()
+    if RUN_BENCHMARKS:
+        assert LOADER_ROWS / elapsed >= MIN_LOADER_THROUGHPUT, f"{LOADER_ROWS / elapsed:,.0f} rows/s"